@@ -30,12 +30,23 @@ Command-line options:
 -html          change HTML-entities like &uuml; into their respective letters.
                This is done both before and after the normal check.
 -dictionary:   Location of the hunspell dictionary (-dictionary:/usr/share/hunspell/de_DE).
--common_words: Location of a file with common words
+-common_words: Location of a file with common words (or of a list compiled with
+               tools/compile_wordlist.py)
+-suggestionCache: Location of a file to store the suggestions of hunspell across runs
+-suggestWorkers: Number of processes to get suggestions from hunspell (only
+               used with -pageStore:, suggestions are retrieved for batches of pages)
+-xmlfile:      Check the pages of an XML dump instead of the live wiki
+-xmlindex:     Index of a multistream XML dump given with -xmlfile. Allows to
+               check single pages (Title) or to start at -start:Title offline.
 
 Example usage (you can find the dictionaries on https://github.com/hroest/spellcheck-data):
 
 python spellcheck_hunspell.py  -dictionary:/usr/share/hunspell/de_DE -common_words:spellcheck-data/lists/de/common_15.dic  -language:DE  Schweiz
 
+python spellcheck_hunspell.py  -dictionary:/usr/share/hunspell/de_DE -language:DE \
+    -xmlfile:dewiki-latest-pages-articles-multistream.xml.bz2 \
+    -xmlindex:dewiki-latest-pages-articles-multistream-index.txt.bz2 Schweiz
+
 """
 
 """
@@ -78,24 +89,18 @@ from wikispell.Callback import CallbackObject
 from wikispell.SpellcheckLib import askAlternative
 from wikispell.InteractiveWordReplacer import InteractiveWordReplacer
 from wikispell.HunspellSpellchecker import HunspellSpellchecker
-
-def run_bot(allPages, sp, pageStore=None, level="full"):
-    Callbacks = []
-    stillSkip  = False;
-    firstPage = True
-    nonInteractive = True
-
-    wr = InteractiveWordReplacer()
-    # loadPagesWiki(wr, correctWords_page, ignorePages_page)
-    output = ""
-
-    if pageStore is None:
-        nonInteractive = False
-
-    UPDATE_EVERY = 10000
-    # UPDATE_EVERY = 100
-    update_nr = 1
-
+from wikispell.DumpReader import DumpReader
+from wikispell.SuggestionCache import SuggestionCache
+from wikispell.SuggestionPool import SuggestionPool
+from wikispell.CompactWordSet import CompactWordSet
+from wikispell.DictionaryRegistry import registry
+
+SUGGEST_BATCH = 100
+
+def loadPages(allPages):
+    """
+    Yields (page, title, text, page number) for all pages that can be checked
+    """
     page_nr = 0
     for page in allPages:
 
@@ -109,7 +114,6 @@ def run_bot(allPages, sp, pageStore=None, level="full"):
         print "Performing spellcheck on page %s (%s pages processed so far)" % (page_title.encode("utf8"), page_nr)
         page_nr += 1
 
-        st = time.time()
         try:
             text = page.get()
         except pywikibot.NoPage:
@@ -119,12 +123,55 @@ def run_bot(allPages, sp, pageStore=None, level="full"):
             pywikibot.output(u"%s is a redirect, skip!" % page_title)
             continue
 
-        # print "get pg time: ", time.time() - st
+        yield page, page_title, text, page_nr
+
+def spellcheckBatches(pages, sp, level, batchSize=SUGGEST_BATCH):
+    """
+    Spellcheck pages in batches, getting the suggestions for all unknown
+    words of a batch at once.
 
-        st = time.time()
-        orig_text = text
+    Yields the same as loadPages with the checked text and the wrong words
+    appended.
+    """
+    batch = []
+    for item in pages:
+        batch.append(item)
+        if len(batch) < batchSize:
+            continue
+        for res in zip(batch, sp.spellcheck_pages([b[2] for b in batch], level=level)):
+            yield res[0] + res[1]
+        batch = []
 
-        text, wrongWords = sp.spellcheck(text, level=level)
+    if len(batch) > 0:
+        for res in zip(batch, sp.spellcheck_pages([b[2] for b in batch], level=level)):
+            yield res[0] + res[1]
+
+def run_bot(allPages, sp, pageStore=None, level="full"):
+    Callbacks = []
+    stillSkip  = False;
+    firstPage = True
+    nonInteractive = True
+
+    wr = InteractiveWordReplacer()
+    # loadPagesWiki(wr, correctWords_page, ignorePages_page)
+    output = ""
+
+    if pageStore is None:
+        nonInteractive = False
+
+    UPDATE_EVERY = 10000
+    # UPDATE_EVERY = 100
+    update_nr = 1
+
+    pages = loadPages(allPages)
+    if nonInteractive:
+        # Get the suggestions for all distinct words of a batch of pages at
+        # once (in parallel if there is a suggestion pool)
+        checked = spellcheckBatches(pages, sp, level)
+    else:
+        checked = (item + sp.spellcheck(item[2], level=level) for item in pages)
+
+    for page, page_title, orig_text, page_nr, text, wrongWords in checked:
 
         if not nonInteractive:
             text = sp.askUser(text, page_title)
@@ -186,6 +233,10 @@ def run_bot(allPages, sp, pageStore=None, level="full"):
     for k, v in sp.knownwords.iteritems():
         print "* %s : %s" % (k,v)
 
+    if sp.suggestion_cache is not None:
+        print sp.suggestion_cache.stats()
+    print registry.stats()
+
 def main():
     ###################################################################
     #                           MAIN                                  #
@@ -199,11 +250,14 @@ def main():
     checklang = None
     dictionary = None
     common_words = None
+    suggestion_cache = None
+    suggest_workers = 0
     nosuggestions = False
     remove_dissimilar = True
     pageStore = None
     correct_html_codes = False
     xmlfile = False
+    xmlindex = None
     language = "DE"
     level="full"
     stringent = 0
@@ -215,6 +269,8 @@ def main():
             stringent = int(arg[11:])
         elif arg.startswith("-xmlfile:"):
             xmlfile = arg[9:]
+        elif arg.startswith("-xmlindex:"):
+            xmlindex = arg[10:]
         elif arg.startswith("-cat:"):
             category = arg[5:]
         elif arg.startswith("-keepDissimilar"):
@@ -227,6 +283,10 @@ def main():
             newpages = True
         elif arg.startswith("-common_words:"):
             common_words = arg[14:]
+        elif arg.startswith("-suggestionCache:"):
+            suggestion_cache = SuggestionCache(arg[17:])
+        elif arg.startswith("-suggestWorkers:"):
+            suggest_workers = int(arg[16:])
         elif arg.startswith("-longpages"):
             longpages = True
         elif arg.startswith("-minlen:"):
@@ -251,16 +311,11 @@ def main():
         print "Language needs to be either DE or EN"
         return
 
-    common_words_dict = set([])
-
     if True:
+        wordfiles = []
         if common_words is not None:
-            for wordfile in common_words.split(";"):
-                if len(wordfile) == 0:
-                    continue
-                f = open(wordfile)
-                for l in f:
-                    common_words_dict.add(l.strip().decode("utf8").lower())
+            wordfiles = [wordfile for wordfile in common_words.split(";") if len(wordfile) > 0]
+        common_words_dict = CompactWordSet.from_files(wordfiles)
 
         print "Got %s known good words from the supplied file" % len(common_words_dict)
 
@@ -271,11 +326,25 @@ def main():
                               stringent = stringent,
                               composite_minlen = composite_minlen,
                               remove_dissimilar=remove_dissimilar,
-                              common_words=common_words_dict)
+                              common_words=common_words_dict,
+                              suggestion_cache=suggestion_cache)
     sp.correct_html_codes = correct_html_codes
     sp.nosuggestions = nosuggestions
 
-    if start and not category:
+    if suggest_workers > 0 and pageStore is not None:
+        sp.suggestion_pool = SuggestionPool(sp._dictionary_path, sp._alternative_path,
+                                            suggest_workers)
+
+    if xmlfile and xmlindex:
+        # Random access to the pages of a multistream dump
+        reader = DumpReader(xmlfile, xmlindex)
+        if len(title) != 0:
+            gen = reader.get_pages(titles=[' '.join(title)])
+        elif start:
+            gen = reader.parse_from(title=start)
+        else:
+            gen = reader.parse()
+    elif start and not category:
         gen = pagegenerators.PreloadingGenerator(
             pagegenerators.AllpagesPageGenerator(start=start,includeredirects=False))
     elif category:
@@ -330,7 +399,13 @@ def main():
         cgen = pagegenerators.CategorizedPageGenerator(cat)
         gen = pagegenerators.PreloadingGenerator(cgen)
 
-    run_bot(gen, sp, pageStore=pageStore, level=level)
+    try:
+        run_bot(gen, sp, pageStore=pageStore, level=level)
+    finally:
+        if suggestion_cache is not None:
+            suggestion_cache.close()
+        if sp.suggestion_pool is not None:
+            sp.suggestion_pool.close()
 
 if __name__ == "__main__":
     try:
@@ -1,9 +1,9 @@
 #!/usr/bin/python
 # -*- coding: utf-8  -*-
 """
-Script that identifies misspelled words from a SQL table that contains two
-columns (this table may be generated from an XML dump using the script
-setup_mysql_in_memory.py) :
+Script that identifies misspelled words from a SQL table (in MySQL or in an
+SQLite file) that contains two columns (this table may be generated from an
+XML dump using the script tools/count_words.py) :
 
     - smallword : the word itself
     - occurence : the word frequency
@@ -16,11 +16,12 @@ in Wikipedia and replaced with the correct word.
 Potential usage:
 
     python spellcheck_wordfrequency.py --db wikiwords.countedwords_20161020
+    python spellcheck_wordfrequency.py --sqlite countedwords.sqlite
 
 """
 
-import MySQLdb
 from wikispell.WordFrequencyChecker import WordFrequencyChecker
+from wikispell.WordFrequencyStore import MySQLWordFrequencyStore, SQLiteWordFrequencyStore
 from wikispell.BlacklistSpellchecker import BlacklistSpellchecker
 from wikispell.InteractiveWordReplacer import InteractiveSearchReplacer
 from wikispell.PermanentWordlist import PermanentWordlist
@@ -42,24 +43,29 @@ except ImportError:
 ## WORD_MINLEN = 13;
 
 
-import argparse, sys
+import argparse, sys, time
 
 parser = argparse.ArgumentParser()
-parser.add_argument('--db', dest="db", required=True, help="database table (e.g. wikiwords.countedwords_20160203)")
+parser.add_argument('--db', dest="db", default=None, help="database table (e.g. wikiwords.countedwords_20160203), required for MySQL")
+parser.add_argument('--sqlite', dest="sqlite", default=None, help="SQLite file with the table (default table countedwords) instead of MySQL")
 parser.add_argument('--lower_cutoff', dest="lower_cutoff", default=13, type=int, help="Word minimum length")
 parser.add_argument('--upper_cutoff', dest="upper_cutoff", default=999, type=int, help="Word maximum length")
 parser.add_argument('--occurrence_cutoff', dest="occurrence_cutoff", default=1000, type=int, help="Occurrence cutoff, script will only consider words that occur at least this often in the database.")
 parser.add_argument('--skip_words', dest="skip_words", default=0, type=int, help="Skip first N words")
 parser.add_argument('--pageStore', dest="pageStore", default="", help="Wikipedia page to store results of script (making it non-interactive)")
 parser.add_argument('--mysql_config', dest="mysql_config", default="~/.my.cnf.hroest", help="MySQL config file")
+parser.add_argument('--dictionary', dest="dictionary", default="/usr/share/hunspell/de_DE", help="Location of the hunspell dictionary used to remove correctly spelled candidates")
 
 # Advanced arguments to fine-tune which words will be asked
 parser.add_argument('--candidate_cutoff', dest="candidate_cutoff", default=25, type=int, help="Consider words occurring more often than this cutoff as correct.")
 parser.add_argument('--min_lratio', dest="min_lratio", default=0.85, type=float, help="Only consider words with at least this minimal Levenshtein ratio")
 parser.add_argument('--max_ldistance', dest="max_ldistance", default=3, type=int, help="Only consider words with less than this maximal Levenshtein distance")
+parser.add_argument('--bktree', action='store_true', default=False, help="Build an index of all rare words at startup and find the candidates in it instead of querying the database for each word (also finds words that differ in the first characters)")
 parser.add_argument('--askUserForWord', action='store_true', default=False, help="Ask user for each word which variations to consider (can be turned on in interactive mode)")
 
 args = parser.parse_args(sys.argv[1:])
+if args.db is None and args.sqlite is None:
+    parser.error("either --db or --sqlite is required")
 
 doInteractive = True
 if len(args.pageStore) > 0:
@@ -77,23 +83,23 @@ if len(args.pageStore) > 0:
 ################################################################################
 # Find the most common words and search for misspellings of those
 ################################################################################
-db = MySQLdb.connect(read_default_file=args.mysql_config)
-cursor = db.cursor()
+if args.sqlite:
+    store = SQLiteWordFrequencyStore(args.sqlite, args.db or "countedwords")
+else:
+    store = MySQLWordFrequencyStore.connect(args.db, args.mysql_config)
 
-cursor.execute(
-"""
-select * from %s where occurence > %s
-and length(smallword) > %s
-and length(smallword) <= %s
-order by occurence DESC
-"""  % (args.db, args.occurrence_cutoff, args.lower_cutoff, args.upper_cutoff)
-)
-misspell = cursor.fetchall()
+misspell = store.frequent_words(args.occurrence_cutoff, args.lower_cutoff, args.upper_cutoff)
 
 
 pm = PermanentWordlist("User:HRoestTypo", load=True)
 interactive_replacer = InteractiveSearchReplacer(pm=pm)
-freq_checker = WordFrequencyChecker(pm)
+freq_checker = WordFrequencyChecker(pm, hunspell_dict=args.dictionary)
+
+index = None
+if args.bktree:
+    start = time.time()
+    index = freq_checker.build_index(store, occurence_cutoff=args.candidate_cutoff)
+    print "Built index of %s rare words in %0.1fs" % (len(index), time.time() - start)
 
 #UPDATE_EVERY = 250
 UPDATE_EVERY = 50
@@ -121,11 +127,11 @@ try:
         print "================================="
         print myw, j, "out of", len(misspell)
 
-        candidates = freq_checker.find_candidates(myw, cursor,
+        candidates = freq_checker.find_candidates(myw, store,
                                 occurence_cutoff = args.candidate_cutoff,
                                 lcutoff = args.min_lratio,
                                 ldistance = args.max_ldistance,
-                                db_=args.db)
+                                index=index)
 
         print "nr candidates", len(candidates)
         if len(candidates) == 0:
@@ -16,13 +16,19 @@ python spellcheck_wordlist.py -searchWiki
 Wordlists can be provided in one of following formats (note: all words need to be in lowercase):
 
 -typopage:         Provide a wikipage that contains one entry per line, namely a template with three parameters: article, wrong word, correct word
--blacklist:        Provide a file that contains a list of wrong words (provide the wrong and the correct word per line separated by semicolon ";")
+-blacklist:        Provide a file that contains a list of wrong words (provide the wrong and the correct word per line separated by semicolon ";" or a list compiled with tools/compile_wordlist.py)
 -singleword:       To search and replace a single word use "wrongword;correctword"
 -blacklistpage:    Link to a specific page where the words are listed using "*" and separated by ":"
 -pageStore:        Store the result on a Wikipedia page instead of interactively asking the user
 
 Command-line options:
 -batchNr:          Size of batches for the XML file processing
+-workers:          Number of processes used to check the pages of the XML file
+-checkpoint:       File to record progress in the XML file, a new run with the
+                   same file continues after the last processed page (needs a
+                   plain XML file or a multistream dump)
+-xmlindex:         Index of a multistream XML file given with -xmlfile, used
+                   with -typopage/-typofile to check the pages offline
 
 A good example of a "blacklist" of words can, for example, be found at
 https://raw.githubusercontent.com/hroest/spellcheck-data/master/lists/de/perturbations.dic
@@ -42,18 +48,28 @@ Example usage:
 
     python spellcheck_wordlist.py -typopage:Benutzer:HRoestTypo/Tippfehler/20151002/63
 
+    python spellcheck_wordlist.py -typopage:Benutzer:HRoestTypo/Tippfehler/20151002/63 \
+                                -xmlfile:data/dewiki-latest-pages-articles-multistream.xml.bz2 \
+                                -xmlindex:data/dewiki-latest-pages-articles-multistream-index.txt.bz2
+
     python spellcheck_wordlist.py -searchWiki -blacklist:concat.dic
 
     python spellcheck_wordlist.py -xmlfile:data/dewiki-latest-pages-articles.xml.bz2 -non-interactive -batchNr:1000 \
                                 -pageStore:User:HRoestTypo/Tippfehler/
 
+    python spellcheck_wordlist.py -xmlfile:data/dewiki-latest-pages-articles.xml.bz2 -non-interactive -batchNr:1000 \
+                                -pageStore:User:HRoestTypo/Tippfehler/ -workers:16
+
+    python spellcheck_wordlist.py -xmlfile:data/dewiki-latest-pages-articles-multistream.xml.bz2 -non-interactive \
+                                -batchNr:1000 -pageStore:User:HRoestTypo/Tippfehler/ -checkpoint:dewiki.checkpoint
+
 """
 
 #
 # Distributed under the terms of the MIT license.
 #
 
-import re, string, sys
+import os, re, string, sys
 
 ## pywikibot imports
 try:
@@ -70,6 +86,9 @@ from wikispell.SpellcheckLib import readBlacklist
 from wikispell.SpellcheckLib import abstract_Spellchecker
 from wikispell.InteractiveWordReplacer import InteractiveWordReplacer
 from wikispell.BlacklistSpellchecker import BlacklistSpellchecker
+from wikispell.BlacklistSpellchecker import CompiledBlacklistChecker
+from wikispell.ParallelBlacklistChecker import ParallelBlacklistChecker
+from wikispell.DumpReader import DumpReader
 
 NUMBER_PAGES = 60
 NUMBER_PAGES = 50
@@ -159,11 +178,14 @@ def doSearchWiki(wordlist, blacklistChecker, pageStore=None):
             mypage = pywikibot.Page(pywikibot.getSite(), pageStore)
             mypage.put(output,  u'Update' )
 
-def writeTyposToWikipedia(res, page_name):
+def writeTyposToWikipedia(res, page_name, wr):
     """
     Output wrong words to a Wiki page
+
+    Returns the number of wrong words written.
     """
     output = ""
+    nr_output = 0
     for r in res:
         # {{User:HRoestTypo/V/Typo|Johann Heinrich Zedler|Maerialien|Materialien}}
         page = r
@@ -196,7 +218,36 @@ def writeTyposToWikipedia(res, page_name):
 
     mypage = pywikibot.Page(pywikibot.getSite(), page_name)
     mypage.put(output,  u'Update' )
-    myIter += 1
+    return nr_output
+
+def readCheckpoint(filename):
+    """
+    Read the checkpoint of a previous run over an XML dump
+
+    Returns a tuple (page id, offset, batch number, title) of the last fully
+    processed page or None if there is no checkpoint yet.
+    """
+    if not os.path.exists(filename):
+        return None
+
+    f = open(filename)
+    line = f.read().decode("utf8").rstrip("\n")
+    f.close()
+
+    pageid, offset, batch, title = line.split("\t", 3)
+    return pageid, int(offset), int(batch), title
+
+def writeCheckpoint(filename, page, batch):
+    """
+    Record the last fully processed page of an XML dump (a DumpPage) and the
+    number of the next batch
+    """
+    tmpfile = filename + ".tmp"
+    f = open(tmpfile, "w")
+    line = u"%s\t%s\t%s\t%s\n" % (page.id, page.offset, batch, page.title)
+    f.write(line.encode("utf8"))
+    f.close()
+    os.rename(tmpfile, filename)
 
 def loadPagesWiki(wr, correctWords_page, ignorePages_page):
     """
@@ -246,6 +297,7 @@ def collectBlacklistPages(batchNr, gen, badDict):
 
     wrongWords = []
     seenAlready = {}
+    checker = CompiledBlacklistChecker(badDict)
 
     for i, page in enumerate(gen):
 
@@ -267,7 +319,7 @@ def collectBlacklistPages(batchNr, gen, badDict):
             continue
         
         # Process page
-        page.words = BlacklistSpellchecker().spellcheck_blacklist(text, badDict, return_words=True)
+        page.words = checker.check(text)
 
         if not len(page.words) == 0: 
             wrongWords.append(page)
@@ -278,15 +330,40 @@ def collectBlacklistPages(batchNr, gen, badDict):
     return wrongWords, i
 
 def processXMLWordlist(xmlfile, badDict, batchNr = 3000, breakUntil = '',
-                       doNoninteractive=False, pageStore=None):
+                       doNoninteractive=False, pageStore=None, workers=1,
+                       checkpoint=None):
     """
     Process an XML dump with the given wordlist
+
+    With workers > 1, the pages are spellchecked in a pool of worker
+    processes while the dump is parsed in this process.
+
+    With a checkpoint file, the last processed page is recorded after each
+    batch and a new run continues directly after this page (with the
+    numbering of the output pages continued as well). This needs a dump that
+    can be read from the middle (see DumpReader.resumable).
     """
     from SpellcheckLib import InteractiveWordReplacer
     import xmlreader
 
     wr = InteractiveWordReplacer()
-    generator = xmlreader.XmlDump(xmlfile).parse()
+    myIter = 1
+
+    if checkpoint is not None:
+        reader = DumpReader(xmlfile)
+        if not reader.resumable():
+            print "-checkpoint needs a plain XML file or a multistream dump (pages-articles-multistream.xml.bz2),"
+            print "%s cannot be read from the middle. Abort." % xmlfile
+            return
+        state = readCheckpoint(checkpoint)
+        if state is None:
+            generator = reader.parse()
+        else:
+            pageid, offset, myIter, title = state
+            print "Continue after page %s (id %s) with batch %s" % (title, pageid, myIter)
+            generator = reader.parse(offset, after_id=pageid)
+    else:
+        generator = xmlreader.XmlDump(xmlfile).parse()
 
     correctWords_page = 'Benutzer:HRoestTypo/Tippfehler/all/correctWords'
     ignorePages_page = 'Benutzer:HRoestTypo/Tippfehler/all/ignorePages'
@@ -296,24 +373,23 @@ def processXMLWordlist(xmlfile, badDict, batchNr = 3000, breakUntil = '',
 
         loadPagesWiki(wr, correctWords_page, ignorePages_page)
 
-    def collectBlacklistPagesXML(batchNr, gen, badDict):
-        """Collect all wrong words in the provided page generator.
+    def collectBlacklistPagesXML(batchNr, checked):
+        """Collect all wrong words from the provided (page, words) generator.
         """
         wrongWords = []
         seenAlready = {}
         i = 0
-        for page in gen:
-            if not page.ns == '0':
-                continue
-            # Process page
-            page.words = BlacklistSpellchecker().spellcheck_blacklist(page.text, badDict, return_words=True, range_level="full")
+        lastpage = None
+        for page, words in checked:
+            page.words = words
+            lastpage = page
             if not len(page.words) == 0: 
                 wrongWords.append(page)
             if batchNr > 0 and i >= batchNr: 
                 break
             i += 1
             print i, page.title
-        return wrongWords, i
+        return wrongWords, i, lastpage
 
     # Fast-forward until a certain page
     i = 0
@@ -330,65 +406,88 @@ def processXMLWordlist(xmlfile, badDict, batchNr = 3000, breakUntil = '',
 
     print("\nStarting to work on batches")
 
-    if doNoninteractive:
+    # Spellcheck the remaining pages, in parallel if requested
+    parallelChecker = None
+    pages = (page for page in generator if page.ns == '0')
+    if workers > 1:
+        parallelChecker = ParallelBlacklistChecker(badDict, workers, range_level="full")
+        checked = parallelChecker.check_pages(pages)
+    else:
+        checker = CompiledBlacklistChecker(badDict, range_level="full")
+        checked = ((page, checker.check(page.text)) for page in pages)
+
+    # Make sure the worker processes are stopped (also on Ctrl-C)
+    try:
+        if doNoninteractive:
 
-        nrpages = batchNr
-        myIter = 1
-        nr_output = 0
+            nrpages = batchNr
+            nr_output = 0
 
-        # Noninteractive processing: process all articles in batches (until
-        # there are no more pages)
-        while nrpages == batchNr:
-            res, nrpages = collectBlacklistPagesXML(nrpages, generator, badDict)
+            # Noninteractive processing: process all articles in batches (until
+            # there are no more pages)
+            while nrpages == batchNr:
+                res, nrpages, lastpage = collectBlacklistPagesXML(nrpages, checked)
 
-            # Output page
-            page_name = pageStore + str(myIter)
+                # Output page (not for batches without results, e.g. when
+                # continuing after the last batch)
+                if len(res) > 0:
+                    page_name = pageStore + str(myIter)
 
-            writeTyposToWikipedia(res, page_name)
+                    nr_output += writeTyposToWikipedia(res, page_name, wr)
+                    myIter += 1
 
-        print "Write number of wrong words", nr_output
-        return
+                if checkpoint is not None and lastpage is not None:
+                    writeCheckpoint(checkpoint, lastpage, myIter)
 
-    # Loop:
-    # - process a batch of pages
-    # - work on them interactively
-    while True:
-        wrongWords, nrpages = collectBlacklistPagesXML(batchNr, generator, badDict)
+            print "Write number of wrong words", nr_output
+            return
 
-        print('Found %s wrong words.' % len(wrongWords))
-        res = []
-        for p in wrongWords:
-            r = pywikibot.Page(pywikibot.getSite(),p.title)
-            r.words = p.words
-            res.append(r)
+        # Loop:
+        # - process a batch of pages
+        # - work on them interactively
+        while True:
+            wrongWords, nrpages, lastpage = collectBlacklistPagesXML(batchNr, checked)
 
-        wr.processWrongWordsInteractively( res )
+            print('Found %s wrong words.' % len(wrongWords))
+            res = []
+            for p in wrongWords:
+                r = pywikibot.Page(pywikibot.getSite(),p.title)
+                r.words = p.words
+                res.append(r)
 
-        choice = pywikibot.inputChoice('Load next batch?',
-               ['Yes', 'yes', 'No', 'Save choices'], ['y', '\\', 'n', 's'])
+            wr.processWrongWordsInteractively( res )
 
-        if choice == 'n' or choice == 's': 
+            choice = pywikibot.inputChoice('Load next batch?',
+                   ['Yes', 'yes', 'No', 'Save choices'], ['y', '\\', 'n', 's'])
 
-            # Save correct words
-            output = ""
-            for k in sorted(wr.ignorePerPages):
-                vlist = wr.ignorePerPages[k]
-                for v in sorted(vlist):
-                    output += "* %s : %s\n" % (k, v)
+            if choice == 'n' or choice == 's': 
 
-            mypage = pywikibot.Page(pywikibot.getSite(), correctWords_page)
-            mypage.put(output,  u'Update' )
+                # Save correct words
+                output = ""
+                for k in sorted(wr.ignorePerPages):
+                    vlist = wr.ignorePerPages[k]
+                    for v in sorted(vlist):
+                        output += "* %s : %s\n" % (k, v)
 
-            output = ""
-            for k in sorted(wr.ignorePages):
-                output += "* %s \n" % (k.strip())
+                mypage = pywikibot.Page(pywikibot.getSite(), correctWords_page)
+                mypage.put(output,  u'Update' )
 
-            # Save ignore pages
-            mypage = pywikibot.Page(pywikibot.getSite(), ignorePages_page)
-            mypage.put(output,  u'Update' )
+                output = ""
+                for k in sorted(wr.ignorePages):
+                    output += "* %s \n" % (k.strip())
 
-        if choice == 'n': 
-            break
+                # Save ignore pages
+                mypage = pywikibot.Page(pywikibot.getSite(), ignorePages_page)
+                mypage.put(output,  u'Update' )
+
+            if checkpoint is not None and lastpage is not None:
+                writeCheckpoint(checkpoint, lastpage, myIter)
+
+            if choice == 'n': 
+                break
+    finally:
+        if parallelChecker is not None:
+            parallelChecker.close()
 
 
     errors = False
@@ -416,11 +515,14 @@ def main():
     blacklistpage = None
     category = None
     xmlfile = None
+    xmlindex = None
     typopage = None
     typofile = None
     pageStore = None
     title = []
     batchNr = 1000
+    workers = 1
+    checkpoint = None
     non_interactive = False
 
     for arg in pywikibot.handleArgs():
@@ -440,10 +542,16 @@ def main():
             searchWiki = True
         elif arg.startswith("-xmlfile:"):
             xmlfile = arg[9:]
+        elif arg.startswith("-xmlindex:"):
+            xmlindex = arg[10:]
         elif arg.startswith("-pageStore:"):
             pageStore = arg[11:]
         elif arg.startswith("-batchNr:"):
             batchNr = int(arg[9:])
+        elif arg.startswith("-workers:"):
+            workers = int(arg[9:])
+        elif arg.startswith("-checkpoint:"):
+            checkpoint = arg[12:]
         elif arg.startswith("-non-interactive"):
             non_interactive = True
         elif arg.startswith("-cat:"):
@@ -512,9 +620,19 @@ def main():
                     # for correct ordering
                     pages.append( page )
 
-        # Retrive text for pages to work on
+        # Retrive text for pages to work on (from the dump if possible, the
+        # current text is only loaded for pages that still have wrong words)
         print "Will generate for ", len(pages), "pages"
-        gen = pagegenerators.PreloadingGenerator(pages, pageNumber=NUMBER_PAGES)
+        if xmlindex:
+            reader = DumpReader(xmlfile, xmlindex)
+            try:
+                dumpPages = dict([ (p.title, p) for p in
+                    reader.get_pages(titles=[page.title() for page in pages]) ])
+            finally:
+                reader.close()
+            gen = pages
+        else:
+            gen = pagegenerators.PreloadingGenerator(pages, pageNumber=NUMBER_PAGES)
 
         # Iterate all pages to work on
         wr = InteractiveWordReplacer()
@@ -526,14 +644,20 @@ def main():
                 print "Skip %s" % "Liste der Biografien"
                 continue
 
-            try:
-                text = page.get()
-            except pywikibot.NoPage:
-                pywikibot.output(u"%s doesn't exist, skip!" % page.title())
-                continue
-            except pywikibot.IsRedirectPage:
-                pywikibot.output(u"%s is a redirect, skip!" % page.title())
-                continue
+            if xmlindex:
+                if page.title() not in dumpPages:
+                    pywikibot.output(u"%s is not in the dump, skip!" % page.title())
+                    continue
+                text = dumpPages[page.title()].text
+            else:
+                try:
+                    text = page.get()
+                except pywikibot.NoPage:
+                    pywikibot.output(u"%s doesn't exist, skip!" % page.title())
+                    continue
+                except pywikibot.IsRedirectPage:
+                    pywikibot.output(u"%s is a redirect, skip!" % page.title())
+                    continue
 
             wDict = dict( [ (w[0].lower(), w[1].lower() ) for w in page.words])
 
@@ -635,7 +759,8 @@ def main():
             title = ""
 
         processXMLWordlist(xmlfile, wordlist, breakUntil = title, batchNr=batchNr,
-                           doNoninteractive=non_interactive,pageStore=pageStore)
+                           doNoninteractive=non_interactive,pageStore=pageStore,
+                           workers=workers, checkpoint=checkpoint)
         return
 
     elif category:
@@ -0,0 +1,41 @@
+#!/usr/bin/python
+# -*- coding: utf-8  -*-
+
+"""Unit test for BKTree
+"""
+
+import unittest
+import test_utils
+
+import random
+from wikispell.BKTree import BKTree, levenshtein
+
+class BKTreeTestCase(unittest.TestCase):
+
+    def test_levenshtein(self):
+        self.assertEqual(levenshtein(u"", u""), 0)
+        self.assertEqual(levenshtein(u"Haus", u""), 4)
+        self.assertEqual(levenshtein(u"Haus", u"Maus"), 1)
+        self.assertEqual(levenshtein(u"kitten", u"sitting"), 3)
+        self.assertEqual(levenshtein(u"Schweiz", u"Schwiez"), 2)
+
+    def test_find(self):
+        rng = random.Random(1)
+        words = set([u"".join(rng.choice(u"abcdeäö") for i in range(rng.randint(1, 7)))
+                     for j in range(500)])
+        tree = BKTree(distance=levenshtein)
+        for i, word in enumerate(sorted(words)):
+            tree.add(word, i)
+        tree.add(sorted(words)[0], -1)
+        self.assertEqual(len(tree), len(words))
+
+        values = dict([(w, i) for i, w in enumerate(sorted(words))])
+        values[sorted(words)[0]] = -1
+        for query in [u"abc", u"äöäö", u"eeeeeee", u"x", u""]:
+            for k in range(3):
+                expected = sorted([(levenshtein(query, w), w, values[w]) for w in words
+                                   if levenshtein(query, w) <= k])
+                self.assertEqual(tree.find(query, k), expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,8 +11,13 @@ except ImportError:
 
 from wikispell.BlacklistSpellchecker import BlacklistSpellchecker
 from wikispell.BlacklistSpellchecker import BlacklistSpellchecker
+from wikispell.BlacklistSpellchecker import CompiledBlacklistChecker
+from wikispell.ParallelBlacklistChecker import ParallelBlacklistChecker
+from wikispell.BlacklistMatcher import BlacklistMatcher, BlacklistPatterns
+from wikispell.TextIndex import TextIndex
 import wikispell.textrange_parser as textrange_parser
 
+import sys
 import unittest
 
 def getTestCasePhotovolataik():
@@ -363,6 +368,156 @@ class SpellcheckBlacklistTestCase(unittest.TestCase):
         assert len(res) == 4
         assert res == [[0, 18], [24, 58], [69, 82], [88, 109]]
 
+    def test_normalize_ranges(self):
+        ranges = [[16, 40], [18, 131], [68, 81], [180, 200], [132, 140],
+                  [150, 160], [150, 170], [5, 10], [5, 10], [-3, 2], [0, 4]]
+        expected = self.sp.merge_ranges(self.sp.remove_nested_ranges([list(r) for r in ranges]))
+        self.assertEqual(self.sp.normalize_ranges(ranges), expected)
+        self.assertEqual(self.sp.normalize_ranges([]), [])
+
+        for text in [getTestCasePhotovolataik(), getTestCasePietismus(),
+                     getTestCaseDogville(), getTestCaseFrieden(), getTestCaseLit()]:
+            ranges = self.sp.forbiddenRanges(text, removeNested=False, mergeRanges=False)
+            expected = self.sp.merge_ranges(self.sp.remove_nested_ranges([list(r) for r in ranges]))
+            self.assertEqual(self.sp.normalize_ranges(ranges), expected)
+
+    def test_blacklist_matcher(self):
+        matcher = BlacklistMatcher({'deuschland' : 'wrong', 'solarstrom' : 'wrong',
+                                    'grid parity' : 'wrong', 'xyzabc' : 'wrong'})
+        candidates = matcher.find_candidates(getTestCasePhotovolataik())
+        # "Grid Parity" (with a normal space) is never a single word
+        self.assertEqual(candidates, set(['deuschland', 'solarstrom']))
+        self.assertEqual(BlacklistMatcher({'xyzabc' : 'wrong'}).find_candidates(
+            getTestCasePhotovolataik()), set([]))
+        self.assertEqual(BlacklistMatcher({'deuschland' : 'wrong'}).find_candidates(
+            u"in [[Deu]]schland"), set(['deuschland']))
+
+        # Positions of the hits in the text with brackets (a word is cut at
+        # &nbsp; and thus never contains it)
+        matcher = BlacklistMatcher({u'deuschland' : 'wrong', u'grid parity' : 'wrong'})
+        text = u"in [[Deu]]schland, [[Deuschland]] und Grid&nbsp;Parity, grid\xa0parity"
+        self.assertEqual(matcher.find_hits(text), [(5, 17), (21, 31), (56, 67)])
+        self.assertEqual(matcher.find_hits(u"Grid Parity"), [])
+        self.assertEqual(BlacklistMatcher({u'a b c d e f' : 'wrong'}).find_hits(u"x"), None)
+        result = self.sp.spellcheck_blacklist(text, {u'grid parity' : 'wrong'}, return_words=True,
+                                              matcher=matcher)
+        self.assertEqual([(w.word, w.location) for w in result], [(u'grid parity', 56)])
+
+        # The result is the same with and without matcher
+        for text in [getTestCasePhotovolataik(), getTestCasePietismus(), getTestCaseDogville()]:
+            for badDict in [{'deuschland' : 'wrong'}, {'studirt' : 'wrong'},
+                            {'wasington' : 'wrong', 'manderlay' : 'wrong'}, {'xyzabc' : 'wrong'}]:
+                expected = self.sp.spellcheck_blacklist(text, badDict, return_words=True)
+                result = self.sp.spellcheck_blacklist(text, badDict, return_words=True,
+                                                      matcher=BlacklistMatcher(badDict))
+                self.assertEqual([(w.word, w.location) for w in expected],
+                                 [(w.word, w.location) for w in result])
+
+        # Only the words around the hits are checked
+        calls = []
+        text_skip = self.sp._text_skip
+        def _text_skip(text, loc, word, *args, **kwargs):
+            calls.append(word)
+            return text_skip(text, loc, word, *args, **kwargs)
+        self.sp._text_skip = _text_skip
+        text = u"Ein Haus, das Deu[[schland]]. Und x-Deuschland–x " * 20 + u"Ende"
+        badDict = {u'deuschland' : 'wrong'}
+        expected = self.sp.spellcheck_blacklist(text, badDict, return_words=True)
+        del calls[:]
+        result = self.sp.spellcheck_blacklist(text, badDict, return_words=True,
+                                              matcher=BlacklistMatcher(badDict))
+        self.assertEqual([(w.word, w.location) for w in expected],
+                         [(w.word, w.location) for w in result])
+        self.assertEqual(set(calls), set([u'Deuschland']))
+
+    def test_blacklist_patterns(self):
+        patterns = BlacklistPatterns({'haus' : 'a', 'hau' : 'b', 'ss' : 'c', 'h.us' : 'd'},
+                                     chunk_size=2)
+        text = u"Ein HAUS, ein hauss und sss"
+        self.assertEqual(sorted(patterns.find_all(text)),
+            [('h.us', 4), ('h.us', 14), ('hau', 4), ('hau', 14), ('haus', 4),
+             ('haus', 14), ('ss', 17), ('ss', 24)])
+
+        # The batched regex search gives the same result as one regex per word
+        for text in [getTestCasePhotovolataik(), getTestCasePietismus(), getTestCaseDogville()]:
+            for badDict in [{'deuschland' : 'wrong'}, {'studirt' : 'wrong'},
+                            {'der' : 'wrong', 'die' : 'wrong', 'sol.r' : 'wrong'}]:
+                expected = self.sp.spellcheck_blacklist_regex(text, badDict)
+                result = self.sp.spellcheck_blacklist_regex(text, badDict, batched=True)
+                self.assertEqual([w[0::2] for w in expected], [w[0::2] for w in result])
+
+    def test_blacklist_patterns_cache(self):
+        module = sys.modules[BlacklistSpellchecker.__module__]
+        built = []
+        def patterns(badDict):
+            built.append(list(badDict))
+            return BlacklistPatterns(badDict)
+        module.BlacklistPatterns = patterns
+        try:
+            badDict = {'deuschland' : 'wrong', 'studirt' : 'wrong'}
+            texts = [getTestCasePhotovolataik(), getTestCasePietismus(), getTestCaseDogville()]
+            for text in texts:
+                self.sp.spellcheck_blacklist_regex(text, badDict, batched=True)
+            # An equal blacklist reuses the patterns as well
+            self.sp.spellcheck_blacklist_regex(texts[0], dict(badDict), batched=True)
+            self.assertEqual(len(built), 1)
+
+            # Changing a word (the size of the blacklist stays the same)
+            # builds new patterns
+            del badDict['studirt']
+            badDict['wasington'] = 'Washington'
+            result = self.sp.spellcheck_blacklist_regex(texts[2], badDict, batched=True)
+            self.assertEqual(len(built), 2)
+            self.assertEqual([w[0::2] for w in result],
+                             [w[0::2] for w in self.sp.spellcheck_blacklist_regex(texts[2], badDict)])
+        finally:
+            module.BlacklistPatterns = BlacklistPatterns
+
+    def test_compiled_blacklist_checker(self):
+        checker = CompiledBlacklistChecker({'Deuschland' : 'Deutschland', 'wasington' : 'Washington'})
+        result = checker.check(getTestCasePhotovolataik())
+        self.assertEqual(len(result), 0)
+        result = checker.check(getTestCaseDogville())
+        expected = self.sp.spellcheck_blacklist(getTestCaseDogville(), {'wasington' : 'Washington'},
+                                                return_words=True)
+        self.assertEqual([(w.word, w.location, w.correctword) for w in expected],
+                         [(w.word, w.location, w.correctword) for w in result])
+        result = checker.check(u"Er lebte lange in Deuschland und Wasington.")
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0].correctword, 'Deutschland')
+
+    def test_parallel_blacklist_checker(self):
+        class XMLPage(object):
+            def __init__(self, title, text):
+                self.title = title
+                self.text = text
+
+        badDict = {'deuschland' : 'Deutschland', 'studirt' : 'studiert'}
+        texts = [getTestCasePhotovolataik(), getTestCasePietismus(), getTestCaseDogville(),
+                 u"Er lebte lange in Deuschland."] * 5
+        pages = [XMLPage(str(i), t) for i, t in enumerate(texts)]
+
+        checker = CompiledBlacklistChecker(badDict)
+        parallelChecker = ParallelBlacklistChecker(badDict, 2, queue_size=3)
+        try:
+            result = list(parallelChecker.check_pages(iter(pages)))
+        finally:
+            parallelChecker.close()
+
+        self.assertEqual([p for p, words in result], pages)
+        for page, words in result:
+            expected = checker.check(page.text)
+            self.assertEqual([(w.word, w.location) for w in expected],
+                             [(w.word, w.location) for w in words])
+        self.assertEqual(len(result[3][1]), 1)
+
+    def test_text_skip_genitive(self):
+        # The genitive of a name that occurs elsewhere is skipped
+        text = u"Meier kam spät, Meier rief. Meiers Hund wartete."
+        loc = text.find(u"Meiers")
+        self.assertTrue(self.sp._text_skip(text, loc, u"Meiers", index=TextIndex(text)))
+        self.assertFalse(self.sp._text_skip(text, loc + 7, u"Hund", index=TextIndex(text)))
+
     def test_spellcheck_blacklist_1(self):
 
         # Use Photovoltaik test
@@ -0,0 +1,106 @@
+#!/usr/bin/python
+# -*- coding: utf-8  -*-
+
+"""Unit test for CompactWordSet
+"""
+
+import unittest
+import test_utils
+
+import os, shutil, tempfile
+from wikispell.CompactWordSet import CompactWordSet
+from wikispell.RuleBasedWordAnalyzer import RuleBasedWordAnalyzer
+from wikispell.SpellcheckLib import readBlacklist, compileBlacklist
+
+COMMON = [u"haus", u"boot", u"bootsfahrt", u"fahrt", u"zug", u"über", u"straße",
+          u"bahn", u"hof", u"auto", u"a", u"fahrer"]
+
+class CompactWordSetTestCase(unittest.TestCase):
+
+    def test_lookup(self):
+        words = CompactWordSet(COMMON + [u"haus"])
+        self.assertEqual(len(words), len(COMMON))
+        self.assertEqual(set(words), set(COMMON))
+        for word in COMMON:
+            self.assertTrue(word in words)
+            self.assertTrue(word.encode("utf8") in words)
+        for word in [u"", u"hau", u"häuser", u"hausboot", u"zzz", u"ü"]:
+            self.assertFalse(word in words)
+        self.assertFalse(u"haus" in CompactWordSet())
+
+    def test_prefix_lengths(self):
+        words = CompactWordSet(COMMON)
+        self.assertEqual(words.prefix_lengths(u"hausbootsfahrt"), [4])
+        self.assertEqual(words.prefix_lengths(u"bootsfahrten"), [4, 10])
+        self.assertEqual(words.prefix_lengths(u"überstraße"), [4])
+        self.assertEqual(words.prefix_lengths(u"autobahn"), [1, 4])
+        self.assertEqual(words.prefix_lengths(u"xylophon"), [])
+
+    def test_from_files(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filenames = [os.path.join(tmpdir, "a.dic"), os.path.join(tmpdir, "b.dic")]
+            open(filenames[0], "w").write(u"Haus\nBoot\n".encode("utf8"))
+            open(filenames[1], "w").write(u"Straße\n".encode("utf8"))
+            words = CompactWordSet.from_files(filenames)
+            self.assertEqual(sorted(words), [u"boot", u"haus", u"straße"])
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_save_load(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, "common.bin")
+            words = CompactWordSet(COMMON)
+            words.save(filename)
+            self.assertTrue(CompactWordSet.is_compiled(filename))
+            loaded = CompactWordSet.load(filename)
+            self.assertEqual(list(loaded), list(words))
+            for word in COMMON + [u"hau", u"zzz", u"", u"ü"]:
+                self.assertEqual(word in loaded, word in words)
+            self.assertEqual(loaded.prefix_lengths(u"bootsfahrten"), [4, 10])
+
+            textfile = os.path.join(tmpdir, "more.dic")
+            open(textfile, "w").write("Zeppelin\n")
+            self.assertFalse(CompactWordSet.is_compiled(textfile))
+            self.assertEqual(len(CompactWordSet.from_files([filename])), len(COMMON))
+            self.assertEqual(sorted(CompactWordSet.from_files([filename, textfile])),
+                             sorted(COMMON + [u"zeppelin"]))
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_compiled_blacklist(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            textfile = os.path.join(tmpdir, "blacklist.dic")
+            binfile = os.path.join(tmpdir, "blacklist.bin")
+            open(textfile, "w").write(u"Deuschland;Deutschland\r\n\nstraase;Straße\n".encode("utf8"))
+            expected = {}
+            readBlacklist(textfile, expected)
+            compileBlacklist(binfile, expected)
+            badDict = {u"wasington" : u"Washington"}
+            readBlacklist(binfile, badDict)
+            expected[u"wasington"] = u"Washington"
+            self.assertEqual(badDict, expected)
+            self.assertEqual(badDict[u"deuschland"], u"Deutschland")
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_skip_word(self):
+        # The composite word search gives the same result as with a set
+        words = [u"Hausboot", u"Bahnhofs", u"Autobahnen", u"Bootsfahrt", u"Zugsfahrten",
+                 u"Überstraßen", u"Straßenbahnhof", u"Fahrerei", u"Hofern", u"Autoly"]
+        for language in ["DE", "EN"]:
+            for composite_minlen in [0, 3]:
+                analyzer = RuleBasedWordAnalyzer(3, 1, language, 0, set(COMMON), composite_minlen)
+                compact = RuleBasedWordAnalyzer(3, 1, language, 0, CompactWordSet(COMMON), composite_minlen)
+                for word in words:
+                    self.assertEqual(analyzer.skipWord(word, word, 0, False),
+                                     compact.skipWord(word, word, 0, False))
+
+        analyzer = RuleBasedWordAnalyzer(3, 1, "DE", 0, CompactWordSet(COMMON), 3)
+        self.assertTrue(analyzer.skipWord(u"Hausboot", u"Das Hausboot", 4, False))
+        self.assertFalse(analyzer.skipWord(u"Hausbot", u"Das Hausbot", 4, False))
+
+if __name__ == "__main__":
+    unittest.main()
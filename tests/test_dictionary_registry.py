@@ -0,0 +1,75 @@
+#!/usr/bin/python
+# -*- coding: utf-8  -*-
+
+"""Unit test for DictionaryRegistry
+"""
+
+import unittest
+import test_utils
+
+import os, shutil, tempfile
+from wikispell.DictionaryRegistry import DictionaryRegistry, LazyDictionary
+
+class FakeDictionary(object):
+    loaded = []
+
+    def __init__(self, dic, aff):
+        self.dic = dic
+        FakeDictionary.loaded.append(dic)
+
+class DictionaryRegistryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        FakeDictionary.loaded = []
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "de_DE")
+        open(self.path + ".dic", "w").close()
+        open(self.path + ".aff", "w").close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_shared(self):
+        registry = DictionaryRegistry(loader=FakeDictionary)
+        self.assertFalse(self.path in registry)
+        first = registry.get(self.path)
+        self.assertEqual(first.dic, self.path + ".dic")
+        self.assertTrue(registry.get(self.path) is first)
+        # The same dictionary with a different path
+        other = os.path.join(self.tmpdir, "..", os.path.basename(self.tmpdir), "de_DE")
+        self.assertTrue(registry.get(other) is first)
+        self.assertEqual(len(FakeDictionary.loaded), 1)
+
+        self.assertEqual(registry.hits, {os.path.abspath(self.path) : 2})
+        self.assertEqual(registry.load_times.keys(), [os.path.abspath(self.path)])
+        self.assertTrue("1 loaded" in registry.stats())
+        self.assertTrue("2 hits" in registry.stats())
+
+        registry.clear()
+        self.assertFalse(registry.get(self.path) is first)
+        self.assertEqual(len(FakeDictionary.loaded), 2)
+        self.assertEqual(registry.hits, {os.path.abspath(self.path) : 0})
+
+    def test_find(self):
+        registry = DictionaryRegistry(loader=FakeDictionary)
+        missing = os.path.join(self.tmpdir, "de_CH")
+        self.assertEqual(registry.find(missing), None)
+        self.assertTrue(registry.find(self.path) is registry.get(self.path))
+        # Missing dictionaries are only probed once
+        open(missing + ".dic", "w").close()
+        self.assertEqual(registry.find(missing), None)
+        self.assertEqual(len(FakeDictionary.loaded), 1)
+
+    def test_lazy(self):
+        registry = DictionaryRegistry(loader=FakeDictionary)
+        handle = LazyDictionary(self.path, registry)
+        self.assertEqual(FakeDictionary.loaded, [])
+        self.assertTrue(handle.get() is registry.get(self.path))
+        self.assertEqual(len(FakeDictionary.loaded), 1)
+
+        handle = LazyDictionary(os.path.join(self.tmpdir, "en_US"), registry)
+        self.assertEqual(handle.get(), None)
+        self.assertEqual(len(FakeDictionary.loaded), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/python
+# -*- coding: utf-8  -*-
+
+"""Unit test for DumpReader
+"""
+
+import unittest
+import test_utils
+
+import bz2, os, shutil, tempfile
+from xml.sax.saxutils import escape
+from wikispell.DumpReader import DumpReader, MultistreamIndex
+
+HEADER = '<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.10/">\n' + \
+         '  <siteinfo>\n    <sitename>Wikipedia</sitename>\n  </siteinfo>\n'
+FOOTER = '</mediawiki>\n'
+
+def makePage(i):
+    title = u"Seite %s \xfcber" % i
+    text = u"Ein <b>Text</b> & mehr \xfcber %s\n" % i * (i % 5)
+    ns = "0" if i % 4 else "1"
+    xml = u"""  <page>
+    <title>%s</title>
+    <ns>%s</ns>
+    <id>%s</id>
+    <revision>
+      <id>%s</id>
+      <text xml:space="preserve">%s</text>
+    </revision>
+  </page>
+""" % (escape(title), ns, i * 10, i * 100, escape(text))
+    return (title, ns, str(i * 10), text), xml.encode("utf8")
+
+class DumpReaderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.pages = []
+        blocks = []
+        for i in range(1, 251):
+            page, xml = makePage(i)
+            self.pages.append(page)
+            blocks.append(xml)
+
+        content = HEADER + ''.join(blocks) + FOOTER
+        self.plain = os.path.join(self.tmpdir, "dump.xml")
+        f = open(self.plain, "wb")
+        f.write(content)
+        f.close()
+
+        self.compressed = os.path.join(self.tmpdir, "dump.xml.bz2")
+        f = open(self.compressed, "wb")
+        f.write(bz2.compress(content))
+        f.close()
+
+        # Streams of 100 pages as in pages-articles-multistream.xml.bz2
+        self.multistream = os.path.join(self.tmpdir, "dump-multistream.xml.bz2")
+        self.index = os.path.join(self.tmpdir, "dump-multistream-index.txt.bz2")
+        f = open(self.multistream, "wb")
+        index = bz2.BZ2File(self.index, "w")
+        f.write(bz2.compress(HEADER))
+        for k in range(0, len(blocks), 100):
+            for title, ns, pageid, text in self.pages[k:k+100]:
+                index.write((u"%s:%s:%s\n" % (f.tell(), pageid, title)).encode("utf8"))
+            f.write(bz2.compress(''.join(blocks[k:k+100])))
+        f.write(bz2.compress(FOOTER))
+        f.close()
+        index.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_parse(self):
+        for filename in [self.plain, self.compressed, self.multistream]:
+            reader = DumpReader(filename)
+            reader.chunk_size = 1000
+            pages = list(reader.parse())
+            self.assertEqual([(p.title, p.ns, p.id, p.text) for p in pages], self.pages)
+            self.assertEqual(pages[3].get(), self.pages[3][3])
+
+        reader = DumpReader(self.multistream)
+        self.assertEqual(len(set([p.offset for p in reader.parse()])), 3)
+        reader = DumpReader(self.compressed)
+        self.assertEqual(set([p.offset for p in reader.parse()]), set([0]))
+
+    def test_resume(self):
+        for filename in [self.plain, self.compressed, self.multistream]:
+            reader = DumpReader(filename)
+            reader.chunk_size = 1000
+            pages = list(reader.parse())
+            for k in [0, 99, 100, 150, 249]:
+                rest = list(reader.parse(pages[k].offset, after_id=pages[k].id))
+                self.assertEqual([(p.title, p.ns, p.id, p.text) for p in rest],
+                                 self.pages[k+1:])
+
+        self.assertTrue(DumpReader(self.plain).resumable())
+        self.assertTrue(DumpReader(self.multistream).resumable())
+        self.assertFalse(DumpReader(self.compressed).resumable())
+        reader = DumpReader(self.multistream)
+        reader.max_header_size = 10
+        reader.stream_chunk_size = 10
+        self.assertFalse(reader.resumable())
+
+    def test_index(self):
+        index = MultistreamIndex(self.index)
+        self.assertEqual(len(index), 250)
+        offset, pageid = index.by_title(self.pages[120][0])
+        self.assertEqual(pageid, self.pages[120][2])
+        self.assertEqual(index.by_id(pageid), offset)
+        self.assertEqual(index.by_title(u"Nicht da"), (None, None))
+
+        reader = DumpReader(self.multistream, index)
+        for k in [0, 99, 100, 249]:
+            title, ns, pageid, text = self.pages[k]
+            self.assertEqual(reader.get_page(title=title).text, text)
+            self.assertEqual(reader.get_page(pageid=pageid).title, title)
+        self.assertEqual(reader.get_page(title=u"Nicht da"), None)
+
+        titles = [self.pages[200][0], u"Nicht da", self.pages[3][0]]
+        self.assertEqual([p.id for p in reader.get_pages(titles=titles, pageids=[self.pages[7][2]])],
+                         [self.pages[200][2], self.pages[3][2], self.pages[7][2]])
+        self.assertEqual([p.id for p in reader.parse_from(title=self.pages[150][0])],
+                         [p[2] for p in self.pages[150:]])
+
+        self.assertRaises(ValueError, DumpReader(self.multistream).get_page, u"Seite")
+        index.close()
+
+    def test_index_database(self):
+        database = os.path.join(self.tmpdir, "index.sqlite")
+        index = MultistreamIndex(self.index, database)
+        offset, pageid = index.by_title(self.pages[120][0])
+        index.close()
+
+        # The table is only built once
+        os.remove(self.index)
+        index = MultistreamIndex(self.index, database)
+        self.assertEqual(len(index), 250)
+        self.assertEqual(index.by_title(self.pages[120][0]), (offset, pageid))
+        self.assertEqual(index.by_id(pageid), offset)
+        self.assertEqual(index.by_id("x"), None)
+        index.close()
+
+    def test_index_temporary(self):
+        reader = DumpReader(self.multistream, self.index)
+        database = reader.index._tmpfile
+        self.assertTrue(os.path.exists(database))
+        self.assertEqual(reader.get_page(title=self.pages[5][0]).id, self.pages[5][2])
+        reader.close()
+        self.assertFalse(os.path.exists(database))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/python
+# -*- coding: utf-8  -*-
+
+"""Unit test for SuggestionCache and the bounded caches
+"""
+
+import unittest
+import test_utils
+
+import os, shutil, tempfile
+from wikispell.LRUCache import LRUCache, GenerationalCache
+from wikispell.SuggestionCache import SuggestionCache, dictionary_fingerprint
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def test_lru(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        # b was used least recently
+        self.assertFalse('b' in cache)
+        self.assertEqual(cache.get('b', 5), 5)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+
+    def test_generational(self):
+        cache = GenerationalCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.put('c', 3)
+        self.assertEqual(len(cache), 3)
+        # a is moved back into the current generation
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('d', 4)
+        self.assertFalse('b' in cache)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.get('d'), 4)
+
+class SuggestionCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_cache(self):
+        filename = os.path.join(self.tmpdir, "suggestions.sqlite")
+        word = u"Deuschland".encode("utf8")
+        cache = SuggestionCache(filename, maxsize=1)
+        self.assertEqual(cache.get("de_DE", "fp", word), None)
+        cache.put("de_DE", "fp", word, ["Deutschland", "Deutschlands"])
+        cache.put("de_DE", "fp", "Bltz", [])
+        self.assertEqual(cache.get("de_DE", "fp", "Bltz"), [])
+        self.assertEqual(cache.get("de_DE", "fp", word), ["Deutschland", "Deutschlands"])
+        self.assertEqual(cache.get("de_CH", "fp", word), None)
+        self.assertEqual(cache.get("de_DE", "fp2", word), None)
+        self.assertEqual((cache.memory_hits, cache.disk_hits, cache.misses), (1, 1, 3))
+        cache.close()
+
+        # Suggestions are kept across runs
+        cache = SuggestionCache(filename)
+        self.assertEqual(cache.get("de_DE", "fp", word), ["Deutschland", "Deutschlands"])
+        self.assertEqual(cache.get("de_DE", "fp", "Bltz"), [])
+        self.assertEqual(cache.hits(), 2)
+        cache.close()
+
+    def test_fingerprint(self):
+        path = os.path.join(self.tmpdir, "de_DE")
+        for ext in [".dic", ".aff"]:
+            f = open(path + ext, "w")
+            f.write("1\nHaus\n")
+            f.close()
+        fp = dictionary_fingerprint(path)
+        self.assertEqual(fp, dictionary_fingerprint(path))
+        f = open(path + ".dic", "a")
+        f.write("Maus\n")
+        f.close()
+        self.assertNotEqual(fp, dictionary_fingerprint(path))
+
+if __name__ == "__main__":
+    unittest.main()
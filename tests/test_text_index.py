@@ -0,0 +1,46 @@
+#!/usr/bin/python
+# -*- coding: utf-8  -*-
+
+"""Unit test for TextIndex
+"""
+
+import unittest
+import test_utils
+
+import re
+from wikispell.TextIndex import TextIndex
+from wikispell.RuleBasedWordAnalyzer import RuleBasedWordAnalyzer
+
+TEXT = u"""'''Dogville''' ist ein Film von Lars von Trier. Grace flieht in das
+Dorf Dogville, wo die Bewohner sie aufnehmen. M\xfcller und Meier, Meiers Hund
+(Meier) a.b a.b, der Hund des Hundes und der Hund."""
+
+class TextIndexTestCase(unittest.TestCase):
+
+    def test_count(self):
+        index = TextIndex(TEXT)
+        for word in [u"Dogville", u"Grace", u"ll", u"er", u"a.b", u"ller", u"M\xfcller",
+                     u"Meier", u"Hund", u"xyz"]:
+            self.assertEqual(index.count(word), TEXT.count(word))
+            # Answers are memoized
+            self.assertEqual(index.count(word), TEXT.count(word))
+
+    def test_count_word(self):
+        index = TextIndex(TEXT)
+        for word in [u"Dogville", u"Grace", u"ll", u"er", u"a.b", u"ller", u"M\xfcller",
+                     u"Meier", u"Hund", u"xyz"]:
+            self.assertEqual(index.count_word(word),
+                             len(list(re.finditer(r'\b%s\b' % word, TEXT))))
+        self.assertRaises(re.error, index.count_word, u"(Meier")
+
+    def test_skip_word(self):
+        # Rule (e) gives the same answers with and without an index
+        analyzer = RuleBasedWordAnalyzer(3, 1, "DE", 0, set(), 0)
+        index = TextIndex(TEXT)
+        for match in re.finditer(r'\w+', TEXT, re.UNICODE):
+            word = match.group(0)
+            self.assertEqual(analyzer.skipWord(word, TEXT, match.start(), False, index=index),
+                             analyzer.skipWord(word, TEXT, match.start(), False))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -61,6 +61,48 @@ class TextrangeeParserTestCase(unittest.TestCase):
                          start=0, ignore_in = ignores )
         self.assertEqual(ranges.ranges, expected)
 
+    def test_find_range_interval_ignores(self):
+        # ignoring an IntervalIndex gives the same result as a list of positions
+        for sample in [testSamples.N_Chlorsuccinimid_rev80386547,
+                       testSamples.Aluminiumnitrat_rev69770393,
+                       testSamples.Kaliumpermanganat_rev73384760]:
+            ignores = []
+            for q in math_range( sample ): ignores.extend( range( q[0], q[1] ) )
+            expected = findRange( "{{", "}}", sample, ignore_in = ignores )
+            computed = findRange( "{{", "}}", sample,
+                                 ignore_in = IntervalIndex(math_range(sample)) )
+            self.assertEqual(expected.ranges, computed.ranges)
+            computed = findRanges( [("{{", "}}", None)], sample,
+                                 ignore_in = IntervalIndex(math_range(sample)) )
+            self.assertEqual(expected.ranges, computed[0].ranges)
+
+    def test_interval_index(self):
+        index = IntervalIndex([[10, 20], [15, 25], [30, 31], [40, 40]])
+        self.assertEqual(index.intervals(), [[10, 25], [30, 31]])
+        self.assertFalse(9 in index)
+        self.assertTrue(10 in index)
+        self.assertTrue(24 in index)
+        self.assertFalse(25 in index)
+        self.assertTrue(30 in index)
+        self.assertFalse(40 in index)
+        self.assertEqual(index.end_of(12), 25)
+        self.assertEqual(index.end_of(27), -1)
+        self.assertEqual(index.interval_at(12), [10, 25])
+        self.assertEqual(index.interval_at(27), None)
+        self.assertTrue(index.overlaps(0, 11))
+        self.assertFalse(index.overlaps(0, 10))
+        self.assertTrue(index.overlaps(24, 30))
+        self.assertFalse(index.overlaps(25, 30))
+        self.assertTrue(index.overlaps(26, 35))
+
+    def test_ranges_interval_index(self):
+        sample = testSamples.Kaliumpermanganat_rev73384760
+        ranges = findRange( "{{", "}}", sample)
+        large_ranges = set(ranges.get_large_ranges())
+        index = ranges.get_interval_index()
+        for pos in range(len(sample)):
+            self.assertEqual(pos in large_ranges, index.contains(pos))
+
     def test_find_range_test0(self):
         #test without any ignoring, only ranges per se
         sample = testSamples.Kaliumpermanganat_rev73384760
@@ -72,6 +114,26 @@ class TextrangeeParserTestCase(unittest.TestCase):
                          start=0, ignore_in = ignores )
         self.assertEqual(ranges.ranges, expected)
 
+    def test_find_ranges(self):
+        # findRanges has to give the same result as individual findRange calls
+        albr = ['</ref', '\n', '}}']
+        extrabr = ['"', "'", u'\u201d', u'\u201c']
+        delimiters = [('{{', '}}', None), ('[[', ']]', None),
+                      ('<!--', '-->', None), (u'{|', u'|}', None),
+                      ('"', '"', albr + extrabr), (u'\u201e', u'\u201c', albr),
+                      ("''", "''", albr), ("'''", "'''", albr)]
+        for sample in [testSamples.test_sample1, testSamples.test_sample2,
+                       testSamples.Kaliumpermanganat_rev73384760,
+                       testSamples.Aluminiumnitrat_rev69770393,
+                       testSamples.N_Chlorsuccinimid_rev80386547]:
+            computed = findRanges(delimiters, sample)
+            self.assertEqual(len(computed), len(delimiters))
+            for d, r in zip(delimiters, computed):
+                expected = findRange(d[0], d[1], sample, alternativeBreak=d[2])
+                self.assertEqual(expected.ranges, r.ranges)
+                self.assertEqual(expected.match, r.match)
+                self.assertEqual(expected.not_matching, r.not_matching)
+
     def test_find_range_unmatched_opening(self):
         sample = """{{Lorem ipsum dolor }} sit amet, {{ consectetur {{adipisicing elit, {{sed do eiusmod}} tempor incididunt ut laboreet dolore  """
         ranges = findRange( "{{", "}}", sample, start=0)
@@ -91,6 +153,8 @@ class TextrangeeParserTestCase(unittest.TestCase):
         ignores = []
         for q in math_range( sample ): ignores.extend( range( q[0], q[1] ) )
         self.assertEqual(283, find_next_unignored( sample, 0, '}}', ignores))
+        self.assertEqual(283, find_next_unignored( sample, 0, '}}',
+                                                  ignoreranges(sample, ['math'])))
 
     def test_math_range(self):
         sample = testSamples.test_sample1
@@ -212,6 +276,9 @@ class TextrangeeParserTestCase(unittest.TestCase):
         self.assertEqual(len(result), 2 )
         self.assertEqual(result[0], '{{template_name |key1 = value1 ' )
         self.assertEqual(result[1], 'key2 = value2}}' )
+        result = split_with_ignores(text, '|', IntervalIndex([[0, 20]]))
+        self.assertEqual(len(result), 2 )
+        self.assertEqual(result[0], '{{template_name |key1 = value1 ' )
 
     def test_references_range(self):
         text = """
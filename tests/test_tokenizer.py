@@ -0,0 +1,67 @@
+#!/usr/bin/python
+# -*- coding: utf-8  -*-
+
+"""Unit test for the tokenizer
+"""
+
+import unittest
+import test_utils
+
+from wikispell import tokenizer
+from wikispell.Word import Word
+
+class TokenizerTestCase(unittest.TestCase):
+
+    def test_derive(self):
+        self.assertEqual(tokenizer.derive(u"(Haus),"), u"Haus")
+        self.assertEqual(tokenizer.derive(u"[[Haus|Häuser]]."), u"Häuser")
+        self.assertEqual(tokenizer.derive(u"[[Kategorie:Haus]]"), u"")
+        self.assertEqual(tokenizer.derive(u"„Haus“"), u"Haus")
+        self.assertEqual(tokenizer.derive(u"12.3"), u"")
+        self.assertEqual(tokenizer.derive(u"http://www.example.org"), u"")
+        self.assertEqual(tokenizer.derive(u"..."), u"")
+        self.assertEqual(tokenizer.derive(u""), u"")
+        self.assertEqual(Word(u"[[Haus]]").derive(), u"Haus")
+
+    def test_tokenize(self):
+        text = u"Ein [[Haus|Häuser]] am See&nbsp;Ufer, Nord–Süd und x-y."
+        tokens = list(tokenizer.tokenize(text))
+        self.assertEqual([t[3] for t in tokens],
+                         [u"Ein", u"Häuser", u"am", u"See", u"Ufer", u"Nord", u"Süd", u"und", u"x", u"y"])
+        for start, end, raw, derived in tokens:
+            self.assertEqual(text[start:end], raw)
+
+        # Words in forbidden ranges are left out
+        tokens = list(tokenizer.tokenize(text, ranges=[(4, 19)]))
+        self.assertEqual([t[3] for t in tokens][:2], [u"Ein", u"am"])
+
+    def test_tokenize_bytes(self):
+        # ASCII byte strings give the same words as unicode texts
+        text = u"Ein [[Haus|Huts]] am See&nbsp;Ufer, Nord-Sued und x--y."
+        tokens = list(tokenizer.tokenize(text.encode("ascii")))
+        self.assertEqual(tokens, list(tokenizer.tokenize(text)))
+        self.assertEqual([t[3] for t in tokens],
+                         ["Ein", "Huts", "am", "See", "Ufer", "Nord", "Sued", "und", "x", "y"])
+        self.assertEqual(type(tokens[0][2]), str)
+        # The dash only occurs in unicode texts
+        self.assertEqual([t[3] for t in tokenizer.tokenize(u"Nord–Süd")], [u"Nord", u"Süd"])
+
+    def test_range_ends(self):
+        text = u"Ein {{Vorlage}}Wort hier"
+        start = text.find(u"}}") + 2
+        tokens = list(tokenizer.tokenize(text, ranges=[(4, start)], range_ends=set([start])))
+        self.assertEqual([t[2] for t in tokens], [u"Ein", u"hier"])
+
+    def test_windows(self):
+        text = u"Ein [[Haus]] am See, Nord–Süd und {{x}} hier"
+        windows = [(4, 12), (21, 29), (40, len(text))]
+        tokens = list(tokenizer.tokenize(text, windows=windows))
+        self.assertEqual([t[3] for t in tokens], [u"Haus", u"Nord", u"Süd", u"hier"])
+        self.assertEqual(tokens, [t for t in tokenizer.tokenize(text)
+                                  if any(s <= t[0] < e for s, e in windows)])
+        # Ranges are skipped within the windows as well
+        tokens = list(tokenizer.tokenize(text, ranges=[(0, 12), (34, 39)], windows=[(4, 12), (34, 44)]))
+        self.assertEqual([t[3] for t in tokens], [u"hier"])
+
+if __name__ == "__main__":
+    unittest.main()
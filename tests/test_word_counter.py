@@ -0,0 +1,83 @@
+#!/usr/bin/python
+# -*- coding: utf-8  -*-
+
+"""Unit test for WordCounter
+"""
+
+import unittest
+import test_utils
+
+import os, random
+from collections import Counter
+from wikispell.WordCounter import WordCounter
+from wikispell.DumpReader import DumpPage
+from wikispell.BlacklistSpellchecker import BlacklistSpellchecker
+from wikispell.ParallelWordCounter import ParallelWordCounter, count_words
+from wikispell.WordFrequencyStore import SQLiteWordFrequencyStore
+
+class WordCounterTestCase(unittest.TestCase):
+
+    def test_count(self):
+        counter = WordCounter(max_words=2)
+        try:
+            counter.add([u"Haus", u"Boot", u"Haus"])
+            counter.add([u"Zug", u"Straße".encode("utf8"), u"Haus"])
+            self.assertEqual(counter.runs(), 3)
+            self.assertEqual(list(counter.items()),
+                             [(1, "Boot"), (3, "Haus"), (1, u"Straße".encode("utf8")), (1, "Zug")])
+        finally:
+            counter.close()
+
+    def test_same_as_in_memory(self):
+        rnd = random.Random(42)
+        vocabulary = [u"wort%s" % i for i in range(500)] + [u"Über", u"über", u"Straße", u"a b"]
+        words = [rnd.choice(vocabulary) for i in range(5000)]
+        expected = sorted((v, k.encode("utf8")) for k, v in Counter(words).iteritems())
+        for max_words, max_runs in [(1, 100), (7, 4), (100, 2), (10000, 100)]:
+            counter = WordCounter(max_words=max_words, max_runs=max_runs)
+            try:
+                for i in range(0, len(words), 1000):
+                    counter.add(words[i:i+1000])
+                self.assertEqual(sorted(counter.items()), expected)
+            finally:
+                tmpdir = counter._tmpdir
+                counter.close()
+            self.assertFalse(os.path.exists(tmpdir))
+
+    def test_load_store(self):
+        counter = WordCounter(max_words=3)
+        try:
+            counter.add([u"Haus", u"Boot", u"Haus", u"Zug", u"haus", u"Boot", u"Haus"])
+            store = SQLiteWordFrequencyStore(":memory:")
+            store.load(counter.items())
+            self.assertEqual(store.frequent_words(1), [(3, "Haus"), (2, "Boot")])
+            self.assertEqual(store.max_occurrences(["HAUS"]), {"haus" : 3})
+        finally:
+            counter.close()
+
+    def test_parallel(self):
+        texts = [u"Das Haus ist ein Haus. Das Boot.",
+                 u"Ein Boot und ein [[Haus]] und {{Vorlage|Straße}} und Straße.",
+                 u"Die ''Straße'' im Dorf, das Dorf am See.",
+                 u"Ein Satz mit www.example.org und 1234 und [[Datei:Bild.jpg]]."] * 5
+        pages = [DumpPage(u"Seite %s" % i, "0", str(i), text) for i, text in enumerate(texts)]
+
+        sp = BlacklistSpellchecker()
+        expected = WordCounter()
+        parallel = WordCounter(max_words=5)
+        parallelCounter = ParallelWordCounter(2, batch_size=3, queue_size=2)
+        try:
+            for page in pages:
+                expected.add(sp.spellcheck_blacklist(page.text, {}, return_for_db=True))
+            for counts in parallelCounter.count_pages(iter(pages)):
+                parallel.add_counts(counts)
+            self.assertEqual(list(parallel.items()), list(expected.items()))
+            self.assertEqual(sorted(count_words(texts, sp).iteritems()),
+                             [(w, c) for c, w in expected.items()])
+        finally:
+            parallelCounter.close()
+            expected.close()
+            parallel.close()
+
+if __name__ == "__main__":
+    unittest.main()
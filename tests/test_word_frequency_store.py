@@ -0,0 +1,145 @@
+#!/usr/bin/python
+# -*- coding: utf-8  -*-
+
+"""Unit test for WordFrequencyStore
+"""
+
+import unittest
+import test_utils
+
+import os, shutil, sys, tempfile, types
+from wikispell.WordFrequencyStore import MySQLWordFrequencyStore, SQLiteWordFrequencyStore
+
+try:
+    import Levenshtein
+except ImportError:
+    # Stub with the same results as the Levenshtein module
+    from wikispell.BKTree import levenshtein
+    def _ratio(a, b):
+        # Substitutions count as two edits in Levenshtein.ratio
+        previous = range(len(b) + 1)
+        for i, ca in enumerate(a):
+            current = [i + 1]
+            for j, cb in enumerate(b):
+                current.append(min(previous[j + 1] + 1, current[j] + 1,
+                                   previous[j] + 2 * (ca != cb)))
+            previous = current
+        total = len(a) + len(b)
+        return (total - previous[-1]) / float(total or 1)
+    Levenshtein = types.ModuleType("Levenshtein")
+    Levenshtein.distance = levenshtein
+    Levenshtein.ratio = _ratio
+    sys.modules["Levenshtein"] = Levenshtein
+
+ROWS = [(1200, "Haus"), (3, "Huas"), (5, "Hasu"), (2, "haus"), (1500, "Straße"),
+        (4, "Strase"), (1, "STRASSE"), (7, "Straßenbahn"), (2, "Hausboot")]
+
+class SQLiteWordFrequencyStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.store = SQLiteWordFrequencyStore(":memory:")
+        self.store.load(iter(ROWS), chunksize=4)
+
+    def test_frequent_words(self):
+        self.assertEqual(self.store.frequent_words(1000), [(1500, "Straße"), (1200, "Haus")])
+        # Lengths are counted in bytes as in MySQL
+        self.assertEqual(self.store.frequent_words(1000, 5, 6), [])
+        self.assertEqual(self.store.frequent_words(1000, 6, 7), [(1500, "Straße")])
+        self.assertEqual(self.store.frequent_words(0, 10), [(7, "Straßenbahn")])
+
+    def test_rare_words(self):
+        self.assertEqual(sorted(self.store.rare_words(5)),
+                         [(1, "STRASSE"), (2, "Hausboot"), (2, "haus"), (3, "Huas"), (4, "Strase")])
+
+    def test_words_like(self):
+        self.assertEqual(self.store.words_like("Ha%", "Haus%", 20), [(5, "Hasu")])
+        self.assertEqual(self.store.words_like("H%s%", "Haus%", 20), [(5, "Hasu"), (3, "Huas")])
+        self.assertEqual(self.store.words_like("Stra%", "Straße%", 20), [(4, "Strase"), (1, "STRASSE")])
+        # Quotes are passed as parameters
+        self.assertEqual(self.store.words_like("d'%", "x%", 20), [])
+
+    def test_occurrences(self):
+        self.assertEqual(sorted(self.store.occurrences("HAUS")), [(2, "haus"), (1200, "Haus")])
+        self.assertEqual(self.store.occurrences("STRASSE"), [(1, "STRASSE")])
+        self.assertEqual(self.store.occurrences("O'Neil"), [])
+
+    def test_max_occurrences(self):
+        self.store.load(ROWS + [(6, "O'Neil"), (9, "o'neil")])
+        self.assertEqual(self.store.max_occurrences(["Haus", "HAUS", "huas", "Strasse", "O'Neil", "Zug"]),
+                         {"haus" : 1200, "huas" : 3, "strasse" : 1, "o'neil" : 9})
+        self.assertEqual(self.store.max_occurrences(["Haus", "Hausboot", "Hasu"], chunksize=1),
+                         {"haus" : 1200, "hausboot" : 2, "hasu" : 5})
+        self.assertEqual(self.store.max_occurrences([]), {})
+
+    def test_file(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, "words.sqlite")
+            store = SQLiteWordFrequencyStore(filename, "countedwords_test")
+            store.load(ROWS)
+            store.close()
+            store = SQLiteWordFrequencyStore(filename, "countedwords_test")
+            self.assertEqual(len(store.rare_words(10000)), len(ROWS))
+            # Loading again replaces the table
+            store.load(ROWS[:2])
+            self.assertEqual(len(store.rare_words(10000)), 2)
+            store.close()
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_build_index(self):
+        from wikispell.WordFrequencyChecker import WordFrequencyChecker
+        checker = WordFrequencyChecker(None, hunspell_dict="/nonexistent/de_DE")
+        index = checker.build_index(self.store, occurence_cutoff=20)
+        self.assertEqual(len(index), 7)
+        self.assertEqual(index.find(u"Haus", 1), [(1, u"haus", 2)])
+
+    def test_find_candidates(self):
+        from wikispell.WordFrequencyChecker import WordFrequencyChecker
+        checker = WordFrequencyChecker(None, hunspell_dict="/nonexistent/de_DE")
+        store = SQLiteWordFrequencyStore(":memory:")
+        store.load([(5000, "Bundesregierung"), (3, "bundesregierungs"), (2, "Bundesregirung"),
+                    (4, "Bundesreigerung"), (1, "Bundesregierungen"), (2, "Bundesregierunk"),
+                    (40, "bundesregirung"), (1, "Bundesrat"), (1, "Hausboot")])
+        index = checker.build_index(store, occurence_cutoff=20)
+        for myw in [u"Bundesregierung", u"Hausbot"]:
+            queried = checker.find_candidates(myw, store, occurence_cutoff=20, lcutoff=0.8, ldistance=3)
+            indexed = checker.find_candidates(myw, store, occurence_cutoff=20, lcutoff=0.8, ldistance=3,
+                                              index=index)
+            self.assertEqual(sorted(indexed), sorted(queried))
+        # Case variants starting with the word are left out in both
+        self.assertEqual(sorted(indexed), ["Hausboot"])
+        self.assertEqual(sorted(checker._index_candidates(u"Bundesregierung", index, 20, 0.8, 3)),
+                         ["Bundesregierunk", "Bundesregirung", "Bundesreigerung"])
+
+class _RecordingCursor(object):
+    def __init__(self):
+        self.queries = []
+    def execute(self, query, params=()):
+        self.queries.append(query)
+    def executemany(self, query, rows):
+        self.queries.append(query)
+        list(rows)
+
+class _RecordingConnection(object):
+    def __init__(self):
+        self.cursor_ = _RecordingCursor()
+    def cursor(self):
+        return self.cursor_
+    def commit(self):
+        pass
+
+class MySQLWordFrequencyStoreTestCase(unittest.TestCase):
+
+    def test_load(self):
+        connection = _RecordingConnection()
+        store = MySQLWordFrequencyStore(connection, "wikiwords.countedwords_test")
+        store.load(ROWS)
+        self.assertEqual(connection.cursor_.queries, [
+            "create table wikiwords.countedwords_test (occurence int, smallword varchar(255)) ENGINE = MYISAM",
+            "insert into wikiwords.countedwords_test (occurence, smallword) values (%s, %s)",
+            "create index countedwords_test_occurence on wikiwords.countedwords_test (occurence)",
+            "create index countedwords_test_smallword on wikiwords.countedwords_test (smallword)"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+#!/usr/bin/python
+# -*- coding: utf-8  -*-
+"""
+
+Script to convert word lists into the binary format that the spellcheck
+scripts load without parsing (the files are recognized automatically)
+
+Run this script with 3 or more arguments
+- the type of list: "common_words" (one word per line, as for the
+  -common_words: option of spellcheck_hunspell.py) or "blacklist" (wrong and
+  correct word separated by ";", as for the -blacklist: option of
+  spellcheck_wordlist.py)
+- the output file
+- one or more input files
+
+For example
+
+    python tools/compile_wordlist.py common_words common.bin lists/de/common_15.dic
+    python spellcheck_hunspell.py -common_words:common.bin ...
+"""
+
+import sys
+
+from wikispell.CompactWordSet import CompactWordSet
+from wikispell.SpellcheckLib import readBlacklist, compileBlacklist
+
+listtype = sys.argv[1]
+output = sys.argv[2]
+inputs = sys.argv[3:]
+
+if listtype == "common_words":
+    words = CompactWordSet.from_files(inputs)
+    words.save(output)
+    print "Wrote %s common words to %s" % (len(words), output)
+elif listtype == "blacklist":
+    badDict = {}
+    for filename in inputs:
+        readBlacklist(filename, badDict)
+    compileBlacklist(output, badDict)
+    print "Wrote %s blacklist entries to %s" % (len(badDict), output)
+else:
+    print "Unknown type of list", listtype
+    sys.exit(1)
@@ -0,0 +1,87 @@
+#!/usr/bin/python
+# -*- coding: utf-8  -*-
+"""
+
+Script to count the words of an xml dump of Wikipedia and write the counts to
+a table (occurence, smallword) for spellcheck_wordfrequency.py
+
+find the dumps here:
+
+https://dumps.wikimedia.org/dewiki/latest/
+
+The words are counted in memory until --max_words distinct words are reached,
+then the counts are written to a sorted file on disk (in --tmpdir) and
+counting starts again. At the end, these files are merged and the table is
+written in one go. The memory needed therefore does not grow with the size
+of the dump (unlike setup_mysql_in_memory.py) and only the distinct words of
+each part of the dump are written to disk (unlike setup_mysql.py).
+
+With --workers, the pages are split into batches that are counted by several
+processes in parallel (the dump is still read sequentially), the result is
+the same as with a single process.
+
+Potential usage:
+
+    python tools/count_words.py dewiki-latest-pages-articles.xml.bz2 countedwords --sqlite countedwords.sqlite
+    python tools/count_words.py dewiki-latest-pages-articles.xml.bz2 wikiwords.countedwords_20161020 --workers 8
+"""
+
+import argparse, sys, time
+
+from wikispell.BlacklistSpellchecker import BlacklistSpellchecker
+from wikispell.DumpReader import DumpReader
+from wikispell.ParallelWordCounter import ParallelWordCounter
+from wikispell.WordCounter import WordCounter
+from wikispell.WordFrequencyStore import MySQLWordFrequencyStore, SQLiteWordFrequencyStore
+
+parser = argparse.ArgumentParser()
+parser.add_argument('xml_dump', help="location of the xml dump (dewiki-latest-pages-articles.xml.bz2)")
+parser.add_argument('table', help="table to create")
+parser.add_argument('--sqlite', dest="sqlite", default=None, help="SQLite file to create the table in (instead of MySQL)")
+parser.add_argument('--mysql_config', dest="mysql_config", default="~/.my.cnf.hroest", help="MySQL config file")
+parser.add_argument('--max_words', dest="max_words", default=5000000, type=int, help="Maximal number of distinct words counted in memory before they are written to disk")
+parser.add_argument('--workers', dest="workers", default=1, type=int, help="Number of processes counting the words")
+parser.add_argument('--tmpdir', dest="tmpdir", default=None, help="Directory for the temporary files")
+
+args = parser.parse_args(sys.argv[1:])
+
+print "Working with file", args.xml_dump
+print "Working with table", args.table
+
+def articles(counter):
+    for i, page in enumerate(DumpReader(args.xml_dump).parse()):
+        if not page.ns == '0':
+            continue
+
+        if i % 1000 == 0:
+            print i, page.title, "runs on disk", counter.runs()
+
+        yield page
+
+start = time.time()
+counter = WordCounter(max_words=args.max_words, tmpdir=args.tmpdir)
+try:
+    if args.workers > 1:
+        parallelCounter = ParallelWordCounter(args.workers)
+        try:
+            for counts in parallelCounter.count_pages(articles(counter)):
+                counter.add_counts(counts)
+        finally:
+            parallelCounter.close()
+    else:
+        sp = BlacklistSpellchecker()
+        for page in articles(counter):
+            counter.add(sp.spellcheck_blacklist(page.text, {}, return_for_db=True))
+
+    print "Counted words in %0.1fs, merging %s runs" % (time.time() - start, counter.runs())
+
+    if args.sqlite is not None:
+        store = SQLiteWordFrequencyStore(args.sqlite, args.table)
+    else:
+        store = MySQLWordFrequencyStore.connect(args.table, args.mysql_config)
+    store.load(counter.items())
+    store.close()
+finally:
+    counter.close()
+
+print "Done in %0.1fs" % (time.time() - start)
@@ -14,6 +14,9 @@ Run this script with 2 arguments
 
 This script will simply create a single table with all words, which then needs
 to processed further. Note that this can be disk-space intensive.
+
+To count the words of a large dump in bounded memory, use count_words.py
+instead.
 """ 
 
 import MySQLdb
@@ -8,15 +8,19 @@ find the dumps here:
 
 https://dumps.wikimedia.org/dewiki/latest/
 
-Run this script with 2 arguments
+Run this script with 2 or 3 arguments
 - location of the xml dump (dewiki-latest-pages-articles.xml.bz2)
 - mysql table to create
+- optionally an SQLite file: the table is then created in this file instead of
+  in MySQL (and can be used with spellcheck_wordfrequency.py --sqlite)
 
 This script will keep all words in memory and write them to a table after
 processing a whole XML dump.  Note that this can be memory intensive.
+
+To count the words of a large dump in bounded memory, use count_words.py
+instead.
 """ 
 
-import MySQLdb
 import spellcheck
 import wikipedia as pywikibot
 import pagegenerators
@@ -25,10 +29,14 @@ import sys
 import xmlreader
 
 from wikispell.BlacklistSpellchecker import BlacklistSpellchecker
+from wikispell.WordFrequencyStore import MySQLWordFrequencyStore, SQLiteWordFrequencyStore
 
 MYSQL_CONFIG = "~/.my.cnf.hroest"
 xml_dump = sys.argv[1]
 table = sys.argv[2]
+sqlite_file = None
+if len(sys.argv) > 3:
+    sqlite_file = sys.argv[3]
 
 print "Working with file", xml_dump
 print "Working with table", table
@@ -50,20 +58,9 @@ for i, page in enumerate(gen):
         tmp = res.get( p[1], 0)
         res[ p[1] ] = tmp+1
 
-db = MySQLdb.connect(read_default_file=MYSQL_CONFIG)
-db.autocommit(True)
-cursor = db.cursor()
-
-cursor.execute( """create table %s (
-    occurence int,
-    smallword varchar(255)
-) ENGINE = MYISAM; """ % table)
-
-insert_table = "insert into %s" % table
-for k,v in res.iteritems():
-    tmp = cursor.execute( insert_table + " (occurence, smallword) values (%s,%s)", (v,k) )
-
-
-cursor.execute( """alter table %s add index(occurence) """ % table)
-cursor.execute( """alter table %s add index(smallword) """ % table)
+if sqlite_file is not None:
+    store = SQLiteWordFrequencyStore(sqlite_file, table)
+else:
+    store = MySQLWordFrequencyStore.connect(table, MYSQL_CONFIG)
 
+store.load( (v, k) for k, v in res.iteritems() )
@@ -11,6 +11,7 @@ A base class for different spellcheckers
 import time, sys
 import re, string
 import textrange_parser
+import tokenizer
 
 def findRange(opening, closing, text, start=0, alternativeBreak = None,
              ignore_in = [] ):
@@ -51,39 +52,41 @@ class abstract_Spellchecker(object):
         albr = ['</ref', '\n', '}}'] # alternative breaks
         extrabr = ['"', "'", u'\u201d', u'\u201c'] # extra breaks
 
-        ran.extend(findRange('{{', '}}', text)[0] )      #templates
-        ran.extend(findRange('[[', ']]', text)[0] )      #wiki links
-        ran.extend(findRange('<!--', '-->', text)[0] )   #comments
-
-        ran.extend(findRange(u'{|', u'|}', text)[0] )    #tables
+        # All delimited ranges are found in a single pass over the text, see
+        # textrange_parser.findRanges
+        delimiters = [
+            ('{{', '}}', None),         #templates
+            ('[[', ']]', None),         #wiki links
+            ('<!--', '-->', None),      #comments
+            (u'{|', u'|}', None),       #tables
+        ]
 
         # Quotation marks
         # See https://de.wikipedia.org/wiki/Anf%C3%BChrungszeichen#Kodierung
 
         if level in ["full", "moderate-legacy"]:
-            # Simple quotation marks
-            ran.extend(findRange('\"', '\"', text,
-                alternativeBreak = albr + extrabr)[0] )
+            delimiters.extend([
+                # Simple quotation marks
+                ('\"', '\"', albr + extrabr),
 
-            # French quotation marks
-            ran.extend(findRange(u'«', u'»', text,
-                alternativeBreak = albr)[0] )
+                # French quotation marks
+                (u'«', u'»', albr),
 
-            # Double quotation marks German: „“ ->  \u201e and \u201c
-            ran.extend(findRange(u'\u201e', u'\u201c', text,
-                alternativeBreak = albr + extrabr)[0] )
+                # Double quotation marks German: „“ ->  \u201e and \u201c
+                (u'\u201e', u'\u201c', albr + extrabr),
 
-            #  -> also do the above without the extra breaks as to not abort early
-            ran.extend(findRange(u'\u201e', u'\u201c', text,
-                 alternativeBreak = albr)[0] )
-            ran.extend(findRange('\"', '\"', text,
-                alternativeBreak = albr)[0] )
+                #  -> also do the above without the extra breaks as to not abort early
+                (u'\u201e', u'\u201c', albr),
+                ('\"', '\"', albr),
+            ])
 
-        ran.extend(findRange('\'\'', '\'\'', text,
-            alternativeBreak = albr)[0] )                #italic
+        delimiters.extend([
+            ('\'\'', '\'\'', albr),             #italic
+            ('\'\'\'', '\'\'\'', albr),         #bold
+        ])
 
-        ran.extend(findRange('\'\'\'', '\'\'\'', text,
-            alternativeBreak = albr)[0] )                #bold
+        for r in textrange_parser.findRanges(delimiters, text):
+            ran.extend(r.ranges)
 
         # Regex-based ranges ... 
         ran.extend( textrange_parser.hyperlink_range(text) )
@@ -116,6 +119,9 @@ class abstract_Spellchecker(object):
             mm = re.search("==\s*External links\s*==", text)
             if mm: ran.append( [mm.start(), len(text)] )
 
+        if removeNested and mergeRanges:
+            return self.normalize_ranges(ran)
+
         if removeNested:
             ran = self.remove_nested_ranges(ran)
 
@@ -124,6 +130,32 @@ class abstract_Spellchecker(object):
 
         return ran
 
+    def normalize_ranges(self, ran):
+        """ Remove nested ranges and merge the remaining ones.
+
+        Gives the same result as merge_ranges(remove_nested_ranges(ran)) but
+        only sorts once and then processes all ranges in a single sweep.
+
+        After sorting, a range is nested in one of the previously accepted
+        ranges exactly if it does not extend beyond the largest end seen so
+        far, which is always the end of the last merged range.
+        """
+        tmp = []
+        for r in sorted(ran):
+            if len(tmp) > 0:
+                # Nested in a previous range
+                if r[1] <= tmp[-1][1]:
+                    continue
+
+                # Candidate for merge
+                if tmp[-1][1] + 1 >= r[0]:
+                    tmp[-1][1] = r[1]
+                    continue
+
+            tmp.append([r[0], r[1]])
+
+        return tmp
+
     def merge_ranges(self, ran):
         tmp = []
 
@@ -167,64 +199,9 @@ class abstract_Spellchecker(object):
     def check_in_ranges(self, ranges, wordStart, wordEnd, curr_r, loc):
         """ Check for the next skippable range and move loc across it.
 
-        Args:
-            ranges( list(pair)) : a list of ranges (a pair of start/end
-                                  position) which should be skipped
-            wordStart(int) : a start position of the current word
-            wordEnd(int) : an end position of the current word
-            curr_r(int) : current range pointer
-            loc(int) : current text cursor position 
-
-        Returns:
-            tuple(curr_r, loc, current_context)
-            - curr_r: this contains the new current range pointer (which range is current)
-            - loc: this contains the new current text cursor
-            - current_context: True if context should be skipped, False otherwise
+        See tokenizer.check_in_ranges
         """
-       
-        wordMiddle = 0.5*(wordStart + wordEnd)
-
-        # Check if the current match is contained in the next range 
-        if curr_r < len(ranges) and \
-          ( (ranges[curr_r][0] <= wordMiddle and ranges[curr_r][1] > wordMiddle) or \
-            (ranges[curr_r][0] <= loc and ranges[curr_r][1] > loc) ):
-
-            # Update the current location to the end of the range
-            loc = ranges[curr_r][1]
-
-            # Choose location as end of next range while location is smaller
-            # than the start of the range
-            while curr_r < len(ranges) and ranges[curr_r][0] < loc:
-
-                # Only update location if the new location would be larger
-                if loc < ranges[curr_r][1]:
-                    loc = ranges[curr_r][1]
-
-                curr_r += 1
-
-            return curr_r, loc, True
-
-        # Check if current range needs to be advanced
-
-        is_advanced = False
-        while curr_r < len(ranges) and ranges[curr_r][0] < loc:
-            curr_r += 1
-
-            # Advance location if necessary
-            if curr_r < len(ranges) and \
-              ( (ranges[curr_r][0] <= wordMiddle and ranges[curr_r][1] > wordMiddle) or \
-                (ranges[curr_r][0] <= loc and ranges[curr_r][1] > loc) ):
-
-                # Update the current location to the end of the range
-                loc = ranges[curr_r][1]
-                is_advanced = True
-
-        # Also return true if we advanced the ptr
-        if is_advanced:
-            return curr_r, loc, True
-
-        # Else, return the input parameters and 
-        return curr_r, loc, False
+        return tokenizer.check_in_ranges(ranges, wordStart, wordEnd, curr_r, loc)
 
 if __name__ == "__main__":
     pass
@@ -0,0 +1,109 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+A BK-tree to find all words within a given edit distance of a word
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+try:
+    from Levenshtein import distance as _distance
+except ImportError:
+    _distance = None
+
+def levenshtein(a, b):
+    """ Returns the edit distance between a and b (as Levenshtein.distance) """
+    if len(a) < len(b):
+        a, b = b, a
+    previous = range(len(b) + 1)
+    for i, ca in enumerate(a):
+        current = [i + 1]
+        for j, cb in enumerate(b):
+            current.append(min(previous[j + 1] + 1,
+                               current[j] + 1,
+                               previous[j] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+if _distance is None:
+    _distance = levenshtein
+
+class BKTree(object):
+    """ An index of words for approximate (edit distance) lookups
+
+    A BK-tree stores each word as a child of a node at the edit distance
+    between the two words. Because the edit distance is a metric, a search
+    for all words within distance k of a word only needs to follow the
+    children whose distance to their parent differs by at most k from the
+    distance of the word to that parent.
+
+    Words whose lengths differ by more than k are never within distance k,
+    therefore there is one tree per word length and a search only visits the
+    trees of lengths len(word) - k to len(word) + k.
+
+    Each word can carry a value (e.g. its number of occurrences).
+
+    Possible usage
+    >>> tree = BKTree()
+    >>> tree.add(u'Schweiz', 1000)
+    >>> tree.add(u'Schwiez', 3)
+    >>> tree.find(u'Schweitz', 2)
+    [(1, u'Schweiz', 1000), (2, u'Schwiez', 3)]
+    """
+
+    def __init__(self, distance=None):
+        if distance is None:
+            distance = _distance
+        self._distance = distance
+        # One tree per word length, each node is [word, value, children]
+        self._trees = {}
+        self._size = 0
+
+    def add(self, word, value=None):
+        """ Adds a word (a word that is already in the tree gets the new value) """
+        node = self._trees.get(len(word))
+        if node is None:
+            self._trees[len(word)] = [word, value, {}]
+            self._size += 1
+            return
+
+        distance = self._distance
+        while True:
+            d = distance(word, node[0])
+            if d == 0:
+                node[1] = value
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [word, value, {}]
+                self._size += 1
+                return
+            node = child
+
+    def find(self, word, k):
+        """ Returns (distance, word, value) for all words within distance k
+
+        The result is sorted by distance and word.
+        """
+        distance = self._distance
+        result = []
+        for length in range(max(0, len(word) - k), len(word) + k + 1):
+            tree = self._trees.get(length)
+            if tree is None:
+                continue
+            stack = [tree]
+            while stack:
+                node = stack.pop()
+                d = distance(word, node[0])
+                if d <= k:
+                    result.append( (d, node[0], node[1]) )
+                for dd, child in node[2].iteritems():
+                    if d - k <= dd <= d + k:
+                        stack.append(child)
+        result.sort()
+        return result
+
+    def __len__(self):
+        return self._size
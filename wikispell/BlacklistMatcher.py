@@ -0,0 +1,317 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+Multi-pattern matchers that find the words of a blacklist in a text
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+import bisect, re, string
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+class BlacklistMatcher(object):
+    """ Find all words of a blacklist that occur in a text
+
+    The matcher builds an Aho-Corasick automaton from the keys of a blacklist
+    once and then finds all keys occurring in a text in a single pass. It uses
+    the pyahocorasick module if it is installed and a pure Python automaton
+    otherwise.
+
+    Before matching, the text is lowercased and square brackets are removed
+    (as Word.derive does for the words found by the BlacklistSpellchecker),
+    so that e.g. "[[Deu]]schland" is found. Keys containing a space can only
+    be produced by Word.derive from a non-breaking space (U+00A0 or "nbsp;")
+    and are searched in these forms. The matcher does not follow the other
+    transformations of Word.derive, e.g. for a barred link such as
+    "Deu[[x|schland]]" derive removes the link target and joins the text
+    around it, which the matcher does not find.
+
+    Possible usage
+    >>> matcher = BlacklistMatcher({'deuschland' : 'Deutschland'})
+    >>> matcher.find_candidates(text)
+    set(['deuschland'])
+    >>> matcher.find_hits(u"in [[Deu]]schland")
+    [(3, 17)]
+    """
+
+    # Keys with more spaces than this are not expanded into all their
+    # possible forms, find_hits then asks for a full scan
+    max_spaces = 4
+
+    def __init__(self, badDict):
+        self._always = set([])
+        # Maps each searched form of a key to the key
+        self._keys = {}
+        for word in badDict:
+            if len(word) == 0:
+                continue
+            if word.count(' ') > self.max_spaces:
+                self._always.add(word)
+                continue
+            for form in _space_forms(word):
+                self._keys[form] = word
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for form in self._keys:
+                self._automaton.add_word(form, form)
+            if len(self._keys) > 0:
+                self._automaton.make_automaton()
+        else:
+            self._automaton = _Automaton(self._keys)
+        self._empty = len(self._keys) == 0
+
+    def _iter(self, text):
+        """ Yields (end, form) for all forms of the keys occurring in the
+        lowercased text without brackets (end is the index of the last
+        character)
+        """
+        if self._empty:
+            return iter([])
+        return self._automaton.iter(text.lower().replace('[', '').replace(']', ''))
+
+    def find_candidates(self, text):
+        """ Returns the set of blacklist words that may occur in the text """
+        found = set(self._always)
+        for end, form in self._iter(text):
+            found.add(self._keys[form])
+        return found
+
+    def find_hits(self, text):
+        """ Returns the sorted (start, end) positions of all occurrences of
+        blacklist words in the text
+
+        The positions refer to the original text (including the brackets
+        removed before matching). If the blacklist contains words that
+        cannot be searched (see max_spaces), None is returned and the whole
+        text needs to be checked.
+        """
+        if self._always:
+            return None
+
+        hits = [(end + 1 - len(form), end + 1) for end, form in self._iter(text)]
+        if not hits:
+            return hits
+
+        # Map the positions back to the text with brackets: the i-th bracket
+        # (at position b in the text) is in front of position b - i of the
+        # text without brackets.
+        shifts = [m.start() - i for i, m in enumerate(_brackets.finditer(text))]
+        if shifts:
+            hits = [(start + bisect.bisect_right(shifts, start),
+                     end + bisect.bisect_left(shifts, end))
+                    for start, end in hits]
+        hits.sort()
+        return hits
+
+class _Automaton(object):
+    """ A pure Python Aho-Corasick automaton
+
+    States are numbered, goto holds the transitions of each state as a
+    dictionary, fail the failure link and out the words ending in a state
+    (including those reachable through failure links).
+    """
+
+    def __init__(self, words):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+        for word in words:
+            state = 0
+            for ch in word:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append(word)
+
+        # Breadth-first traversal to compute the failure links
+        queue = list(self.goto[0].values())
+        i = 0
+        while i < len(queue):
+            state = queue[i]
+            i += 1
+            for ch, nxt in self.goto[state].iteritems():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                f = self.goto[f].get(ch, 0)
+                self.fail[nxt] = f
+                self.out[nxt] = self.out[nxt] + self.out[f]
+
+    def iter(self, text):
+        """ Yields (end, word) for all occurrences of the words in text (end
+        is the index of the last character, as in pyahocorasick)
+        """
+        goto = self.goto
+        fail = self.fail
+        out = self.out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for word in out[state]:
+                yield i, word
+
+def _space_forms(word):
+    """ Returns the forms of word in which a space can occur in a text
+    before Word.derive replaces non-breaking spaces (U+00A0, nbsp;)
+    """
+    if isinstance(word, unicode):
+        spaces = (u'\xa0', u'nbsp;')
+    else:
+        spaces = ('nbsp;',)
+    forms = [word[:0]]
+    for i, part in enumerate(word.split(' ')):
+        if i > 0:
+            forms = [f + space for f in forms for space in spaces]
+        forms = [f + part for f in forms]
+    return forms
+
+_brackets = re.compile(r'[\[\]]')
+
+class BlacklistPatterns(object):
+    """ Find all occurrences of the words of a blacklist using few regexes
+
+    Instead of compiling and running one regular expression per blacklist
+    word, the literal words are compiled into a small number of large
+    case-insensitive alternation patterns (at most chunk_size words each).
+    The alternations are nested along common prefixes so that the regex
+    engine does not try every word at every position. Each pattern is a
+    lookahead so that it reports every position at which any of its words
+    starts; the words matching at this position are then looked up in a
+    dictionary of (ASCII-)lowercased words.
+
+    Words that contain regex special characters are still compiled one by
+    one (once, not per text) and searched with re.finditer.
+
+    The occurrences are the same as those found by running
+    re.finditer(word, text, re.IGNORECASE) for each word: the same
+    (word, location) pairs, ordered by the iteration order of the blacklist
+    and then by location.
+
+    Possible usage
+    >>> patterns = BlacklistPatterns({'deuschland' : 'Deutschland'})
+    >>> patterns.find_all(text)
+    [('deuschland', 42)]
+    """
+
+    chunk_size = 1000
+
+    def __init__(self, badDict, chunk_size=None):
+        if chunk_size is not None:
+            self.chunk_size = chunk_size
+
+        self._order = list(badDict)
+        self._single = []
+        literals = []
+        for word in self._order:
+            if _is_literal(word):
+                literals.append(word)
+            else:
+                self._single.append( (word, re.compile(word, re.IGNORECASE)) )
+
+        # Each chunk consists of a compiled lookahead pattern, a dictionary
+        # mapping the folded words to the blacklist words and the distinct
+        # lengths of the words (longest first).
+        self._chunks = []
+        for i in range(0, len(literals), self.chunk_size):
+            chunk = literals[i:i+self.chunk_size]
+            lookup = {}
+            for word in chunk:
+                lookup.setdefault(_ascii_lower(word), []).append(word)
+            pattern = re.compile(u'(?=%s)' % _trie_regex(lookup.keys()),
+                                 re.IGNORECASE)
+            lengths = sorted(set([len(w) for w in chunk]), reverse=True)
+            self._chunks.append( (pattern, lookup, lengths) )
+
+    def find_all(self, text):
+        """ Returns a list of (word, location) for all occurrences in text """
+        found = {}
+        for pattern, lookup, lengths in self._chunks:
+            # Like re.finditer, occurrences of the same word do not overlap
+            last_end = {}
+            for m in pattern.finditer(text):
+                loc = m.start()
+                for l in lengths:
+                    words = lookup.get(_ascii_lower(text[loc:loc+l]))
+                    if words is None:
+                        continue
+                    for word in words:
+                        if last_end.get(word, -1) > loc:
+                            continue
+                        last_end[word] = loc + l
+                        found.setdefault(word, []).append(loc)
+
+        for word, word_re in self._single:
+            found[word] = [m.start() for m in word_re.finditer(text)]
+
+        result = []
+        for word in self._order:
+            for loc in found.get(word, []):
+                result.append( (word, loc) )
+        return result
+
+_regex_special = set('.^$*+?{}[]\\|()')
+_ascii_upper = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_ascii_table = string.maketrans(_ascii_upper, _ascii_upper.lower())
+_ascii_table_unicode = dict([ (ord(c), ord(c.lower())) for c in _ascii_upper ])
+
+def _is_literal(word):
+    """ Whether a word matches only itself when used as a regex """
+    if len(word) == 0:
+        return False
+    if not isinstance(word, unicode):
+        # Byte strings with non-ASCII characters are left to re itself
+        try:
+            word.decode('ascii')
+        except UnicodeDecodeError:
+            return False
+    for c in word:
+        if c in _regex_special:
+            return False
+    return True
+
+def _trie_regex(words):
+    """ Build an alternation of words that is nested along common prefixes
+
+    The resulting regex matches wherever one of the words matches (but not
+    necessarily the longest one), e.g. ab, abc and ad give a(?:b|d).
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for c in word:
+            node = node.setdefault(c, {})
+        node[''] = None
+
+    def to_regex(node):
+        if '' in node:
+            # A word ends here, which is all the lookahead needs to know
+            return u''
+        alternatives = [re.escape(c) + to_regex(child)
+                        for c, child in sorted(node.iteritems())]
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return u'(?:%s)' % u'|'.join(alternatives)
+
+    return to_regex(trie)
+
+def _ascii_lower(s):
+    """ Lowercase only ASCII letters, as re.IGNORECASE does without re.UNICODE """
+    if isinstance(s, unicode):
+        return s.translate(_ascii_table_unicode)
+    return s.translate(_ascii_table)
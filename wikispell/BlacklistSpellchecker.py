@@ -13,6 +13,36 @@ import re, string
 from SpellcheckLib import abstract_Spellchecker
 from InteractiveWordReplacer import InteractiveWordReplacer
 from Word import Word, WrongWord
+from BlacklistMatcher import BlacklistMatcher, BlacklistPatterns
+from TextIndex import TextIndex
+import textrange_parser
+import tokenizer
+
+# Regex to find next word: look for any whitespace or control characters
+# followed by a "word" stopping at the next whitespace or control character.
+_wordsearch = re.compile(r'([\s\=\<\>\_/-]*)([^\s\=\<\>\_/\-|]+)')
+_wordsearch_testcase_compat = re.compile(r'([\s\=\<\>\_/-]*)([^\s\=\<\>\_/\-]+)')
+_whitespace = re.compile(r'\s')
+
+def _word_windows(text, hits):
+    """ Returns the parts of the text (start, end) around the (sorted) hits
+
+    Each part reaches from the whitespace before a hit to the whitespace
+    after it, so it contains all words overlapping the hit. Overlapping
+    parts are merged.
+    """
+    windows = []
+    for start, end in hits:
+        if windows and start < windows[-1][1]:
+            if end > windows[-1][1]:
+                m = _whitespace.search(text, end)
+                windows[-1] = (windows[-1][0], m.start() if m else len(text))
+            continue
+        while start > 0 and not text[start-1] in string.whitespace:
+            start -= 1
+        m = _whitespace.search(text, end)
+        windows.append( (start, m.start() if m else len(text)) )
+    return windows
 
 class BlacklistSpellchecker(abstract_Spellchecker):
     """ Blacklist based spellchecker
@@ -28,92 +58,58 @@ class BlacklistSpellchecker(abstract_Spellchecker):
     def __init__(self):
         self.rcount = {}
         self._testcase_compat = False
+        # BlacklistPatterns of the last blacklist used with batched=True,
+        # keyed by the words of the blacklist
+        self._patterns_key = None
+        self._patterns = None
 
     def spellcheck_blacklist(self, text, badDict, return_for_db=False,
                              return_words=False, title=None, verbose=False,
-                             range_level="full"):
+                             range_level="full", matcher=None):
         """ Checks a single text against the words in the blacklist and returns
         a list of wrong words.
+
+        If a BlacklistMatcher built from badDict is provided as matcher, it is
+        used to find the occurrences of the blacklist words in a single pass
+        and only the words around these occurrences are checked (texts
+        without any occurrence are returned early). Words that the matcher
+        cannot find (see BlacklistMatcher) are missed in this case.
         """
 
-        loc = 0 # the current location in the text we parse
-        old_loc = 0
-        curr_r = 0
+        windows = None
+        if matcher is not None and not return_for_db and not self._testcase_compat:
+            hits = matcher.find_hits(text)
+            if hits is not None:
+                if len(hits) == 0:
+                    return []
+                windows = _word_windows(text, hits)
+
         ranges = self.forbiddenRanges(text, level=range_level)
 
         ranges = sorted(ranges)
+        # Ends of all ranges for a quick lookup below (the ranges are merged
+        # and thus each end only occurs once). Words starting there might not
+        # be full words -> rather discard them.
+        range_ends = set([r[1] for r in ranges])
+        index = TextIndex(text)
         wrongWords = []
-        prepare = []
-        j = 0
 
-        # Regex to find next word: look for any whitespace or control
-        # characters followed by a "word" stopping at the next whitespace or
-        # control character.
-        wordsearch = re.compile(r'([\s\=\<\>\_/-]*)([^\s\=\<\>\_/\-|]+)')
+        wordsearch = _wordsearch
         if self._testcase_compat:
-            wordsearch = re.compile(r'([\s\=\<\>\_/-]*)([^\s\=\<\>\_/\-]+)')
+            wordsearch = _wordsearch_testcase_compat
 
-        while True:
+        for loc, end, ww, smallword in tokenizer.tokenize(text, wordsearch, ranges,
+                                                          range_ends, windows):
 
             if verbose:
-                print "== Start wordsearch at location", loc
+                print "== Check '%s'" % ww.encode("utf8"), "at loc", loc, "==> smallword", smallword.encode("utf8")
 
-            match = wordsearch.search(text,loc)
-            LocAdd = 0
-            j = j + 1
-
-            if not match:
-                # No more words on this page
-                break
-
-            if verbose:
-                print j, "Check '%s'" % text[ match.start():match.end()].encode("utf8"), "at loc", loc
-
-            # Check if we are in forbidden range
-            curr_r, loc, in_nontext = self.check_in_ranges(ranges, 
-                                       match.start(), match.end(), curr_r, loc)
-
-            if verbose:
-                print "    -> moved loc pointer to ", loc, "skip is", in_nontext
-
-            if in_nontext:
+            if not return_for_db and not smallword.lower() in badDict:
                 continue
 
-            # Split the words up at special places like &nbsp; or a dash
-            spl = re.split('&nbsp;', match.group(2))
-            if len(spl) > 1: 
-                LocAdd = 5
-            elif len(spl) == 1:
-                spl = re.split(u'–', spl[0])
-
-            loc_start = loc + len(match.group(1)) # start of the word
-            ww = spl[0]
-            LocAdd += len(ww) + 1
-            bigword = Word(ww)
-            smallword = bigword.derive()
-
-            if verbose:
-                print "    ==> smallword", smallword.encode("utf8")
-
             done = False
-            for r in ranges:
-                # If the end of the range coincides with the start of the word
-                # we might not have a full word -> rather discard it.
-                if r[1] == loc_start:
-                    loc += LocAdd
-                    done = True
-                    if verbose:
-                        print "    we are done with ", smallword.encode("utf8"), "due to range", r
-
-            if done:
-                continue
-
-            # We advance the location by the characters skipped (group 1)
-            loc += len(match.group(1))
             if range_level != "none" or self._testcase_compat:
-                done = self._text_skip(text, loc, smallword, title, return_for_db)
-            if verbose:
-                print "    new loc (after accounting for skipped chars)", loc, "which is '%s'" % match.group(1)
+                done = self._text_skip(text, loc, smallword, title, return_for_db, index)
 
             ###################################
             #use this code to insert into the database
@@ -134,22 +130,22 @@ class BlacklistSpellchecker(abstract_Spellchecker):
                             wrongWords.append(
                                 WrongWord(wrong_word = smallword,
                                           location = loc, 
-                                          bigword = bigword.word,
+                                          bigword = ww,
                                           correctword = badDict[smallword.lower()]
                                 ) 
                             )
                         else:
-                            wrongWords.append([smallword, bigword, loc, badDict[smallword.lower()],
+                            wrongWords.append([smallword, Word(ww), loc, badDict[smallword.lower()],
                                 text[max(0, loc-100):min(loc+100, len(text))] ])
 
-            # We advance the location by the characters of the word (group 2)
-            loc += LocAdd
-            if verbose and len(text) > loc:
-                print "    new loc (after accounting for word)", loc, "we are at", text[loc].encode("utf8")
-
         return wrongWords
 
-    def _text_skip(self, text, loc, word, title=None, return_for_db=False):
+    def _text_skip(self, text, loc, word, title=None, return_for_db=False, index=None):
+        """ Returns whether the word at loc in text should not be checked
+
+        If a TextIndex of the text is given, it is used to count the
+        occurrences of the word stem instead of searching the text.
+        """
 
         # Skip empty words
         if len(word.strip()) == 0:
@@ -206,10 +202,14 @@ class BlacklistSpellchecker(abstract_Spellchecker):
         if word[0].isupper() and word[-1] == "s":
             stem = word[:-1]
             try:
-                rstr = r'\b%s\b' % (word[:-1])
-                match_stem =  [m.group(0) for m in re.finditer(rstr, text)]
-                if len(match_stem) > 1:
-                    return True
+                if index is not None:
+                    if index.count_word(stem) > 1:
+                        return True
+                else:
+                    rstr = r'\b%s\b' % (word[:-1])
+                    match_stem =  [m.group(0) for m in re.finditer(rstr, text)]
+                    if len(match_stem) > 1:
+                        return True
             except Exception:
                 pass
 
@@ -225,38 +225,64 @@ class BlacklistSpellchecker(abstract_Spellchecker):
 
         return False
 
-    def spellcheck_blacklist_regex(self, text, badDict, return_for_db=False, return_words=False):
+    def spellcheck_blacklist_regex(self, text, badDict, return_for_db=False,
+                                   return_words=False, batched=False, patterns=None):
+        """ Checks a text against a blacklist using each entry as a regex
 
-        ranges = self.forbiddenRanges(text)
-        ranges = sorted(ranges)
+        With batched=True (or when a BlacklistPatterns object for the
+        blacklist is passed as patterns) the blacklist is searched with a few
+        large alternation patterns instead of one regex per word. With
+        batched=True the patterns are built once and reused as long as the
+        blacklist contains the same words (in the same order).
+        """
+
+        ranges = textrange_parser.Ranges(ranges=self.forbiddenRanges(text))
+        ranges = ranges.get_interval_index()
+
+        if patterns is None and batched:
+            patterns = self._get_patterns(badDict)
+
+        if patterns is not None:
+            allOccurences = patterns.find_all(text)
+        else:
+            allOccurences = []
+            for word in badDict:
+                word_re = re.compile(word, re.IGNORECASE)
+                allOccurences.extend([(word, m.start()) for m in re.finditer(word_re, text)])
 
+        index = TextIndex(text)
         wrongWords = []
-        for word, replacement in badDict.iteritems():
-            word_re = re.compile(word, re.IGNORECASE)
-            allOccurences = [m.start() for m in re.finditer(word_re, text)]
-            wordDiff = len(word) - len(replacement)
-            currDiff = 0
-            for loc in allOccurences:
-
-                # Words that are parts of other words should be ignored
-                if not text[loc-1] in string.whitespace:
-                    continue
-
-                if self._text_skip(text, loc, text[loc:loc+len(word)]):
-                    continue
-
-                done = False
-                for r in ranges:
-                    if loc > r[0] and loc < r[1]:
-                        done = True
-                        break
+        for word, loc in allOccurences:
 
-                if not done:
-                    wrongWords.append([word, Word(word), loc, badDict[word.lower()],
-                      text[max(0, loc-100):min(loc+100, len(text))] ])
+            # Words that are parts of other words should be ignored
+            if not text[loc-1] in string.whitespace:
+                continue
+
+            if self._text_skip(text, loc, text[loc:loc+len(word)], index=index):
+                continue
+
+            # Skip words that start inside a forbidden range
+            r = ranges.interval_at(loc)
+            if r is not None and r[0] < loc:
+                continue
+
+            wrongWords.append([word, Word(word), loc, badDict[word.lower()],
+              text[max(0, loc-100):min(loc+100, len(text))] ])
 
         return wrongWords
 
+    def _get_patterns(self, badDict):
+        """ Returns (cached) BlacklistPatterns for the words of the blacklist
+
+        The patterns only depend on the words and their order (which is the
+        order of the results), not on the corrections.
+        """
+        key = tuple(badDict)
+        if key != self._patterns_key:
+            self._patterns = BlacklistPatterns(badDict)
+            self._patterns_key = key
+        return self._patterns
+
     def simpleReplace(self, gen, wrong, correct, verbose=True):
         """ Replaces the word by a simple string operation
         wrong word and go through them one by one.
@@ -286,3 +312,38 @@ class BlacklistSpellchecker(abstract_Spellchecker):
 
             InteractiveWordReplacer().processWrongWordsInteractively( [page] )
 
+class CompiledBlacklistChecker(object):
+    """ A blacklist spellchecker that is prepared once and reused for many pages
+
+    Holds the lowercase-normalized blacklist, a BlacklistMatcher built from it
+    and a BlacklistSpellchecker, so that checking a page does not need any
+    further setup. This is meant for going through a large number of pages
+    (e.g. an XML dump) with the same blacklist.
+
+    Possible usage
+    >>> checker = CompiledBlacklistChecker({'Deuschland' : 'Deutschland'})
+    >>> for page in pages:
+    ...     page.words = checker.check(page.text)
+    """
+
+    def __init__(self, badDict, range_level="full"):
+        self.badDict = dict([ (k.lower(), v) for k, v in badDict.iteritems() ])
+        self.range_level = range_level
+        self.matcher = BlacklistMatcher(self.badDict)
+        self._spellchecker = BlacklistSpellchecker()
+        self.patterns = None
+
+    def check(self, text, title=None):
+        """ Checks a single text and returns a list of WrongWord objects """
+        return self._spellchecker.spellcheck_blacklist(text, self.badDict,
+                                                       return_words=True,
+                                                       title=title,
+                                                       range_level=self.range_level,
+                                                       matcher=self.matcher)
+
+    def check_regex(self, text):
+        """ Checks a single text using the blacklist entries as regexes """
+        if self.patterns is None:
+            self.patterns = BlacklistPatterns(self.badDict)
+        return self._spellchecker.spellcheck_blacklist_regex(text, self.badDict,
+                                                             patterns=self.patterns)
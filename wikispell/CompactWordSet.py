@@ -0,0 +1,204 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+A compact, sorted set of words for large lists of common words
+
+The set can be saved in a binary file which is memory mapped when loaded, so
+loading takes no time and all processes share the same pages.
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+import mmap, struct, sys
+from array import array
+
+# Header of the binary format: magic, number of words, followed by the
+# offsets (little-endian uint32) and the concatenated words
+MAGIC = 'WSPWORD1'
+
+class CompactWordSet(object):
+    """ A read-only set of words stored in a single sorted string
+
+    All words are UTF-8 encoded, sorted and concatenated into one string,
+    an array holds the offset at which each word starts. This needs a
+    fraction of the memory of a Python set of unicode objects (a few bytes
+    per word instead of roughly a hundred), lookups are binary searches
+    among the words with the same first two bytes.
+
+    Since the words are sorted, all words of the set that are prefixes of a
+    given word can be found in a single walk (see prefix_lengths), which is
+    what the search for composite words needs.
+
+    Possible usage
+    >>> words = CompactWordSet([u'haus', u'hausboot', u'boot'])
+    >>> words.save('common.bin')
+    >>> words = CompactWordSet.load('common.bin')
+    >>> u'boot' in words
+    True
+    >>> words.prefix_lengths(u'hausbootfahrt')
+    [4, 8]
+    """
+
+    def __init__(self, words=[]):
+        encoded = set([])
+        for word in words:
+            if isinstance(word, unicode):
+                word = word.encode('utf8')
+            encoded.add(word)
+        encoded = sorted(encoded)
+
+        self._offsets = array('I', [0])
+        pos = 0
+        for word in encoded:
+            pos += len(word)
+            self._offsets.append(pos)
+        self._data = ''.join(encoded)
+        self._buckets = {}
+
+    @classmethod
+    def load(cls, filename):
+        """ Loads a set saved with save(), the words are memory mapped """
+        f = open(filename, 'rb')
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            f.close()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("%s is not a compiled word list" % filename)
+
+        start = len(MAGIC) + 4
+        n = struct.unpack('<I', data[len(MAGIC):start])[0]
+        words = cls.__new__(cls)
+        # Only the offsets are read into memory
+        words._offsets = array('I', data[start:start + 4 * (n+1)])
+        if sys.byteorder != 'little':
+            words._offsets.byteswap()
+        words._data = _MappedData(data, start + 4 * (n+1))
+        words._buckets = {}
+        return words
+
+    def save(self, filename):
+        """ Writes the set to a binary file that can be loaded with load() """
+        offsets = array('I', self._offsets)
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        f = open(filename, 'wb')
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(self)))
+        f.write(offsets.tostring())
+        f.write(self._data[0:self._offsets[-1]])
+        f.close()
+
+    @staticmethod
+    def is_compiled(filename):
+        """ Returns whether the file was written by save() """
+        f = open(filename, 'rb')
+        head = f.read(len(MAGIC))
+        f.close()
+        return head == MAGIC
+
+    @classmethod
+    def from_files(cls, filenames):
+        """ Reads words (one per line, UTF-8) from files and lowercases them
+
+        Files written by save() are read as well, a single such file is
+        memory mapped.
+        """
+        if len(filenames) == 1 and cls.is_compiled(filenames[0]):
+            return cls.load(filenames[0])
+
+        def read():
+            for filename in filenames:
+                if cls.is_compiled(filename):
+                    for word in cls.load(filename):
+                        yield word
+                    continue
+                f = open(filename)
+                for l in f:
+                    yield l.strip().decode('utf8').lower()
+                f.close()
+        return cls(read())
+
+    def _word(self, i):
+        return self._data[self._offsets[i]:self._offsets[i+1]]
+
+    def _bucket(self, start):
+        """ Returns the range of words that start with start (memoized) """
+        try:
+            return self._buckets[start]
+        except KeyError:
+            n = len(self)
+            lo = self._bisect(start, 0, n)
+            # No UTF-8 encoded string contains the byte 0xff
+            bucket = self._buckets[start] = (lo, self._bisect(start + '\xff', lo, n))
+            return bucket
+
+    def _bisect(self, key, lo, hi):
+        """ Returns the index of the first word >= key in [lo, hi) """
+        offsets = self._offsets
+        data = self._data
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if data[offsets[mid]:offsets[mid+1]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __contains__(self, word):
+        if isinstance(word, unicode):
+            word = word.encode('utf8')
+        lo, hi = self._bucket(word[:2])
+        i = self._bisect(word, lo, hi)
+        return i < hi and self._word(i) == word
+
+    def prefix_lengths(self, word):
+        """ Returns the lengths of all prefixes of word that are in the set
+
+        The lengths are in characters of word and in increasing order.
+        """
+        if isinstance(word, unicode):
+            data = word.encode('utf8')
+            if len(data) == len(word):
+                boundaries = range(1, len(word) + 1)
+            else:
+                boundaries = [len(word[:k].encode('utf8')) for k in range(1, len(word) + 1)]
+        else:
+            data = word
+            boundaries = range(1, len(word) + 1)
+
+        result = []
+        n = len(self)
+        lo = 0
+        for k, b in enumerate(boundaries):
+            key = data[:b]
+            # Longer prefixes are larger, so the search only moves forward
+            lo = self._bisect(key, lo, n)
+            if lo == n:
+                break
+            found = self._word(lo)
+            if found == key:
+                result.append(k + 1)
+            elif not found.startswith(key):
+                # No word of the set starts with this prefix
+                break
+        return result
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._word(i).decode('utf8')
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+class _MappedData(object):
+    """ The words of a memory mapped file (sliced like a string) """
+
+    def __init__(self, data, start):
+        self._mmap = data
+        self._start = start
+
+    def __getslice__(self, i, j):
+        return self._mmap[self._start + i:self._start + j]
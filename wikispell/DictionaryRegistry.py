@@ -0,0 +1,128 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+Load hunspell dictionaries once per process and share them
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+import os.path
+import time
+
+try:
+    import hunspell
+except ImportError:
+    hunspell = None
+
+class DictionaryRegistry(object):
+    """ Hands out hunspell dictionaries, loading each one on first use
+
+    Dictionaries are identified by their location without the .dic/.aff
+    ending (e.g. /usr/share/hunspell/de_DE). All users of the same location
+    get the same HunSpell object, so each dictionary is only loaded once per
+    process. The HunSpell objects are shared and should not be modified
+    (e.g. by adding words).
+
+    A different loader (a function taking the .dic and the .aff file) can
+    be used instead of hunspell.HunSpell.
+
+    The registry counts how often each dictionary was handed out again
+    (hits) and how long it took to load it (load_times), see stats().
+
+    Possible usage
+    >>> hspell = registry.get('/usr/share/hunspell/de_DE')
+    >>> hspell.spell('Haus')
+    True
+    >>> print registry.stats()
+    """
+
+    def __init__(self, loader=None):
+        self._dictionaries = {}
+        self._loader = loader
+        self._exists = {}
+        self.hits = {}
+        self.load_times = {}
+
+    def get(self, path):
+        """ Returns the HunSpell object for the dictionary at path """
+        key = os.path.abspath(path)
+        try:
+            dictionary = self._dictionaries[key]
+            self.hits[key] += 1
+            return dictionary
+        except KeyError:
+            pass
+
+        loader = self._loader
+        if loader is None:
+            if hunspell is None:
+                raise ImportError("The hunspell module is needed to load %s" % path)
+            loader = hunspell.HunSpell
+        start = time.time()
+        dictionary = loader(key + ".dic", key + ".aff")
+        self.load_times[key] = time.time() - start
+        self.hits[key] = 0
+        self._dictionaries[key] = dictionary
+        return dictionary
+
+    def find(self, path):
+        """ Returns the dictionary at path or None if there is no such dictionary
+
+        Whether the dictionary exists is only checked once.
+        """
+        key = os.path.abspath(path)
+        if key not in self._exists:
+            self._exists[key] = os.path.isfile(key + ".dic")
+        if not self._exists[key]:
+            return None
+        return self.get(key)
+
+    def __contains__(self, path):
+        return os.path.abspath(path) in self._dictionaries
+
+    def clear(self):
+        """ Forgets all dictionaries (they are loaded again when needed) """
+        self._dictionaries.clear()
+        self._exists.clear()
+        self.hits.clear()
+        self.load_times.clear()
+
+    def stats(self):
+        """ Returns a short summary of the loaded dictionaries """
+        lines = ["Dictionaries: %s loaded in %0.2fs" % (
+            len(self._dictionaries), sum(self.load_times.values()))]
+        for key in sorted(self._dictionaries):
+            lines.append("* %s : loaded in %0.2fs, %s hits" % (
+                key, self.load_times[key], self.hits[key]))
+        return "\n".join(lines)
+
+# The registry of this process
+registry = DictionaryRegistry()
+
+class LazyDictionary(object):
+    """ A handle to a dictionary that is only loaded when it is first used
+
+    The dictionary is taken from the registry. If it cannot be loaded
+    (hunspell or the dictionary files are missing), get() returns None.
+
+    Possible usage
+    >>> handle = LazyDictionary('/usr/share/hunspell/de_DE')
+    >>> hspell = handle.get()
+    """
+
+    def __init__(self, path, registry=registry):
+        self.path = path
+        self._registry = registry
+        self._dictionary = None
+        self._loaded = False
+
+    def get(self):
+        if not self._loaded:
+            self._loaded = True
+            try:
+                self._dictionary = self._registry.find(self.path)
+            except Exception:
+                self._dictionary = None
+        return self._dictionary
@@ -0,0 +1,421 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+A reader for Mediawiki XML dumps that knows where each page is in the file
+
+Together with the index of a multistream dump, single pages can be read by
+title or page id without decompressing the rest of the dump.
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+import bz2
+import os
+import sqlite3
+import tempfile
+import xml.etree.cElementTree as ElementTree
+
+class DumpPage(object):
+    """ A page read from an XML dump
+
+    Provides the same attributes as the XmlEntry objects of the pywikibot
+    xmlreader (title, ns and id as strings, text) as well as the offset in
+    the dump file from where reading has to start to get this page again.
+    """
+
+    def __init__(self, title, ns, id, text, offset=0):
+        self.title = title
+        self.ns = ns
+        self.id = id
+        self.text = text
+        self.offset = offset
+
+    def get(self):
+        return self.text
+
+    def __repr__(self):
+        return "DumpPage(%r, id=%s)" % (self.title, self.id)
+
+class DumpReader(object):
+    """ Sequentially read the pages of an XML dump, starting at any offset
+
+    The dump can be a plain XML file, a bz2 compressed file or a
+    multistream bz2 file (pages-articles-multistream.xml.bz2) which consists
+    of many independent bz2 streams of 100 pages each.
+
+    Every page carries the offset from which the reader needs to start to
+    find this page again: the byte offset of the <page> tag for plain XML
+    files and the offset of the bz2 stream containing the page for
+    multistream files. A single stream bz2 file cannot be entered in the
+    middle, so all offsets are 0 there.
+
+    If the index of a multistream dump is given (either the file name of
+    pages-articles-multistream-index.txt.bz2 or a MultistreamIndex), pages
+    can be read directly by title or id. Only the stream containing a page
+    (100 pages) is read and decompressed for this. An index that is read
+    from a file name is closed by close().
+
+    Possible usage
+    >>> reader = DumpReader('dewiki-latest-pages-articles-multistream.xml.bz2')
+    >>> for page in reader.parse():
+    ...     print page.id, page.title, page.offset
+    >>> # later, continue after this page
+    >>> for page in reader.parse(page.offset, after_id=page.id):
+    ...     print page.title
+    >>> reader = DumpReader('dewiki-latest-pages-articles-multistream.xml.bz2',
+    ...                     'dewiki-latest-pages-articles-multistream-index.txt.bz2')
+    >>> reader.get_page(title=u'Schweiz').text
+    >>> reader.close()
+    """
+
+    chunk_size = 1024 * 1024
+    stream_chunk_size = 64 * 1024
+    # The first stream of a multistream dump only holds the siteinfo
+    max_header_size = 10 * 1024 * 1024
+
+    def __init__(self, filename, index=None):
+        self.filename = filename
+        f = open(filename, 'rb')
+        self.compressed = f.read(3) == 'BZh'
+        f.close()
+
+        self._own_index = isinstance(index, basestring)
+        if self._own_index:
+            index = MultistreamIndex(index)
+        self.index = index
+        self._stream = (None, [])
+
+    def resumable(self):
+        """ Whether reading can start in the middle of the dump
+
+        This is the case for plain XML files and multistream bz2 files, which
+        are recognized by the end of the first bz2 stream within the first
+        max_header_size bytes. In a single stream bz2 file all offsets are 0.
+        """
+        if not self.compressed:
+            return True
+        f = open(self.filename, 'rb')
+        decompressor = bz2.BZ2Decompressor()
+        try:
+            read = 0
+            while read < self.max_header_size:
+                data = f.read(self.stream_chunk_size)
+                if not data:
+                    return False
+                read += len(data)
+                try:
+                    decompressor.decompress(data)
+                except EOFError:
+                    return True
+                if decompressor.unused_data:
+                    return True
+            return False
+        finally:
+            f.close()
+
+    def close(self):
+        """ Closes the index if it was opened by the reader """
+        if self._own_index:
+            self.index.close()
+            self._own_index = False
+
+    def parse(self, offset=0, after_id=None, start_id=None):
+        """ Yields DumpPage objects for all pages starting at offset
+
+        If after_id is given, all pages up to and including the page with
+        this id are skipped. If start_id is given, all pages before the page
+        with this id are skipped.
+        """
+        skipping = after_id is not None or start_id is not None
+        for block, block_offset in self._page_blocks(offset):
+            page = self._parse_page(block, block_offset)
+            if skipping:
+                if page.id == start_id:
+                    skipping = False
+                elif page.id == after_id:
+                    skipping = False
+                    continue
+                else:
+                    continue
+            yield page
+
+    def parse_from(self, title=None, pageid=None):
+        """ Yields all pages of the dump starting at the given page (using the index) """
+        offset, pageid = self._lookup(title, pageid)
+        if offset is None:
+            return iter([])
+        return self.parse(offset, start_id=pageid)
+
+    def get_page(self, title=None, pageid=None):
+        """ Returns the page with the given title or id (or None if it is not in the dump) """
+        offset, pageid = self._lookup(title, pageid)
+        if offset is None:
+            return None
+        for page in self._read_stream(offset):
+            if page.id == pageid:
+                return page
+        return None
+
+    def get_pages(self, titles=[], pageids=[]):
+        """ Yields the pages with the given titles and ids
+
+        Pages are returned in the order of the input, pages that are not in
+        the dump are left out. Each stream is decompressed only once.
+        """
+        wanted = [self._lookup(title=t) for t in titles] + \
+                 [self._lookup(pageid=i) for i in pageids]
+        wanted = [w for w in wanted if w[0] is not None]
+
+        found = {}
+        for offset in sorted(set([w[0] for w in wanted])):
+            for page in self._read_stream(offset):
+                found[page.id] = page
+
+        for offset, pageid in wanted:
+            if pageid in found:
+                yield found[pageid]
+
+    def _lookup(self, title=None, pageid=None):
+        """ Returns (offset, page id) of a page from the index """
+        if self.index is None:
+            raise ValueError("Random access to pages needs the index of a multistream dump")
+        if title is not None:
+            return self.index.by_title(title)
+        return self.index.by_id(pageid), str(pageid)
+
+    def _read_stream(self, offset):
+        """ Returns all pages of the bz2 stream at offset """
+        if self._stream[0] == offset:
+            return self._stream[1]
+
+        f = open(self.filename, 'rb')
+        f.seek(offset)
+        decompressor = bz2.BZ2Decompressor()
+        out = []
+        try:
+            while True:
+                data = f.read(self.stream_chunk_size)
+                if not data:
+                    break
+                try:
+                    out.append(decompressor.decompress(data))
+                except EOFError:
+                    break
+                if decompressor.unused_data:
+                    break
+        finally:
+            f.close()
+
+        data = ''.join(out)
+        pages = []
+        pos = 0
+        while True:
+            start = data.find('<page>', pos)
+            end = data.find('</page>', start)
+            if start == -1 or end == -1:
+                break
+            pos = end + len('</page>')
+            pages.append(self._parse_page(data[start:pos], offset))
+
+        self._stream = (offset, pages)
+        return pages
+
+    def _chunks(self, offset):
+        """ Yields (data, offset) with the decompressed data of the file
+
+        For bz2 files, the offset is the start of the stream the data is from.
+        """
+        f = open(self.filename, 'rb')
+        f.seek(offset)
+        try:
+            if not self.compressed:
+                while True:
+                    data = f.read(self.chunk_size)
+                    if not data:
+                        break
+                    yield data, offset
+                    offset += len(data)
+                return
+
+            decompressor = bz2.BZ2Decompressor()
+            stream_offset = offset
+            position = offset
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    break
+                while data:
+                    try:
+                        out = decompressor.decompress(data)
+                    except EOFError:
+                        # Stream ended exactly at a chunk boundary
+                        decompressor = bz2.BZ2Decompressor()
+                        stream_offset = position
+                        continue
+                    if out:
+                        yield out, stream_offset
+                    unused = decompressor.unused_data
+                    position += len(data) - len(unused)
+                    data = unused
+                    if unused:
+                        # The next stream starts within this chunk
+                        decompressor = bz2.BZ2Decompressor()
+                        stream_offset = position
+        finally:
+            f.close()
+
+    def _page_blocks(self, offset):
+        """ Yields (block, offset) for each <page> ... </page> block """
+        buf = ''
+        # Positions in buf where data from a new offset starts
+        segments = []
+        for data, data_offset in self._chunks(offset):
+            if self.compressed:
+                segments.append( (len(buf), data_offset) )
+            else:
+                # Offsets in plain files are exact byte positions
+                segments = [ (0, data_offset - len(buf)) ]
+            buf += data
+
+            pos = 0
+            while True:
+                start = buf.find('<page>', pos)
+                if start == -1:
+                    break
+                end = buf.find('</page>', start)
+                if end == -1:
+                    break
+                end += len('</page>')
+                yield buf[start:end], self._offset_at(segments, start)
+                pos = end
+
+            # Keep the unfinished page (if any) for the next round
+            start = buf.find('<page>', pos)
+            if start == -1:
+                start = max(pos, len(buf) - len('<page>'))
+            segments = [ (0, self._offset_at(segments, start)) ] + \
+                       [ (p - start, o) for p, o in segments if p > start ]
+            buf = buf[start:]
+
+    def _offset_at(self, segments, pos):
+        """ Returns the offset to start reading from to get to pos in buf """
+        for p, o in reversed(segments):
+            if p <= pos:
+                if self.compressed:
+                    return o
+                return o + pos
+
+    def _parse_page(self, block, offset):
+        elem = ElementTree.fromstring(block)
+        text = elem.findtext('revision/text')
+        if text is None:
+            text = u''
+        return DumpPage(unicode(elem.findtext('title')),
+                        str(elem.findtext('ns')),
+                        str(elem.findtext('id')),
+                        unicode(text), offset)
+
+class MultistreamIndex(object):
+    """ The index of a multistream XML dump
+
+    Each line of the index (e.g. pages-articles-multistream-index.txt.bz2)
+    has the form offset:pageid:title, where offset is the position of the bz2
+    stream that contains the page in the dump.
+
+    The index of a large dump has millions of entries, therefore they are
+    not kept in memory but written to an SQLite table with an index on the
+    title and the page id, in which each lookup is a search in a B-tree on
+    disk. If a database file is given, the table is kept there and is only
+    built the first time; otherwise it is built in a temporary file that is
+    removed by close().
+
+    Possible usage
+    >>> index = MultistreamIndex('dewiki-latest-pages-articles-multistream-index.txt.bz2',
+    ...                          'dewiki-latest-index.sqlite')
+    >>> offset, pageid = index.by_title(u'Schweiz')
+    >>> index.close()
+    """
+
+    def __init__(self, filename, database=None):
+        self._tmpfile = None
+        if database is None:
+            fd, database = tempfile.mkstemp(prefix="dumpindex", suffix=".sqlite")
+            os.close(fd)
+            self._tmpfile = database
+
+        self.connection = sqlite3.connect(database)
+        self.connection.text_factory = str
+        self.cursor = self.connection.cursor()
+        if not self._has_table("pages"):
+            self._load(filename)
+
+    def _has_table(self, name):
+        self.cursor.execute("select count(*) from sqlite_master where type = 'table' and name = ?",
+                            (name,))
+        return self.cursor.fetchone()[0] > 0
+
+    def _load(self, filename):
+        """ Reads the index file into the table pages
+
+        The table is filled under another name and only renamed when it is
+        complete, so an interrupted run does not leave an incomplete index.
+        """
+        if filename.endswith('.bz2'):
+            f = bz2.BZ2File(filename)
+        else:
+            f = open(filename)
+
+        def rows():
+            for line in f:
+                offset, pageid, title = line.rstrip('\n').split(':', 2)
+                yield int(offset), int(pageid), title
+
+        try:
+            self.cursor.execute("drop table if exists pages_load")
+            self.cursor.execute("""create table pages_load (
+                offset integer,
+                pageid integer,
+                title text
+            )""")
+            self.cursor.executemany("insert into pages_load (offset, pageid, title) values (?, ?, ?)",
+                                    rows())
+            self.cursor.execute("create index pages_title on pages_load (title)")
+            self.cursor.execute("create index pages_pageid on pages_load (pageid)")
+            self.cursor.execute("alter table pages_load rename to pages")
+            self.connection.commit()
+        finally:
+            f.close()
+
+    def by_title(self, title):
+        """ Returns (offset, page id) of a title or (None, None) """
+        self.cursor.execute("select offset, pageid from pages where title = ?",
+                            (title.encode('utf8'),))
+        row = self.cursor.fetchone()
+        if row is None:
+            return None, None
+        return row[0], str(row[1])
+
+    def by_id(self, pageid):
+        """ Returns the offset of a page id or None """
+        try:
+            pageid = int(pageid)
+        except ValueError:
+            return None
+        self.cursor.execute("select offset from pages where pageid = ?", (pageid,))
+        row = self.cursor.fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def __len__(self):
+        self.cursor.execute("select count(*) from pages")
+        return self.cursor.fetchone()[0]
+
+    def close(self):
+        """ Closes the database (and removes it if it is a temporary file) """
+        self.connection.close()
+        if self._tmpfile is not None:
+            os.remove(self._tmpfile)
+            self._tmpfile = None
@@ -56,7 +56,7 @@ sudo apt-get install hunspell-de-ch-frami
 
 import re
 import time
-import hunspell
+import os.path
 
 ## pywikibot imports
 try:
@@ -70,6 +70,11 @@ from RuleBasedWordAnalyzer import RuleBasedWordAnalyzer
 from SpellcheckLib import abstract_Spellchecker
 from SpellcheckLib import askAlternative
 from SpellcheckLib import cap, uncap, edit, endpage
+from SuggestionCache import dictionary_fingerprint
+from LRUCache import GenerationalCache
+from TextIndex import TextIndex
+from DictionaryRegistry import registry
+import tokenizer
 
 hunspellEncoding = 'ISO-8859-15'
 
@@ -81,13 +86,23 @@ class HunspellSpellchecker(abstract_Spellchecker):
         - the minimal word size to be still checked (minimal_word_size)
         - the tolerance for multiple occurrences in the text word (if the word occurs more than multiple_occurence_tol times, it is considered correct)
         - whether to use the "suggestions" feature of hunspell 
+        - a SuggestionCache to store the suggestions of hunspell (suggestion_cache)
+        - the number of words for which the verdict of hunspell is remembered
+          across pages (verdict_cache_size) or a cache object with get/put
+          methods to use instead (verdict_cache, e.g. an LRUCache)
+
+    The hunspell dictionaries are taken from the DictionaryRegistry, so
+    several checkers (e.g. with different settings) share them.
     """
 
     def __init__(self, hunspell_dict, minimal_word_size = 3, 
                  multiple_occurence_tol = 1, nosuggestions=False, 
                  language="DE", stringent = 0, composite_minlen = 0, 
                  remove_dissimilar = True,
-                 common_words = set([])):
+                 common_words = set([]),
+                 suggestion_cache = None,
+                 verdict_cache_size = 100000,
+                 verdict_cache = None):
 
         self._nosuggestions = nosuggestions
         self.correct_html_codes = False
@@ -102,6 +117,13 @@ class HunspellSpellchecker(abstract_Spellchecker):
         self._replaceBy = {}
         self.stringent = stringent
         self.remove_dissimilar = remove_dissimilar
+        self.suggestion_cache = suggestion_cache
+        self.suggestion_pool = None
+
+        # Verdicts of hunspell for each word, kept across pages
+        if verdict_cache is None:
+            verdict_cache = GenerationalCache(verdict_cache_size)
+        self._verdicts = verdict_cache
 
         self._wordAnalyzer = RuleBasedWordAnalyzer(minimal_word_size,
                                                    multiple_occurence_tol,
@@ -118,32 +140,30 @@ class HunspellSpellchecker(abstract_Spellchecker):
         if hunspell_dict is None:
             raise Exception("Need to provide hunspell dictionary")
 
-        self.hunspell = hunspell.HunSpell(hunspell_dict + ".dic", hunspell_dict + ".aff")
+        self.hunspell = registry.get(hunspell_dict)
         self.hunspell_alternative = None
+        self._dictionary_path = hunspell_dict
+        self._alternative_path = None
+        self._fingerprints = {}
+        hunspell_alt = None
         if language == "DE":
             if hunspell_dict[-2:] == "DE":
                 # Alternative for de is de_ch (swiss spellchecker)
                 hunspell_alt = hunspell_dict[:-2] + "CH"
-                import os.path
-                if os.path.isfile(hunspell_alt + ".dic"):
-                    self.hunspell_alternative = hunspell.HunSpell(hunspell_alt + ".dic", hunspell_alt + ".aff")
-                else:
-                    print "Cannot find alternative hunspell dictionary at", hunspell_alt + ".dic"
             else:
                 # Guess some location
                 hunspell_alt = "/usr/share/hunspell/de_CH"
-                import os.path
-                if os.path.isfile(hunspell_alt + ".dic"):
-                    self.hunspell_alternative = hunspell.HunSpell(hunspell_alt + ".dic", hunspell_alt + ".aff")
-                else:
-                    print "Cannot find alternative hunspell dictionary at", hunspell_alt + ".dic"
 
         elif hunspell_dict[-2:] == "US":
             hunspell_alt = hunspell_dict[:-2] + "GB"
-            import os.path
-            if os.path.isfile(hunspell_alt + ".dic"):
-                self.hunspell_alternative = hunspell.HunSpell(hunspell_alt + ".dic", hunspell_alt + ".aff")
-                print "found alternative dictionary ....", hunspell_alt + ".dic"
+
+        if hunspell_alt is not None:
+            # Shared with other checkers, only probed and loaded once
+            self.hunspell_alternative = registry.find(hunspell_alt)
+            if self.hunspell_alternative is not None:
+                self._alternative_path = hunspell_alt
+                if language != "DE":
+                    print "found alternative dictionary ....", hunspell_alt + ".dic"
             else:
                 print "Cannot find alternative hunspell dictionary at", hunspell_alt + ".dic"
 
@@ -231,18 +251,130 @@ class HunspellSpellchecker(abstract_Spellchecker):
         level controls how much text should be excluded from spellchecking:
             - full: exclude as much as possible
 
+        This runs the three stages of the spellcheck pipeline (see
+        spellcheck_pages) for a single text.
+
         Returns the corrected text.
         """
 
+        self._reset_counters()
+        page = self.collect_candidates([text], forceAlternative, level).next()
+        suggestions = self.suggest_candidates([page])
+        return self.resolve_candidates(page, suggestions)
+
+    def spellcheck_pages(self, texts, forceAlternative=True, level="full"):
+        """Spellchecks many texts at once, getting all suggestions together.
+
+        The spellcheck is done in three stages:
+            1. collect_candidates: find the words of all texts that hunspell
+               does not know and that are not excluded by the rules
+            2. suggest_candidates: get the suggestions of hunspell once for
+               each distinct word (using the suggestion_pool if there is one)
+            3. resolve_candidates: decide for each text which of its words
+               are wrong
+
+        Each text is checked as if clearCache() had been called before, this
+        is meant for non-interactive use.
+
+        Returns a list of (text, wrongWords), one for each text.
+        """
+
+        self._reset_counters()
+        pages = list(self.collect_candidates(texts, forceAlternative, level))
+        suggestions = self.suggest_candidates(pages)
+
+        result = []
+        for page in pages:
+            self.clearCache()
+            result.append(self.resolve_candidates(page, suggestions))
+        return result
+
+    def collect_candidates(self, texts, forceAlternative=True, level="full"):
+        """Stage 1: yields a PageCandidates object for each text
+
+        It holds all words of the text that hunspell does not know, with
+        their location and whether the rules exclude them (skip).
+        """
+        for text in texts:
+            if self.correct_html_codes:
+                text = removeHTML(text)
+
+            page = PageCandidates(text)
+            index = TextIndex(text)
+            for smallword, ww, loc, useCH in self._iter_words(text, forceAlternative, level):
+                candidate = self._find_candidate(text, smallword, ww, loc, useCH)
+                if candidate is None:
+                    continue
+
+                #
+                #  - if the word has been marked as known by the user, it is correct
+                #
+                candidate.skip = smallword in self.knownwords or \
+                        self._wordAnalyzer.skipWord(smallword, text, loc, useCH, index)
+                page.candidates.append(candidate)
+            yield page
+
+    def suggest_candidates(self, pages):
+        """Stage 2: get the suggestions for the candidates of many pages
+
+        Each distinct word is only looked up once. Returns a dictionary that
+        maps the suggestion key (see _suggestion_key) to the suggestions.
+        """
+        needed = set([])
+        if not self._nosuggestions:
+            for page in pages:
+                for candidate in page.candidates:
+                    if not candidate.skip:
+                        needed.add(self._suggestion_key(candidate.word_utf8, candidate.use_alt))
+
+        needed = sorted(needed)
+        for i, key in enumerate(needed):
+            pywikibot.output(u"%s.\03{lightred}\"%s\"\03{default} -> get Suggestions" % (
+                i + 1, key[0].decode('utf8')))
+
+        t1 = time.time()
+        suggestions = self._suggest_all(needed)
+        self.time_suggesting += time.time() - t1
+        return suggestions
+
+    def resolve_candidates(self, page, suggestions):
+        """Stage 3: decide which of the candidates of a page are wrong words
+
+        Returns (text, wrongWords) for the page. Wrong words are also added
+        to self._unknown_words (used by askUser).
+        """
+
+        def lookup(word, use_alt):
+            return list(suggestions[self._suggestion_key(word, use_alt)])
+
+        wrongWords = []
+        for candidate in page.candidates:
+            w = self._resolve_candidate(candidate, lookup)
+            if w is not None:
+                wrongWords.append(w)
+
+        # We are done with all words
+        text = page.text
         if self.correct_html_codes:
             text = removeHTML(text)
 
-        loc = 0
+        return text, wrongWords
+
+    def _reset_counters(self):
+        # For bookkeeping
+        self.time_suggesting = 0
+        self.totalWordsChecked = 0
+        self.checkWords = 0
+
+    def _iter_words(self, text, forceAlternative, level):
+        """ Yields all words of a text that are not in a forbidden range
+
+        Yields tuples (smallword, ww, loc, useCH)
+        """
 
         # Get ranges
         ranges = self.forbiddenRanges(text, level=level)
         ranges = sorted(ranges)
-        curr_r = 0
 
         # Check whether to use alternative spellchecker (e.g. swiss)
         schweiz_search = "<!--schweizbezogen-->"
@@ -251,168 +383,96 @@ class HunspellSpellchecker(abstract_Spellchecker):
         if match or forceAlternative:
             useCH = True
 
-        # For bookkeeping
-        self.time_suggesting = 0
-        self.totalWordsChecked = 0
-        self.checkWords = 0
-        starttime = time.time()
+        for loc, end, ww, smallword in tokenizer.tokenize(text, tokenizer.WORD_PATTERN, ranges):
+            yield smallword, ww, loc, useCH
 
-        # Wordsearch using regex
-        wordsearch = re.compile(r'([\s\=\<\>\_]*)([^\s\=\<\>\_/\-]+)')
+    def _find_candidate(self, text, smallword, ww, loc, use_alt):
+        """ Returns an UnknownWord if hunspell does not know the word, otherwise None """
 
-        nr_words = 0
-        wrongWords = []
-        while True:
-
-            match = wordsearch.search(text, loc)
-            LocAdd = 0
-            if not match and False:
-                # No more words on this page
-                print "=" * 75
-                print "Time suggesting %0.4f s" % self.time_suggesting
-                print "Total time %0.4f s" % (time.time() - starttime)
-                print "----------------------"
-                print "Time suggesting of total time %0.4f%% " % (
-                    self.time_suggesting *100.0 / (time.time() - starttime) )
-                print "Number of words", nr_words
-            if not match:
-                break
-
-            curr_r, loc, in_nontext = self.check_in_ranges(
-                ranges, match.start(), match.end(), curr_r, loc)
-            if in_nontext:
-                continue
-
-            nr_words += 1
-            # Split the words up at special places like &nbsp; or – (these will
-            # usually not be found in the dictionary)
-            spl = re.split('&nbsp;', match.group(2))
-            if len(spl) >1: LocAdd = 5
-            elif len(spl) == 1:
-                spl = re.split(u'–', spl[0])
-            ww = spl[0]
-            LocAdd += len(ww)+1
-            bigword = Word(ww)
-            smallword = bigword.derive()
-
-            loc += len(match.group(1))
-
-            w = self._spellcheck_word(text, smallword, bigword, ww, loc, LocAdd, useCH)
-            if w is not None:
-                wrongWords.append(w)
-
-            # proceed to the next location
-            loc += LocAdd
+        known = self._check_word(smallword, use_alt)
+        if known is None:
+            # There are some unicode characters that we cannot render in ISO
+            # 8859 and these will throw an error here.
+            # Nothing left to do ...
+            return
 
-        # We are done with all words
-        if self.correct_html_codes:
-            text = removeHTML(text)
+        if smallword == '' or smallword.isupper() or known:
+            return
 
-        return text, wrongWords
+        self.totalWordsChecked += 1
+        return UnknownWord(text, smallword, Word(ww), loc, use_alt)
 
-    def _spellcheck_word(self, text, smallword, bigword, ww, loc, LocAdd, use_alt):
-        """ Spellcheck a single word
+    def _resolve_candidate(self, candidate, suggest):
+        """ Decides whether an unknown word is wrong
 
-                self._unknown_words.append(bigword);
+        suggest(word_utf8, use_alt) returns the (undecoded) suggestions of
+        hunspell for a word. Returns the word if it is wrong.
         """
 
         done = False
-
-        try:
-            smallword_encoded = smallword.encode(hunspellEncoding)
-        except UnicodeEncodeError as s: 
-            # There are some unicode characters that we cannot render in ISO
-            # 8859 and these will throw an error here.
-            # Nothing left to do ...
+        smallword = candidate.smallword
+        bigword = candidate.bigword
+        loc = candidate.loc
+
+        #
+        #  - if we found it more than once, its probably correct
+        #
+        if smallword in self._unknown:
+            self._unknown.remove(smallword)
+            return 
+
+        if candidate.skip:
             return
 
-        smallword_utf8 = smallword.encode('utf8')
-        smallword_utf8_prev = text[loc:loc+1].encode('utf8') + smallword_utf8
-        smallword_utf8_next = smallword_utf8 + text[loc+LocAdd-1:loc+LocAdd].encode('utf8')
-
-        if not smallword == '' and not smallword.isupper() and \
-           not self._check_with_hunspell(smallword_encoded, use_alt):
-
-            self.totalWordsChecked += 1
-
-            inWW = ww.find(smallword)
-            if not inWW == 0:
-                smallword_utf8_prev = ww[inWW].encode('utf8') + smallword_utf8
-            if not inWW+len(smallword) >= len(ww):
-                smallword_utf8_next = smallword_utf8 + ww[inWW+len(smallword)].encode('utf8')
-
-            #
-            #  - if we found it more than once, its probably correct
-            #
-            if smallword in self._unknown:
-                self._unknown.remove(smallword)
-                return 
-
-            #
-            #  - if the word has been marked as known by the user, it is correct
-            #
-            if smallword in self.knownwords:
-                return
-
-            if self._wordAnalyzer.skipWord(smallword, text, loc, use_alt):
-                return
-
-            #  now we need to get the suggestions from hunspell. This takes
-            #  nearly all time
-            if True:
-                self.checkWords += 1
-                pywikibot.output(u"%s.\03{lightred}\"%s\"\03{default} -> get Suggestions" % (
-                    self.checkWords, smallword));
-                t1 = time.time()
-                if self._nosuggestions:
-                    sugg = []
-                elif use_alt and self.hunspell_alternative is not None:
-                    sugg = self.hunspell_alternative.suggest(smallword_utf8)
-                else:
-                   sugg = self.hunspell.suggest(smallword_utf8)
-                self.time_suggesting += time.time() -t1
-
-                if not self._nosuggestions \
-                    and len(sugg) == 0 \
-                    and not smallword in self._wordsWithoutSuggestions:
-                    self._wordsWithoutSuggestions.append(smallword)
-
-                #  go through the suggestions and see whether our word matches
-                #  some derivative.
-                for i in range(len(sugg)):
-                    try:
-                        sugg[i] = unicode(sugg[i], 'utf-8')
-                    except UnicodeDecodeError:
-                        sugg[i] = unicode(sugg[i], 'iso8859-1')
-                    if sugg[i] == smallword:
-                        done = True
-
-                if len(sugg) > 0:
-                    bigword.correctword = sugg[0]
-                else:
-                    bigword.correctword = u""
+        #  the suggestions from hunspell were already fetched in stage 2
+        if True:
+            self.checkWords += 1
+            if self._nosuggestions:
+                sugg = []
+            else:
+                sugg = suggest(candidate.word_utf8, candidate.use_alt)
 
-            #######################################################
-            #So now we know whether we have found the word or not #
-            #######################################################
-            if not done:
-                bigword.suggestions = sugg
-                bigword.location = loc
+            if not self._nosuggestions \
+                and len(sugg) == 0 \
+                and not smallword in self._wordsWithoutSuggestions:
+                self._wordsWithoutSuggestions.append(smallword)
 
+            #  go through the suggestions and see whether our word matches
+            #  some derivative.
+            for i in range(len(sugg)):
                 try:
-                    import Levenshtein
+                    sugg[i] = unicode(sugg[i], 'utf-8')
+                except UnicodeDecodeError:
+                    sugg[i] = unicode(sugg[i], 'iso8859-1')
+                if sugg[i] == smallword:
+                    done = True
+
+            if len(sugg) > 0:
+                bigword.correctword = sugg[0]
+            else:
+                bigword.correctword = u""
+
+        #######################################################
+        #So now we know whether we have found the word or not #
+        #######################################################
+        if not done:
+            bigword.suggestions = sugg
+            bigword.location = loc
+
+            try:
+                import Levenshtein
 
-                    lratio = Levenshtein.ratio(bigword.correctword, smallword)
-                    ldist = Levenshtein.distance(bigword.correctword, smallword)
-                    if self.remove_dissimilar and (lratio < 0.7 or ldist > 5):
-                        return
+                lratio = Levenshtein.ratio(bigword.correctword, smallword)
+                ldist = Levenshtein.distance(bigword.correctword, smallword)
+                if self.remove_dissimilar and (lratio < 0.7 or ldist > 5):
+                    return
 
-                except ImportError:
-                    pass
+            except ImportError:
+                pass
 
-                self._unknown.append(smallword);
-                self._unknown_words.append(bigword);
-                return bigword
+            self._unknown.append(smallword);
+            self._unknown_words.append(bigword);
+            return bigword
 
         return 
 
@@ -425,8 +485,103 @@ class HunspellSpellchecker(abstract_Spellchecker):
         self._unknown = []
         self._wordsWithoutSuggestions = []
 
-    def _check_with_hunspell(self, word, useAlternative):
-        return self.hunspell.spell(word) or \
-                (useAlternative and self.hunspell_alternative is not None 
-                 and self.hunspell_alternative.spell(word)) 
+    def _suggestion_key(self, word, use_alt):
+        """ Returns the key (word, use_alt) under which suggestions are stored """
+        return (word, use_alt and self.hunspell_alternative is not None)
+
+    def _suggest_all(self, words):
+        """ Get the suggestions of hunspell for many words
+
+        words is a list of (word_utf8, use_alt). The suggestions are taken
+        from the suggestion_cache if possible, otherwise from the
+        suggestion_pool (if there is one) or from hunspell directly.
+
+        Returns a dictionary with the suggestions of each (word_utf8, use_alt).
+        """
+        result = {}
+        missing = []
+        for word, use_alt in words:
+            key = self._suggestion_key(word, use_alt)
+            if self.suggestion_cache is not None:
+                sugg = self.suggestion_cache.get(*self._cache_key(key))
+                if sugg is not None:
+                    result[key] = sugg
+                    continue
+            missing.append(key)
+
+        if self.suggestion_pool is not None and len(missing) > 0:
+            found = self.suggestion_pool.suggest_all(missing)
+        else:
+            found = {}
+            for word, use_alt in missing:
+                if use_alt:
+                    found[(word, use_alt)] = self.hunspell_alternative.suggest(word)
+                else:
+                    found[(word, use_alt)] = self.hunspell.suggest(word)
+
+        for key in missing:
+            result[key] = found[key]
+            if self.suggestion_cache is not None:
+                self.suggestion_cache.put(*(self._cache_key(key) + (found[key],)))
+        return result
+
+    def _cache_key(self, key):
+        """ Returns (dictionary name, fingerprint, word) for the suggestion cache """
+        word, use_alt = key
+        if use_alt:
+            path = self._alternative_path
+        else:
+            path = self._dictionary_path
+
+        if path not in self._fingerprints:
+            self._fingerprints[path] = dictionary_fingerprint(path)
+        return (os.path.basename(path), self._fingerprints[path], word)
+
+    def _check_word(self, word, use_alt):
+        """ Checks whether hunspell knows a (unicode) word
+
+        The verdicts of the main and the alternative dictionary are cached
+        across pages, so that for frequent words neither encoding nor
+        hunspell is needed. Returns None if the word cannot be encoded for
+        hunspell.
+        """
+        verdict = self._verdicts.get(word)
+        if verdict is None:
+            try:
+                verdict = [bool(self.hunspell.spell(word.encode(hunspellEncoding))), None]
+            except UnicodeEncodeError:
+                verdict = [None, None]
+            self._verdicts.put(word, verdict)
+
+        if verdict[0] is None or verdict[0]:
+            return verdict[0]
+        if not use_alt or self.hunspell_alternative is None:
+            return False
+
+        if verdict[1] is None:
+            verdict[1] = bool(self.hunspell_alternative.spell(word.encode(hunspellEncoding)))
+        return verdict[1]
+
+class PageCandidates(object):
+    """ The unknown words (candidates) of a text, see collect_candidates """
+
+    def __init__(self, text):
+        self.text = text
+        self.candidates = []
+
+class UnknownWord(object):
+    """ A word of a text that is not known to hunspell
+
+    skip is True if the rules say that the word should not be reported.
+    """
+
+    __slots__ = ['text', 'smallword', 'bigword', 'loc', 'use_alt', 'word_utf8', 'skip']
 
+    def __init__(self, text, smallword, bigword, loc, use_alt):
+        self.text = text
+        self.smallword = smallword
+        self.bigword = bigword
+        self.loc = loc
+        self.use_alt = use_alt
+        self.word_utf8 = smallword.encode('utf8')
+        self.skip = False
@@ -256,7 +256,7 @@ class InteractiveSearchReplacer(abstract_Spellchecker):
             myranges = self.forbiddenRanges(text, level="moderate")
             r = ranges.Ranges()
             r.ranges = myranges
-            ext_r = r.get_large_ranges()
+            ext_r = r.get_interval_index()
 
             wupper = wrong[0].upper() + wrong[1:]
             wlower = wrong[0].lower() + wrong[1:]
@@ -270,7 +270,7 @@ class InteractiveSearchReplacer(abstract_Spellchecker):
             while True:
                 found = newtext.find(wupper, pos)
                 pos += found + 1
-                if found in ext_r and found != -1:
+                if found != -1 and ext_r.contains(found):
                     # Skip excluded position
                     continue
                 if found == -1:
@@ -285,7 +285,7 @@ class InteractiveSearchReplacer(abstract_Spellchecker):
                 while True: 
                     found = newtext.find( wlower, pos)
                     pos += found + 1
-                    if found in ext_r and found != -1:
+                    if found != -1 and ext_r.contains(found):
                         # Skip excluded position
                         continue
                     if found == -1:
@@ -0,0 +1,99 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+Simple bounded caches that evict entries which were not used recently
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+from collections import OrderedDict
+
+class LRUCache(object):
+    """ A dictionary-like cache holding at most maxsize entries
+
+    When the cache is full, the entry that was used least recently is
+    removed to make room for a new one.
+
+    Possible usage
+    >>> cache = LRUCache(1000)
+    >>> cache.put('word', ['suggestion'])
+    >>> cache.get('word')
+    ['suggestion']
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        """ Returns the value for key (and marks it as recently used) """
+        try:
+            value = self._data.pop(key)
+        except KeyError:
+            return default
+        self._data[key] = value
+        return value
+
+    def put(self, key, value):
+        """ Stores a value, removing the least recently used entry if needed """
+        if key in self._data:
+            del self._data[key]
+        elif len(self._data) >= self.maxsize:
+            self._data.popitem(last=False)
+        self._data[key] = value
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+class GenerationalCache(object):
+    """ An approximate least-recently-used cache built from two dictionaries
+
+    New entries go into the current generation. When it holds maxsize
+    entries, it becomes the old generation and the previous old generation
+    is dropped. Entries found in the old generation are moved back into the
+    current one. At most 2 * maxsize entries are kept.
+
+    Lookups are plain dictionary lookups, which makes this cache much
+    cheaper than LRUCache for very frequent lookups of small values.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._current = {}
+        self._old = {}
+
+    def get(self, key, default=None):
+        try:
+            return self._current[key]
+        except KeyError:
+            pass
+        try:
+            value = self._old.pop(key)
+        except KeyError:
+            return default
+        self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        if len(self._current) >= self.maxsize and key not in self._current:
+            self._old = self._current
+            self._current = {}
+        self._current[key] = value
+
+    def clear(self):
+        self._current = {}
+        self._old = {}
+
+    def __contains__(self, key):
+        return key in self._current or key in self._old
+
+    def __len__(self):
+        return len(self._current) + len(self._old)
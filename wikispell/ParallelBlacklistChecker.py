@@ -0,0 +1,69 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+Check a stream of pages against a blacklist using multiple processes
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+import multiprocessing
+from collections import deque
+
+from BlacklistSpellchecker import CompiledBlacklistChecker
+
+# Waiting for a result without a timeout cannot be interrupted (Ctrl-C) in
+# Python 2, therefore results are fetched with this (very long) timeout
+RESULT_TIMEOUT = 365 * 24 * 3600
+
+# The checker of a worker process, set up once by _init_worker
+_worker_checker = None
+
+def _init_worker(badDict, range_level):
+    global _worker_checker
+    _worker_checker = CompiledBlacklistChecker(badDict, range_level=range_level)
+
+def _check_text(text):
+    return _worker_checker.check(text)
+
+class ParallelBlacklistChecker(object):
+    """ Spellcheck pages against a blacklist in a pool of worker processes
+
+    Each worker holds its own CompiledBlacklistChecker with the blacklist
+    loaded once at startup. Pages are read lazily from the input iterable
+    (e.g. a streaming XML dump parser) and only their text is sent to the
+    workers. At most queue_size pages are in flight at any time, which
+    bounds the memory used independent of the size of the input.
+
+    Possible usage
+    >>> checker = ParallelBlacklistChecker({'deuschland' : 'Deutschland'}, 8)
+    >>> for page, words in checker.check_pages(generator):
+    ...     page.words = words
+    """
+
+    def __init__(self, badDict, workers, range_level="full", queue_size=None):
+        self.workers = workers
+        if queue_size is None:
+            queue_size = 50 * workers
+        self.queue_size = queue_size
+        self._pool = multiprocessing.Pool(workers, _init_worker,
+                                          (badDict, range_level))
+
+    def check_pages(self, pages):
+        """ Yields (page, words) for all pages, in the order of the input """
+        pending = deque()
+        for page in pages:
+            pending.append( (page, self._pool.apply_async(_check_text, (page.text,))) )
+            if len(pending) >= self.queue_size:
+                page, result = pending.popleft()
+                yield page, result.get(RESULT_TIMEOUT)
+
+        while pending:
+            page, result = pending.popleft()
+            yield page, result.get(RESULT_TIMEOUT)
+
+    def close(self):
+        """ Stops the worker processes """
+        self._pool.terminate()
+        self._pool.join()
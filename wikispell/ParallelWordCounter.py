@@ -0,0 +1,89 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+Count the words of a stream of pages using multiple processes
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+import multiprocessing
+from collections import Counter, deque
+
+from BlacklistSpellchecker import BlacklistSpellchecker
+
+# Waiting for a result without a timeout cannot be interrupted (Ctrl-C) in
+# Python 2, therefore results are fetched with this (very long) timeout
+RESULT_TIMEOUT = 365 * 24 * 3600
+
+# The spellchecker of a worker process, set up once by _init_worker
+_worker_spellchecker = None
+
+def _init_worker():
+    global _worker_spellchecker
+    _worker_spellchecker = BlacklistSpellchecker()
+
+def count_words(texts, spellchecker=None):
+    """ Returns a Counter of the words (utf8) in the texts
+
+    The words are the same as those stored in the word frequency table (see
+    spellcheck_blacklist with return_for_db).
+    """
+    if spellchecker is None:
+        spellchecker = _worker_spellchecker
+    counts = Counter()
+    for text in texts:
+        for word in spellchecker.spellcheck_blacklist(text, {}, return_for_db=True):
+            counts[word.encode('utf8')] += 1
+    return counts
+
+class ParallelWordCounter(object):
+    """ Count the words of pages in a pool of worker processes
+
+    The pages are read lazily from the input iterable (e.g. a streaming XML
+    dump parser) and their texts are sent to the workers in batches of
+    batch_size pages. Each worker counts the words of a batch and returns
+    them as a Counter, these partial counts are then added up by the caller
+    (e.g. in a WordCounter). Since only the counts are added, the result is
+    the same as when counting in a single process. At most queue_size
+    batches are in flight at any time.
+
+    Possible usage
+    >>> parallelCounter = ParallelWordCounter(8)
+    >>> counter = WordCounter()
+    >>> for counts in parallelCounter.count_pages(generator):
+    ...     counter.add_counts(counts)
+    >>> parallelCounter.close()
+    """
+
+    def __init__(self, workers, batch_size=100, queue_size=None):
+        self.workers = workers
+        self.batch_size = batch_size
+        if queue_size is None:
+            queue_size = 4 * workers
+        self.queue_size = queue_size
+        self._pool = multiprocessing.Pool(workers, _init_worker)
+
+    def count_pages(self, pages):
+        """ Yields a Counter of the words for each batch of pages """
+        pending = deque()
+        batch = []
+        for page in pages:
+            batch.append(page.text)
+            if len(batch) < self.batch_size:
+                continue
+            pending.append(self._pool.apply_async(count_words, (batch,)))
+            batch = []
+            if len(pending) >= self.queue_size:
+                yield pending.popleft().get(RESULT_TIMEOUT)
+
+        if batch:
+            pending.append(self._pool.apply_async(count_words, (batch,)))
+        while pending:
+            yield pending.popleft().get(RESULT_TIMEOUT)
+
+    def close(self):
+        """ Stops the worker processes """
+        self._pool.terminate()
+        self._pool.join()
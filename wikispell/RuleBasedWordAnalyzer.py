@@ -11,6 +11,8 @@ import re, sys
 import string, codecs
 import time
 
+from CompactWordSet import CompactWordSet
+
 class RuleBasedWordAnalyzer():
 
     def __init__(self, minimal_word_size, multiple_occurence_tol, language,
@@ -23,8 +25,19 @@ class RuleBasedWordAnalyzer():
         self.composite_minlen = composite_minlen
         self.stringent = stringent
 
-    def skipWord(self, smallword, text, loc, use_alt):
-        
+    def _prefix_lengths(self, word):
+        """ Returns the lengths of all prefixes of word that are common words """
+        if isinstance(self.common_words, CompactWordSet):
+            return self.common_words.prefix_lengths(word)
+        return [i for i in range(1, len(word) + 1) if word[:i] in self.common_words]
+
+    def skipWord(self, smallword, text, loc, use_alt, index=None):
+        """ Returns whether the word at loc in text should not be checked
+
+        If a TextIndex of the text is given, the occurrences of each word
+        are only counted once per text.
+        """
+
         #  If hunspell doesn't know it, doesn't mean it is not correct
         #  This not only reduces the number of words considered to be
         #  incorrect but also makes it much faster since the feature
@@ -67,7 +80,10 @@ class RuleBasedWordAnalyzer():
         #
         #  (e) - skip if the word occurs more than n times in the text
         #
-        if text.count(smallword) > self.multiple_occurence_tol:
+        if index is not None:
+            if index.count(smallword) > self.multiple_occurence_tol:
+                return True
+        elif text.count(smallword) > self.multiple_occurence_tol:
             # print "found word", smallword.encode("utf8"), "multiple times:", text.count(smallword)
             return True
 
@@ -125,75 +141,76 @@ class RuleBasedWordAnalyzer():
                 return True
 
         if (self.language == "DE" or self.language == "EN") and self.stringent < 60:
-            for i in range(2, len(smallword)):
+            lowerword = smallword.lower()
+            for i in self._prefix_lengths(lowerword):
+
+                if i < 2 or i >= len(smallword):
+                    continue
 
-                first_part = smallword[0:i].lower()
+                first_part = lowerword[0:i]
 
                 if len(first_part) <= self.composite_minlen: 
                     continue
 
-                if first_part in self.common_words:
-                    other_part = smallword[i:].lower()
-
-                    if self.language == "EN":
-                        if other_part in ["ly"]:
-                            # print "Skip English composite word ending with ly: ", smallword.encode("utf8")
-                            return True
-                        elif other_part in self.common_words:
-                            # print "Skip English composite word", smallword[0:i].encode("utf8"), smallword[i:].encode("utf8")
-                            return True
-
-                    # We should not trust "endings" that are less than 3 characters long
-                    #   Some of them are allowed in German, so we should explicitely include them
-                    #  - see https://de.wikipedia.org/wiki/Deutsche_Deklination#Grunds.C3.A4tze 
-                    #  - see https://de.wikipedia.org/wiki/Deutsche_Deklination#Starke_Deklination_der_Adjektive
-                    elif len(other_part) < 3:
-                        if other_part in ["n", "r", "s", "e", "en", "er",  "es", "em"]:
-                            # print "Skip word according to German declension", smallword[0:i].encode("utf8"), "+", smallword[i:].encode("utf8")
-                            return True
-
-                        elif other_part in self.common_words:
-                            # print "SPECIAL: strange ending!!!: ", "composite word", smallword[0:i].encode("utf8"), "+", smallword[i:].encode("utf8")
-                            pass
-
-
-                    elif self.language == "DE" and other_part in ["ern"]:
-                        # print "SPECIAL: strange ending ern !!!: "
-                        pass
-
-                    elif len(other_part) <= self.composite_minlen:
-                        continue
+                other_part = lowerword[i:]
 
+                if self.language == "EN":
+                    if other_part in ["ly"]:
+                        # print "Skip English composite word ending with ly: ", smallword.encode("utf8")
+                        return True
                     elif other_part in self.common_words:
-                        # print "skip composite word", smallword[0:i].encode("utf8"), smallword[i:].encode("utf8")
+                        # print "Skip English composite word", smallword[0:i].encode("utf8"), smallword[i:].encode("utf8")
                         return True
 
-                    elif i +2 < len(smallword) and smallword[i:i+1] == "s" and len(first_part) > 2:
-                        # potential "Fugenlaut" in German, see https://de.wikipedia.org/wiki/Fugenlaut
-                        other_part = smallword[i+1:].lower()
-                        if other_part in self.common_words:
-                            # print "skip composite fugenlaut word", smallword[0:i].encode("utf8"), "+s+", smallword[i+1:].encode("utf8")
-                            return True
-
-                    # try composite word in German with 1-letter ending
-                    elif self.language == "DE" and \
-                            other_part[:len(other_part)-1] in self.common_words and \
-                            len(first_part) > 2 and \
-                            len(other_part) > 4 and \
-                            other_part[len(other_part)-1:] in ["n", "r", "s", "e"]:
-                        # print "SPECIAL: skip composite word (1 letter)", smallword[0:i].encode("utf8"), "+", smallword[i:].encode("utf8")
+                # We should not trust "endings" that are less than 3 characters long
+                #   Some of them are allowed in German, so we should explicitely include them
+                #  - see https://de.wikipedia.org/wiki/Deutsche_Deklination#Grunds.C3.A4tze 
+                #  - see https://de.wikipedia.org/wiki/Deutsche_Deklination#Starke_Deklination_der_Adjektive
+                elif len(other_part) < 3:
+                    if other_part in ["n", "r", "s", "e", "en", "er",  "es", "em"]:
+                        # print "Skip word according to German declension", smallword[0:i].encode("utf8"), "+", smallword[i:].encode("utf8")
                         return True
 
-                    # try composite word in German with 2-letter ending
-                    elif self.language == "DE" and \
-                            other_part[:len(other_part)-2] in self.common_words and \
-                            len(first_part) > 2 and \
-                            len(other_part) > 5 and \
-                            other_part[len(other_part)-2:] in ["en", "er",  "es", "em"]:
-                        # print "SPECIAL: skip composite word (2 letter)", smallword[0:i].encode("utf8"), "+", smallword[i:].encode("utf8")
+                    elif other_part in self.common_words:
+                        # print "SPECIAL: strange ending!!!: ", "composite word", smallword[0:i].encode("utf8"), "+", smallword[i:].encode("utf8")
+                        pass
+
+
+                elif self.language == "DE" and other_part in ["ern"]:
+                    # print "SPECIAL: strange ending ern !!!: "
+                    pass
+
+                elif len(other_part) <= self.composite_minlen:
+                    continue
+
+                elif other_part in self.common_words:
+                    # print "skip composite word", smallword[0:i].encode("utf8"), smallword[i:].encode("utf8")
+                    return True
+
+                elif i +2 < len(smallword) and smallword[i:i+1] == "s" and len(first_part) > 2:
+                    # potential "Fugenlaut" in German, see https://de.wikipedia.org/wiki/Fugenlaut
+                    other_part = lowerword[i+1:]
+                    if other_part in self.common_words:
+                        # print "skip composite fugenlaut word", smallword[0:i].encode("utf8"), "+s+", smallword[i+1:].encode("utf8")
                         return True
 
-                    other_part = smallword[i:].lower()
+                # try composite word in German with 1-letter ending
+                elif self.language == "DE" and \
+                        other_part[:len(other_part)-1] in self.common_words and \
+                        len(first_part) > 2 and \
+                        len(other_part) > 4 and \
+                        other_part[len(other_part)-1:] in ["n", "r", "s", "e"]:
+                    # print "SPECIAL: skip composite word (1 letter)", smallword[0:i].encode("utf8"), "+", smallword[i:].encode("utf8")
+                    return True
+
+                # try composite word in German with 2-letter ending
+                elif self.language == "DE" and \
+                        other_part[:len(other_part)-2] in self.common_words and \
+                        len(first_part) > 2 and \
+                        len(other_part) > 5 and \
+                        other_part[len(other_part)-2:] in ["en", "er",  "es", "em"]:
+                    # print "SPECIAL: skip composite word (2 letter)", smallword[0:i].encode("utf8"), "+", smallword[i:].encode("utf8")
+                    return True
 
         return False
 
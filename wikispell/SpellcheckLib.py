@@ -11,6 +11,7 @@ A library of spellchecking helper classes and functions
 import time, sys
 import re, string
 import codecs
+import itertools, struct
 
 # local imports
 from Word import Word, WrongWord
@@ -118,10 +119,29 @@ def cap(string):
     # uncapitalize the first word of the string
     return string[0].upper() + string[1:]
 
+# Header of the binary blacklist format: magic, number of entries and
+# length of the keys, followed by the keys and the values (UTF-8, one per line)
+BLACKLIST_MAGIC = 'WSPBLCK1'
+
 def readBlacklist(filename, badDict, encoding="utf8"):
     """
     Read in a list of wrong words
+
+    Files written by compileBlacklist are detected and read directly.
     """
+    f = open(filename, 'rb')
+    head = f.read(len(BLACKLIST_MAGIC))
+    if head == BLACKLIST_MAGIC:
+        n, keylen = struct.unpack('<II', f.read(8))
+        data = f.read()
+        f.close()
+        if n > 0:
+            keys = data[:keylen].decode('utf8').split('\n')
+            values = data[keylen:].decode('utf8').split('\n')
+            badDict.update(itertools.izip(keys, values))
+        return
+    f.close()
+
     f = codecs.open(filename, 'r', encoding = encoding)
     for line in f.readlines():
         # remove trailing newlines and carriage returns
@@ -144,5 +164,18 @@ def writeBlacklist(filename, encoding, badDict):
         f.write('%s;%s\n' % (key, badDict[key]))
     f.close()
 
+def compileBlacklist(filename, badDict):
+    """
+    Write out a list of wrong words in the binary format (fast to read)
+    """
+    keys = sorted(badDict.keys())
+    keydata = '\n'.join(keys).encode('utf8')
+    f = open(filename, 'wb')
+    f.write(BLACKLIST_MAGIC)
+    f.write(struct.pack('<II', len(keys), len(keydata)))
+    f.write(keydata)
+    f.write('\n'.join([badDict[key] for key in keys]).encode('utf8'))
+    f.close()
+
 if __name__ == "__main__":
     pass
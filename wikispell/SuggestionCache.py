@@ -0,0 +1,145 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+A persistent cache for the suggestions of a spellchecker
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+import hashlib
+import os.path
+import sqlite3
+
+from LRUCache import LRUCache
+
+class SuggestionCache(object):
+    """ Cache the suggestions of hunspell on disk
+
+    Getting suggestions from hunspell is by far the slowest part of a
+    spellcheck, while the same misspellings occur on many pages and in every
+    run over a dump. This cache stores the suggestions in an SQLite database
+    (or only in memory if no file name is given), with an in-process LRU
+    cache in front of it.
+
+    Entries are keyed by the name of the dictionary, a fingerprint of the
+    dictionary files (see dictionary_fingerprint) and the word, so that
+    suggestions of an updated dictionary are not mixed with old ones.
+    Suggestions are stored as returned by hunspell (as byte strings).
+
+    Possible usage
+    >>> cache = SuggestionCache('suggestions.sqlite')
+    >>> fp = dictionary_fingerprint('/usr/share/hunspell/de_DE')
+    >>> sugg = cache.get('de_DE', fp, word)
+    >>> if sugg is None:
+    ...     sugg = hunspell.suggest(word)
+    ...     cache.put('de_DE', fp, word, sugg)
+    >>> cache.close()
+    """
+
+    def __init__(self, filename=None, maxsize=100000, commit_every=1000):
+        self.filename = filename
+        self.commit_every = commit_every
+        self._memory = LRUCache(maxsize)
+        self._uncommitted = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if filename is not None:
+            self._db = sqlite3.connect(filename)
+            self._db.text_factory = str
+            self._db.execute("""CREATE TABLE IF NOT EXISTS suggestions (
+                dictionary TEXT, fingerprint TEXT, word BLOB, suggestions BLOB,
+                PRIMARY KEY (dictionary, fingerprint, word))""")
+            self._db.commit()
+
+    def get(self, dictionary, fingerprint, word):
+        """ Returns the cached list of suggestions or None """
+        key = (dictionary, fingerprint, word)
+        sugg = self._memory.get(key)
+        if sugg is not None:
+            self.memory_hits += 1
+            return list(sugg)
+
+        if self._db is not None:
+            row = self._db.execute("""SELECT suggestions FROM suggestions
+                WHERE dictionary = ? AND fingerprint = ? AND word = ?""",
+                (dictionary, fingerprint, sqlite3.Binary(word))).fetchone()
+            if row is not None:
+                self.disk_hits += 1
+                sugg = _unpack(row[0])
+                self._memory.put(key, sugg)
+                return list(sugg)
+
+        self.misses += 1
+        return None
+
+    def put(self, dictionary, fingerprint, word, suggestions):
+        """ Stores the list of suggestions for a word """
+        suggestions = list(suggestions)
+        self._memory.put((dictionary, fingerprint, word), suggestions)
+
+        if self._db is not None:
+            self._db.execute("""INSERT OR REPLACE INTO suggestions
+                (dictionary, fingerprint, word, suggestions) VALUES (?, ?, ?, ?)""",
+                (dictionary, fingerprint, sqlite3.Binary(word),
+                 sqlite3.Binary(_pack(suggestions))))
+            self._uncommitted += 1
+            if self._uncommitted >= self.commit_every:
+                self.commit()
+
+    def commit(self):
+        """ Writes all new entries to disk """
+        if self._db is not None:
+            self._db.commit()
+        self._uncommitted = 0
+
+    def close(self):
+        if self._db is not None:
+            self.commit()
+            self._db.close()
+            self._db = None
+
+    def hits(self):
+        return self.memory_hits + self.disk_hits
+
+    def stats(self):
+        """ Returns a short summary of hits and misses """
+        total = self.hits() + self.misses
+        ratio = 0.0
+        if total > 0:
+            ratio = self.hits() * 100.0 / total
+        return "Suggestion cache: %s hits (%s in memory, %s on disk), %s misses (%0.1f%% hits)" % (
+            self.hits(), self.memory_hits, self.disk_hits, self.misses, ratio)
+
+def dictionary_fingerprint(hunspell_dict):
+    """ Returns a fingerprint of the .dic and .aff files of a hunspell dictionary
+
+    hunspell_dict is the path without extension (e.g. /usr/share/hunspell/de_DE)
+    """
+    md5 = hashlib.md5()
+    for ext in [".dic", ".aff"]:
+        filename = hunspell_dict + ext
+        if not os.path.isfile(filename):
+            continue
+        f = open(filename, 'rb')
+        while True:
+            data = f.read(1024 * 1024)
+            if not data:
+                break
+            md5.update(data)
+        f.close()
+    return md5.hexdigest()
+
+def _pack(suggestions):
+    return "\n".join(suggestions)
+
+def _unpack(data):
+    data = str(data)
+    if len(data) == 0:
+        return []
+    return data.split("\n")
@@ -0,0 +1,57 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+Compute hunspell suggestions in a pool of worker processes
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+import multiprocessing
+from DictionaryRegistry import registry
+
+# The dictionaries of a worker process, loaded once by _init_worker
+_worker_hunspell = None
+_worker_hunspell_alternative = None
+
+def _init_worker(hunspell_dict, alternative_dict):
+    global _worker_hunspell, _worker_hunspell_alternative
+    _worker_hunspell = registry.get(hunspell_dict)
+    if alternative_dict is not None:
+        _worker_hunspell_alternative = registry.get(alternative_dict)
+
+def _suggest(key):
+    word, use_alt = key
+    if use_alt and _worker_hunspell_alternative is not None:
+        return _worker_hunspell_alternative.suggest(word)
+    return _worker_hunspell.suggest(word)
+
+class SuggestionPool(object):
+    """ A pool of processes that get suggestions from hunspell
+
+    Each worker loads the main and the alternative dictionary once. Words
+    are given as (word_utf8, use_alt) where use_alt selects the alternative
+    dictionary.
+
+    Possible usage
+    >>> pool = SuggestionPool('/usr/share/hunspell/de_DE', '/usr/share/hunspell/de_CH', 8)
+    >>> pool.suggest_all([ ('Deuschland', False) ])
+    {('Deuschland', False): ['Deutschland']}
+    """
+
+    def __init__(self, hunspell_dict, alternative_dict=None, workers=2):
+        self.workers = workers
+        self._pool = multiprocessing.Pool(workers, _init_worker,
+                                          (hunspell_dict, alternative_dict))
+
+    def suggest_all(self, words):
+        """ Returns a dictionary with the suggestions for each (word_utf8, use_alt) """
+        words = list(words)
+        chunksize = max(1, len(words) // (4 * self.workers))
+        return dict(zip(words, self._pool.map(_suggest, words, chunksize)))
+
+    def close(self):
+        """ Stops the worker processes """
+        self._pool.terminate()
+        self._pool.join()
@@ -0,0 +1,70 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+Answers how often a word occurs in a page, counting each word only once
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+import re
+from collections import Counter
+
+# Maximal runs of the characters that match \w (and thus define \b) in a
+# regex without the re.UNICODE flag
+_ascii_tokens = re.compile(r'[A-Za-z0-9_]+')
+_ascii_word = re.compile(r'[A-Za-z0-9_]+\Z')
+
+class TextIndex(object):
+    """ A per-page cache of word counts
+
+    The answers are exactly the same as the ones of text.count(word) and of
+    counting the matches of r'\\bword\\b' in the text:
+
+        - count_word(word) is a dictionary lookup if the word only consists
+          of ASCII word characters (then every match of r'\\bword\\b' is a
+          token of its own), other words fall back to the regex
+        - count(word) is the same as text.count(word) and is memoized
+          (text.count runs in C and is faster than any index built in
+          Python for the few lookups of a page)
+
+    Possible usage
+    >>> index = TextIndex(u"Der Hund des Hundes und der Hund")
+    >>> index.count_word(u"Hund")
+    2
+    >>> index.count(u"Hund")
+    3
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self._ascii_tokens = None
+        self._counts = {}
+        self._word_counts = {}
+
+    def count(self, word):
+        """ Returns the number of non-overlapping occurrences of word (as text.count) """
+        try:
+            return self._counts[word]
+        except KeyError:
+            c = self._counts[word] = self.text.count(word)
+            return c
+
+    def count_word(self, word):
+        """ Returns the number of matches of r'\\bword\\b' in the text
+
+        As with re.finditer, word is used as a regular expression (and
+        re.error is raised for invalid ones).
+        """
+        if _ascii_word.match(word):
+            if self._ascii_tokens is None:
+                self._ascii_tokens = Counter(_ascii_tokens.findall(self.text))
+            return self._ascii_tokens[word]
+
+        try:
+            return self._word_counts[word]
+        except KeyError:
+            c = len(re.findall(r'\b%s\b' % word, self.text))
+            self._word_counts[word] = c
+            return c
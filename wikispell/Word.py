@@ -11,6 +11,8 @@ A class for storing a wrong word identified during spellcheck
 import time, sys
 import re, string
 
+import tokenizer
+
 try:
     import wikipedia as pywikibot
 except ImportError:
@@ -34,48 +36,7 @@ class Word(object):
     def derive(self):
         # Get the short form of the word, without punctuation, square
         # brackets etcetera
-        shortword = self.word
-        # Remove all words of the form [[something:something - these are
-        # usually interwiki links or category links
-        if shortword.rfind(':') != -1:
-            if -1 < shortword.rfind('[[') < shortword.rfind(':'):
-                shortword = ""
-        # Remove barred links
-        if shortword.rfind('|') != -1:
-            if -1 < shortword.rfind('[[') < shortword.rfind('|'):
-                shortword = shortword[:shortword.rfind('[[')] + shortword[
-                    shortword.rfind('|') + 1:]
-            else:
-                shortword = shortword[shortword.rfind('|') + 1:]
-        shortword = shortword.replace('[', '')
-        shortword = shortword.replace(']', '')
-        #replace all occurencs of &nbsp;
-        shortword = shortword.replace('&nbsp;', ' ')
-        shortword = shortword.replace('nbsp;', ' ')
-        shortword = shortword.replace(u'\xa0', ' ')
-        # Remove non-alphanumerical characters at the start
-        try:
-            while shortword[0] in string.punctuation + u'«»–−→“„‚‘’':
-                shortword = shortword[1:]
-        except IndexError:
-            return ""
-        # Remove non-alphanumerical characters at the end; no need for the
-        # try here because if things go wrong here, they should have gone
-        # wrong before
-        while shortword[-1] in string.punctuation + u'«»–−→“„‚‘’':
-            shortword = shortword[:-1]
-        # Do not check URLs
-        if shortword.startswith("http://") or shortword.startswith("https://") or shortword.startswith("www."):
-            shortword=""
-        # Do not check 'words' with only numerical characters
-        number = True
-        for i in xrange(len(shortword)):
-            if not (shortword[i] in string.punctuation or
-                    shortword[i] in string.digits):
-                number = False
-        if number:
-            shortword = ""
-        return shortword
+        return tokenizer.derive(self.word)
 
     def replace(self, rep):
         """Replace the short form by 'rep'. Keeping simple for now - if the
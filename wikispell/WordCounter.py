@@ -0,0 +1,128 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+Count the words of a whole dump in bounded memory
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+import heapq
+import os
+import shutil
+import tempfile
+
+class WordCounter(object):
+    """ Counts words, spilling the counts to disk when there are too many
+
+    At most max_words distinct words are counted in memory. When this limit
+    is reached, the counts are written to a run file on disk sorted by word
+    and counting starts again with an empty dictionary. At the end, items()
+    merges all runs (reading each one sequentially) and yields the total
+    count of every word in sorted order, ready to be bulk loaded into a
+    WordFrequencyStore.
+
+    To keep the number of open files low, the runs are merged into a single
+    run whenever there are max_runs of them.
+
+    Words can be unicode or utf8 strings and must not contain tabs or line
+    breaks (the words of the tokenizer never do).
+
+    Possible usage
+    >>> counter = WordCounter(max_words=2)
+    >>> counter.add([u'Haus', u'Boot', u'Haus'])
+    >>> counter.add([u'Zug', u'Haus'])
+    >>> list(counter.items())
+    [(1, 'Boot'), (3, 'Haus'), (1, 'Zug')]
+    >>> counter.close()
+    """
+
+    def __init__(self, max_words=1000000, tmpdir=None, max_runs=100):
+        self.max_words = max_words
+        self.max_runs = max_runs
+        self._tmpdir = tempfile.mkdtemp(prefix="wordcounts", dir=tmpdir)
+        self._counts = {}
+        self._runs = []
+        self._nr_files = 0
+
+    def add(self, words):
+        """ Counts each of the words once """
+        counts = self._counts
+        for word in words:
+            if isinstance(word, unicode):
+                word = word.encode('utf8')
+            counts[word] = counts.get(word, 0) + 1
+            if len(counts) >= self.max_words:
+                self._spill()
+                counts = self._counts
+
+    def add_counts(self, counts):
+        """ Adds the counts of a dictionary (e.g. a Counter) mapping words to
+        their number of occurrences
+        """
+        for word, count in counts.iteritems():
+            if isinstance(word, unicode):
+                word = word.encode('utf8')
+            self._counts[word] = self._counts.get(word, 0) + count
+            if len(self._counts) >= self.max_words:
+                self._spill()
+
+    def _spill(self):
+        """ Writes the current counts to a sorted run on disk """
+        if not self._counts:
+            return
+        self._runs.append(self._write_run(sorted(self._counts.iteritems())))
+        self._counts = {}
+        if len(self._runs) >= self.max_runs:
+            runs = self._runs
+            self._runs = [self._write_run((word, count) for count, word in self._merge(runs))]
+            for filename in runs:
+                os.remove(filename)
+
+    def _write_run(self, items):
+        """ Writes the sorted (word, count) items to a new run file """
+        self._nr_files += 1
+        filename = os.path.join(self._tmpdir, "run%05d" % self._nr_files)
+        f = open(filename, 'wb')
+        f.writelines("%s\t%s\n" % (word, count) for word, count in items)
+        f.close()
+        return filename
+
+    def runs(self):
+        """ The number of runs written to disk so far """
+        return len(self._runs)
+
+    def items(self):
+        """ Yields (occurence, word) for all words sorted by word (utf8) """
+        self._spill()
+        return self._merge(self._runs)
+
+    def _merge(self, runs):
+        """ Yields (occurence, word) for all words in the runs """
+        files = [open(filename, 'rb') for filename in runs]
+        try:
+            merged = heapq.merge(*[_read_run(f) for f in files])
+            current, total = None, 0
+            for word, count in merged:
+                if word != current:
+                    if current is not None:
+                        yield total, current
+                    current, total = word, 0
+                total += count
+            if current is not None:
+                yield total, current
+        finally:
+            for f in files:
+                f.close()
+
+    def close(self):
+        """ Removes the runs from disk """
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+        self._runs = []
+        self._counts = {}
+
+def _read_run(f):
+    for line in f:
+        word, count = line[:-1].rsplit("\t", 1)
+        yield word, int(count)
@@ -3,7 +3,8 @@
 """
 A class used for frequency-based word processing.
 
-Use this class to identify potential candidates using find_candidates based on a given word.
+Use this class to identify potential candidates using find_candidates based on a given word
+(optionally using an index of the rare words built with build_index).
 Then use load_candidates to identify pages in the Wiki where these words occur.
 Finally use checkit to go through the words.
 
@@ -24,90 +25,76 @@ except ImportError:
     from pywikibot import pagegenerators
     newBot = True
 
-hspell = None
-try:
-    import hunspell
-    hspell = hunspell.HunSpell("/usr/share/hunspell/de_DE" + ".dic", "/usr/share/hunspell/de_DE" + ".aff")
-except Exception:
-    pass
+from DictionaryRegistry import LazyDictionary
+from BKTree import BKTree
+from WordFrequencyStore import WordFrequencyStore, MySQLWordFrequencyStore
+
+def _store(store, db_):
+    """ Returns a WordFrequencyStore (a bare MySQL cursor reads the table db_) """
+    if isinstance(store, WordFrequencyStore):
+        return store
+    return MySQLWordFrequencyStore(None, db_, cursor=store)
 
 class WordFrequencyChecker():
 
-    def __init__(self, pm):
+    def __init__(self, pm, hunspell_dict="/usr/share/hunspell/de_DE"):
         self.pm = pm
+        # Only loaded when candidates are checked (if it is available)
+        self.hunspell = LazyDictionary(hunspell_dict)
+
+    def build_index(self, store, occurence_cutoff = 20, db_='hroest.countedwords'):
+        """
+        Build an index of all words occurring less than occurence_cutoff times
+
+        store is a WordFrequencyStore (or a MySQL cursor for the table db_).
+
+        Returns a BKTree with the words (unicode) and their occurrence,
+        to be passed to find_candidates.
+        """
+        store = _store(store, db_)
+        index = BKTree()
+        for occurence, smallword in store.rare_words(occurence_cutoff):
+            if '\xc2\xad' in smallword:
+                continue
+            index.add(smallword.decode('utf8'), occurence)
+        return index
 
     #
     ## Find and evaluate Levenshtein candidates
     # 
-    def find_candidates(self, myw, cursor, 
+    def find_candidates(self, myw, store, 
                         occurence_cutoff = 20, lcutoff = 0.8,
-                        db_='hroest.countedwords', ldistance = 6, applyFilter=True):
+                        db_='hroest.countedwords', ldistance = 6, applyFilter=True,
+                        index=None):
         """
         Find candidate misspellings for the input (correct) myw 
 
+        store : the WordFrequencyStore with the word counts (or a MySQL
+                cursor for the table db_)
         occurence_cutoff : consider all words above this cutoff as correct
         lcutoff : Only consider candidates that are above this Levenshtein ratio
         ldistance : Only consider candidates that are below this Levenshtein distance
+        index : an index of the rare words (see build_index)
 
         Searches for all words starting with the same 3 characters in
         Wikipedia, then selects candidates among those with a Levenshtein ratio
         of less than the given cutoff. Also the word occur less than
         occurence_cutoff to be considered a candidate.
-        """
-
-        import Levenshtein
-
-        # \xc2\xad is a soft hyphen that is sometimes used instead of a space
 
-        # 1. Search for all words that start with the same 3 chars
-        sterm = myw[:3]
-        l = len(myw)
-        cursor.execute(
+        If an index is given, all words within the Levenshtein distance are
+        taken from the index instead (which also finds words that differ in
+        the first characters).
         """
-        select * from %s where smallword like '%s'
-        #and length(smallword) between %s and %s
-        and smallword not like '%s'
-        and occurence < %s
-        order by smallword
-        """ % (db_, sterm.encode('utf8')+'%', l-2, l+2, myw.encode('utf8')+'%' , occurence_cutoff))
-        similar = cursor.fetchall()
-
-        # 2 Select candidates that have a Levenshtein ratio less than the cutoff
-        candidates = [s[1] for s in similar if 
-                      Levenshtein.ratio(myw,s[1].decode('utf8')) > lcutoff and
-                      Levenshtein.distance(myw,s[1].decode('utf8')) < ldistance and
-                      not '\xc2\xad' in s[1]] 
 
-        if False and len(myw) > 9:
-                sterm = "%" + myw[ 3:7] + "%"
-                cursor.execute(
-                """
-                select * from %s where smallword like '%s' 
-                #and length(smallword) between %s and %s
-                and smallword not like '%s'
-                and occurence < %s
-                order by smallword 
-                """ % (db_, sterm.encode('utf8'), l-2, l+2, myw.encode('utf8')+'%', occurence_cutoff) )
-                similar = cursor.fetchall()
-
-                
-        # 3. Search for all words that start with the same char and end with the same 3 chars
-        sterm = myw[0] + '%' + myw[-3:]
-        cursor.execute(
-        """
-        select * from %s where smallword like '%s' 
-        #and length(smallword) between %s and %s
-        and smallword not like '%s'
-        and occurence < %s
-        order by smallword 
-        """ % (db_, sterm.encode('utf8')+'%', l-2, l+2, myw.encode('utf8')+'%', occurence_cutoff) )
-        similar = cursor.fetchall()
+        import Levenshtein
 
-        # 4 Select candidates that have a Levenshtein ratio less than the cutoff
-        candidates.extend(  [s[1] for s in similar if 
-                      Levenshtein.ratio(myw,s[1].decode('utf8')) > lcutoff and
-                      Levenshtein.distance(myw,s[1].decode('utf8')) < ldistance  and
-                      not '\xc2\xad' in s[1]] )
+        store = _store(store, db_)
+        if index is not None:
+            candidates = self._index_candidates(myw, index, occurence_cutoff,
+                                                lcutoff, ldistance)
+        else:
+            candidates = self._query_candidates(myw, store, occurence_cutoff,
+                                                lcutoff, ldistance)
 
         # Remove certain candidates 
         candidates = [c for c in candidates if c.find(")") == -1 and c.find("(") == -1 ]
@@ -118,26 +105,14 @@ class WordFrequencyChecker():
                                                c.decode("utf8").find(u"…") == -1 ]
 
         # 5 Remove candidates that are correctly spelled
+        hspell = self.hunspell.get()
         if hspell is not None:
             candidates = [c for c in candidates if not hspell.spell( c )]
 
         # 6 Check for similar things in the database (capitalization)
-        final_candidates = []
-        for cand in candidates:
-                q = "select occurence, smallword from %s where smallword = '%s';"  % (db_, cand)
-                try:
-                    cursor.execute(q)
-                except Exception:
-                    # not properly escaped string ... 
-                    continue
-                nr = -1
-                for res in cursor.fetchall():
-                    if res[1].decode("utf8").lower() == cand.decode("utf8").lower():
-                        if res[0] > nr:
-                            nr = res[0]
-                # print "check ", cand, nr
-                if nr < occurence_cutoff:
-                    final_candidates.append(cand)
+        occurrences = store.max_occurrences(candidates)
+        final_candidates = [cand for cand in candidates
+            if occurrences.get(cand.decode("utf8").lower().encode("utf8"), -1) < occurence_cutoff]
 
         print "Removed %s due to high occurence in the word count" % ( len(candidates) - len(final_candidates) )
         candidates = final_candidates
@@ -166,6 +141,49 @@ class WordFrequencyChecker():
 
         return final_candidates
 
+    def _index_candidates(self, myw, index, occurence_cutoff, lcutoff, ldistance):
+        """ Candidates for myw from the index (as utf8 strings) """
+
+        import Levenshtein
+
+        return [w.encode('utf8') for d, w, occurence in index.find(myw, ldistance - 1)
+                if occurence < occurence_cutoff and
+                   not w.lower().startswith(myw.lower()) and
+                   Levenshtein.ratio(myw, w) > lcutoff]
+
+    def _query_candidates(self, myw, store, occurence_cutoff, lcutoff, ldistance):
+        """ Candidates for myw from the database (as utf8 strings) """
+
+        import Levenshtein
+
+        # \xc2\xad is a soft hyphen that is sometimes used instead of a space
+
+        # 1. Search for all words that start with the same 3 chars
+        sterm = myw[:3]
+        similar = store.words_like(sterm.encode('utf8')+'%', myw.encode('utf8')+'%', occurence_cutoff)
+
+        # 2 Select candidates that have a Levenshtein ratio less than the cutoff
+        candidates = [s[1] for s in similar if 
+                      Levenshtein.ratio(myw,s[1].decode('utf8')) > lcutoff and
+                      Levenshtein.distance(myw,s[1].decode('utf8')) < ldistance and
+                      not '\xc2\xad' in s[1]] 
+
+        if False and len(myw) > 9:
+                sterm = "%" + myw[ 3:7] + "%"
+                similar = store.words_like(sterm.encode('utf8'), myw.encode('utf8')+'%', occurence_cutoff)
+
+        # 3. Search for all words that start with the same char and end with the same 3 chars
+        sterm = myw[0] + '%' + myw[-3:]
+        similar = store.words_like(sterm.encode('utf8')+'%', myw.encode('utf8')+'%', occurence_cutoff)
+
+        # 4 Select candidates that have a Levenshtein ratio less than the cutoff
+        candidates.extend(  [s[1] for s in similar if 
+                      Levenshtein.ratio(myw,s[1].decode('utf8')) > lcutoff and
+                      Levenshtein.distance(myw,s[1].decode('utf8')) < ldistance  and
+                      not '\xc2\xad' in s[1]] )
+
+        return candidates
+
     def _load_candidates(self, correct, candidates, max_cand=120):
 
         pages = []
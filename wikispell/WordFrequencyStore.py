@@ -0,0 +1,211 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+Storage for the word frequency table (occurence, smallword) in MySQL or SQLite
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+import sqlite3
+
+try:
+    import MySQLdb
+except ImportError:
+    MySQLdb = None
+
+class WordFrequencyStore(object):
+    """ A table of words and their number of occurrences
+
+    The table has two columns, occurence and smallword, with an index on
+    each. Words are passed and returned as utf8 strings, rows as
+    (occurence, smallword) tuples.
+
+    The queries are the same for all databases, the subclasses only provide
+    the connection, the placeholder for parameters and the column types.
+    """
+
+    # Placeholder for query parameters
+    param = "%s"
+    # SQL expression for the length of a word in bytes
+    length = "length(smallword)"
+    # Columns and options of the table, the indexed columns
+    columns = "occurence int, smallword varchar(255)"
+    table_options = ""
+    indexed_columns = ["occurence", "smallword"]
+
+    def __init__(self, connection, table, cursor=None):
+        self.connection = connection
+        self.table = table
+        if cursor is None:
+            cursor = connection.cursor()
+        self.cursor = cursor
+
+    def _query(self, query, params=()):
+        self.cursor.execute(query.replace("?", self.param), params)
+        return self.cursor.fetchall()
+
+    #
+    ## Queries
+    #
+    def frequent_words(self, min_occurence, min_length=0, max_length=999):
+        """ Words occurring more than min_occurence times, most frequent first
+
+        Only words longer than min_length and at most max_length bytes are
+        returned.
+        """
+        return self._query("""select occurence, smallword from %s
+            where occurence > ? and %s > ? and %s <= ?
+            order by occurence DESC""" % (self.table, self.length, self.length),
+            (min_occurence, min_length, max_length))
+
+    def rare_words(self, max_occurence):
+        """ Words occurring less than max_occurence times """
+        return self._query("select occurence, smallword from %s where occurence < ?" % self.table,
+            (max_occurence,))
+
+    def words_like(self, pattern, exclude, max_occurence):
+        """ Words matching the SQL pattern (but not exclude) that occur less
+        than max_occurence times, sorted by word
+        """
+        return self._query("""select occurence, smallword from %s
+            where smallword like ? and smallword not like ? and occurence < ?
+            order by smallword""" % self.table,
+            (pattern, exclude, max_occurence))
+
+    def occurrences(self, word):
+        """ All rows for word (in any capitalization that the database
+        considers equal, callers should compare the words themselves)
+        """
+        return self._query("select occurence, smallword from %s where smallword = ?" % self.table,
+            (word,))
+
+    def max_occurrences(self, words, chunksize=500):
+        """ Returns the highest occurrence of each word in any capitalization
+
+        The result maps the lower case words to the occurrence, words that are
+        not in the table are left out. All words are looked up with one query
+        (per chunksize words).
+        """
+        result = {}
+        words = list(set(words))
+        for i in range(0, len(words), chunksize):
+            for occurence, smallword in self._lookup(words[i:i+chunksize]):
+                lower = _lower(smallword)
+                if occurence > result.get(lower, -1):
+                    result[lower] = occurence
+        return result
+
+    def _lookup(self, words):
+        """ All rows for the words (as occurrences() for each word) """
+        return self._query("select occurence, smallword from %s where smallword in (%s)" % (
+            self.table, ", ".join(["?"] * len(words))), words)
+
+    #
+    ## Loading
+    #
+    def create(self):
+        """ Creates the (empty) table """
+        self.cursor.execute("create table %s (%s)%s" % (
+            self.table, self.columns, self.table_options))
+
+    def insert(self, rows):
+        """ Inserts (occurence, smallword) rows """
+        query = "insert into %s (occurence, smallword) values (?, ?)" % self.table
+        self.cursor.executemany(query.replace("?", self.param), rows)
+
+    def add_indexes(self):
+        """ Adds the indexes on the indexed columns """
+        # The table name may include the database
+        name = self.table.split(".")[-1]
+        for column in self.indexed_columns:
+            self.cursor.execute("create index %s_%s on %s (%s)" % (
+                name, column, self.table, column))
+
+    def load(self, rows, chunksize=10000):
+        """ Creates the table and bulk loads all (occurence, smallword) rows
+
+        The indexes are only built after all rows are inserted.
+        """
+        self.create()
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunksize:
+                self.insert(chunk)
+                chunk = []
+        if chunk:
+            self.insert(chunk)
+        self.add_indexes()
+        self.commit()
+
+    def commit(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+class MySQLWordFrequencyStore(WordFrequencyStore):
+    """ The word frequency table in a MySQL database
+
+    Possible usage
+    >>> store = MySQLWordFrequencyStore.connect('wikiwords.countedwords_20161020')
+    >>> store.frequent_words(1000, 13)
+    """
+
+    table_options = " ENGINE = MYISAM"
+
+    @classmethod
+    def connect(cls, table, mysql_config="~/.my.cnf.hroest"):
+        """ Connects to the MySQL server using the given config file """
+        if MySQLdb is None:
+            raise ImportError("The MySQLdb module is needed to read the table %s" % table)
+        return cls(MySQLdb.connect(read_default_file=mysql_config), table)
+
+class SQLiteWordFrequencyStore(WordFrequencyStore):
+    """ The word frequency table in an SQLite file (no server needed)
+
+    Next to occurence and smallword, the table stores the lower case word so
+    that occurrences() finds all capitalizations of a word as MySQL does
+    (the like patterns of words_like are only case insensitive for ASCII
+    characters in SQLite). The smallword column is compared without case so
+    that the index is used for like patterns with a fixed prefix.
+
+    Possible usage
+    >>> store = SQLiteWordFrequencyStore('countedwords.sqlite')
+    >>> store.load([(1200, 'Haus'), (3, 'Huas')])
+    >>> store.words_like('Hu%', 'Haus%', 20)
+    [(3, 'Huas')]
+    """
+
+    param = "?"
+    length = "length(cast(smallword as blob))"
+    columns = "occurence integer, smallword text collate nocase, lowerword text"
+    indexed_columns = ["occurence", "smallword", "lowerword"]
+
+    def __init__(self, filename, table="countedwords"):
+        connection = sqlite3.connect(filename)
+        connection.text_factory = str
+        WordFrequencyStore.__init__(self, connection, table)
+        self.filename = filename
+
+    def occurrences(self, word):
+        return self._query("select occurence, smallword from %s where lowerword = ?" % self.table,
+            (_lower(word),))
+
+    def _lookup(self, words):
+        return self._query("select occurence, smallword from %s where lowerword in (%s)" % (
+            self.table, ", ".join(["?"] * len(words))), [_lower(word) for word in words])
+
+    def create(self):
+        # Loading again replaces the table
+        self.cursor.execute("drop table if exists %s" % self.table)
+        WordFrequencyStore.create(self)
+
+    def insert(self, rows):
+        self.cursor.executemany("insert into %s (occurence, smallword, lowerword) values (?, ?, ?)" % self.table,
+            ((occurence, smallword, _lower(smallword)) for occurence, smallword in rows))
+
+def _lower(word):
+    return word.decode('utf8').lower().encode('utf8')
@@ -10,23 +10,33 @@ The main methods are:
                  closing string.
                  In addition, it accepts a start argument to design a starting
                  point and alternativeBreak argument to designate additional
-                 closing points. Furthermore it allows to specify a list of
-                 positions (list of integers) ignore_in where the opening / 
-                 closing strings will be ignored if they are found at a
-                 position contained in the ignore_in argument.
+                 closing points. Furthermore it allows to specify positions
+                 ignore_in (an IntervalIndex or a list of integers) where the
+                 opening / closing strings will be ignored if they are found at
+                 a position contained in the ignore_in argument.
                  The function returns an object of type Ranges.
 
+    findRanges : same as findRange but for a whole list of opening / closing
+                 pairs at once, which are all located in a single pass over
+                 the text. Returns a list of Ranges objects.
+
     find_next_unignored : The function finds the next occurence of pattern in
                  the given text, ignoring all occurences at positions indicated 
-                 with ignores (a list of integers).
+                 with ignores (an IntervalIndex or a list of integers).
 
     split_with_ignores : Basically a text.split( separator ) method with the 
                 only difference that it will not split at any position that 
                 is contained in the this_ignores array
 
+    IntervalIndex : A sorted set of [start, end) intervals that answers
+                whether a position is contained in any of them using
+                bisection. Use it instead of expanding ranges into lists of
+                single positions.
+
 """
 
 import re
+import bisect
 
 class Ranges:
     def __init__(self, ranges=[], match=True, not_matching=[]):
@@ -38,14 +48,88 @@ class Ranges:
         self.ranges = self.ranges[:-1]
 
     def get_large_ranges( self ):
+        """Returns a list of all positions covered by the ranges.
+
+        Note that this list has one entry per character, use
+        get_interval_index for membership tests instead.
+        """
         res = []
         for  i in self.ranges:
             res.extend( range( i[0], i[1] )  )
         return res
 
+    def get_interval_index( self ):
+        """Returns an IntervalIndex of the positions covered by the ranges."""
+        return IntervalIndex(self.ranges)
+
     def __iter__(self):
         return self.ranges
 
+class IntervalIndex:
+    """A set of positions, stored as sorted, non-overlapping [start, end) intervals.
+
+    Membership tests (pos in index) use bisection and the memory needed only
+    depends on the number of intervals, not on their length. Overlapping
+    input intervals are merged.
+    """
+
+    def __init__(self, ranges=[]):
+        self.starts = []
+        self.ends = []
+        for r in sorted(ranges):
+            if r[1] <= r[0]:
+                continue
+            if len(self.starts) > 0 and r[0] < self.ends[-1]:
+                if r[1] > self.ends[-1]:
+                    self.ends[-1] = r[1]
+            else:
+                self.starts.append(r[0])
+                self.ends.append(r[1])
+
+    def _find(self, pos):
+        """Return the index of the interval containing pos (or -1)."""
+        i = bisect.bisect_right(self.starts, pos) - 1
+        if i >= 0 and pos < self.ends[i]:
+            return i
+        return -1
+
+    def contains(self, pos):
+        return self._find(pos) != -1
+
+    def overlaps(self, start, end):
+        """Check whether any interval overlaps with [start, end)."""
+        i = bisect.bisect_left(self.starts, end) - 1
+        return i >= 0 and self.ends[i] > start
+
+    def interval_at(self, pos):
+        """Return the [start, end] interval containing pos (or None)."""
+        i = self._find(pos)
+        if i == -1:
+            return None
+        return [self.starts[i], self.ends[i]]
+
+    def end_of(self, pos):
+        """Return the end of the interval containing pos (or -1)."""
+        i = self._find(pos)
+        if i == -1:
+            return -1
+        return self.ends[i]
+
+    def intervals(self):
+        return [[s, e] for s, e in zip(self.starts, self.ends)]
+
+    def __contains__(self, pos):
+        return self._find(pos) != -1
+
+    def __len__(self):
+        return len(self.starts)
+
+def _as_ignores(ignores):
+    """Prepare ignored positions for repeated membership tests."""
+    if isinstance(ignores, IntervalIndex) or isinstance(ignores, (set, frozenset)):
+        return ignores
+    return set(ignores)
+
 class PictureText:
     def __init__(self, start = -1, fulltext = '', elements = []): 
         self.start = start
@@ -63,23 +147,104 @@ def findRange(opening, closing, text, start=0, alternativeBreak = None,
     are treated as if they were closing statements as well.
     """
 
+    ignore_in = _as_ignores(ignore_in)
+
+    def find_next(pattern, loc):
+        return find_next_unignored(text, loc, pattern, ignore_in)
+
+    return _findRange(opening, closing, find_next, start, alternativeBreak)
+
+def findRanges(delimiters, text, start=0, ignore_in = [] ):
+    """Returns the ranges for several opening / closing pairs at once.
+
+    delimiters is a list of (opening, closing, alternativeBreak) tuples and
+    the result is a list of Ranges objects, one per tuple, identical to what
+    findRange would return for each of them. All delimiters are located in a
+    single pass over the text (see DelimiterIndex) instead of searching the
+    whole text again for every pair.
+    """
+
+    tokens = []
+    for opening, closing, alternativeBreak in delimiters:
+        tokens.extend([opening, closing])
+        if alternativeBreak:
+            tokens.extend(alternativeBreak)
+    index = DelimiterIndex(text, tokens)
+    ignore_in = _as_ignores(ignore_in)
+
+    def find_next(pattern, loc):
+        return index.find(pattern, loc, ignore_in)
+
+    return [_findRange(opening, closing, find_next, start, alternativeBreak)
+            for opening, closing, alternativeBreak in delimiters]
+
+class DelimiterIndex:
+    """Sorted positions of a set of delimiters in a text.
+
+    The text is scanned once for the first characters of all delimiters and
+    every position is recorded for each delimiter that starts there (also
+    overlapping occurences, e.g. of two and three apostrophes). Afterwards,
+    find answers the same question as text.find using bisection.
+    """
+
+    def __init__(self, text, delimiters):
+        self.positions = {}
+        by_first_char = {}
+        for d in set(delimiters):
+            self.positions[d] = []
+            by_first_char.setdefault(d[0], []).append(d)
+
+        if len(by_first_char) == 0:
+            return
+
+        pat = re.compile(u"[%s]" % u"".join([re.escape(c) for c in by_first_char]))
+        for m in pat.finditer(text):
+            p = m.start()
+            for d in by_first_char.get(text[p], []):
+                if text.startswith(d, p):
+                    self.positions[d].append(p)
+
+    def find(self, pattern, start, ignores=[]):
+        """Find the next occurence of pattern starting from start, excluding
+        all positions given in ignores. If none is found, it returns -1."""
+        positions = self.positions[pattern]
+        i = bisect.bisect_left(positions, start)
+        if not ignores:
+            if i < len(positions): return positions[i]
+            return -1
+        while i < len(positions):
+            if positions[i] not in ignores: return positions[i]
+            if isinstance(ignores, IntervalIndex):
+                # skip all occurences within the ignored interval
+                i = bisect.bisect_left(positions, ignores.end_of(positions[i]), i)
+            else:
+                i += 1
+        return -1
+
+def _findRange(opening, closing, find_next, start=0, alternativeBreak = None):
+    """Implementation of findRange.
+
+    find_next(pattern, loc) has to return the position of the next occurence
+    of pattern at or after loc (or -1 if there is none).
+    """
+
     loc = start
     stack = []
     these_ranges = []
     closeOpenMatch = True
     notMatching = []
     while True:
-        o = find_next_unignored(text, loc, opening, ignore_in )
-        c = find_next_unignored(text, loc, closing, ignore_in )
+        o = find_next(opening, loc)
+        c = find_next(closing, loc)
 
         if alternativeBreak:
-            this_min = len( text ) + 1; mini = -1
+            this_min = -1; mini = -1
             # here we find the closest alternative breaking point that is
             # after the opening (or we already ARE after an opening,
             # indicated by something on the stack)
             for alt in alternativeBreak:
-                alternativ_c = find_next_unignored(text, loc, alt, ignore_in)
-                if (not alternativ_c == -1 and alternativ_c < this_min
+                alternativ_c = find_next(alt, loc)
+                if (not alternativ_c == -1 and (this_min == -1 or alternativ_c < this_min)
                     and (alternativ_c > o or len(stack) > 0)   ):
                     this_min = alternativ_c; mini = alt
             
@@ -99,7 +264,7 @@ def findRange(opening, closing, text, start=0, alternativeBreak = None,
         # - there is another opening statement between the two (then we add one level of nesting)
         # - if not, we have found a range which we can append
         if o < c and not o == -1:
-            next_open = find_next_unignored(text, loc + 1, opening, ignore_in )
+            next_open = find_next(opening, loc + 1)
             if next_open >= o and next_open < c:
                 stack.append(o)
                 loc = o + 1
@@ -142,13 +307,21 @@ def findRange(opening, closing, text, start=0, alternativeBreak = None,
 
 def find_next_unignored( text, start, pattern, ignores=[]):
     """Find the next occurence of pattern starting from start, excluding all
-    positions given in ignores. If none is found, it returns -1."""
+    positions given in ignores. If none is found, it returns -1.
+
+    ignores can be an IntervalIndex, a set or a list of integers."""
+
+    if isinstance(ignores, list):
+        ignores = _as_ignores(ignores)
 
     next_match = text.find( pattern, start )
     while next_match != -1:
         if next_match not in ignores: return next_match
-        next_match = text.find( pattern, start + 1)
-        start = next_match
+        if isinstance(ignores, IntervalIndex):
+            # continue the search after the end of the ignored interval
+            next_match = text.find( pattern, ignores.end_of(next_match) )
+        else:
+            next_match = text.find( pattern, next_match + 1)
     return -1
 
 def split_with_ignores(current_text, separator, this_ignores):
@@ -157,6 +330,7 @@ def split_with_ignores(current_text, separator, this_ignores):
     Basically a "current_text.split( separator )" method with the only
     difference that it will not split at any position that is contained in
     the this_ignores array """
+    this_ignores = _as_ignores(this_ignores)
     loc = 0
     elements = []
     while True:
@@ -191,14 +365,21 @@ def _non_nestedrange(text, pattern):
     return [[q.start(), q.end()] for q in re.finditer(pattern , text)]
 
 def ignoreranges(text, ranges):
-    ignores =  []
+    """Returns an IntervalIndex of the positions covered by the given types
+    of ranges (any of 'math', 'nowiki' and 'comment')."""
+    return IntervalIndex(ignore_intervals(text, ranges))
+
+def ignore_intervals(text, ranges):
+    """Returns the list of ranges covered by the given types of ranges (any
+    of 'math', 'nowiki' and 'comment')."""
+    intervals = []
     if 'math' in ranges:
-        for q in math_range( text ): ignores.extend( range( q[0], q[1] ) )
+        intervals.extend( math_range( text ) )
     if 'nowiki' in ranges:
-        for q in nowiki_range( text ): ignores.extend( range( q[0], q[1] ) )
+        intervals.extend( nowiki_range( text ) )
     if 'comment' in ranges:
-        for q in comment_range( text ): ignores.extend( range( q[0], q[1] ) )
-    return ignores
+        intervals.extend( comment_range( text ) )
+    return intervals
 
 def get_subtext(text, myrange):
     return text[myrange[0]:myrange[1]]
@@ -258,18 +439,18 @@ def picture_range(text):
             current_text = get_subtext(text, rr)
             if(text.find(current_text)==current_start):
                 break
-            this_ignores.extend(range(rr[0],rr[1]))
+            this_ignores.append(rr)
 
         # Recompute the ignore range for this text
-        this_ignores = [i - current_start for i in this_ignores ]
+        this_ignores = [[rr[0] - current_start, rr[1] - current_start] for rr in this_ignores ]
 
         # Add any templates within to the ignored ranges
         ranges = findRange( "{{", "}}", current_text)
-        for rr in ranges.ranges: this_ignores.extend(range(rr[0],rr[1]))
-        this_ignores.extend(ignoreranges(current_text, ['math', 'nowiki', 'comment']) )
+        this_ignores.extend(ranges.ranges)
+        this_ignores.extend(ignore_intervals(current_text, ['math', 'nowiki', 'comment']) )
 
         # Now split the outer element at the vertical bar ("|") but ignoring those that are within nested
-        elements = split_with_ignores(current_text, "|", this_ignores)
+        elements = split_with_ignores(current_text, "|", IntervalIndex(this_ignores))
         # remove leading and trailing brackets [[ and ]]
         if len(elements) > 0: elements[0] = elements[0][2:]
         if len(elements) > 1: elements[-1] = elements[-1][:-2]
@@ -0,0 +1,199 @@
+#!/usr/bin/python
+# -*- coding: utf-8  -*-
+
+"""
+A library that splits mediawiki texts into the words to be spellchecked.
+
+The main methods are:
+    tokenize : scans a text for words and yields (start, end, raw, derived)
+               for each word: raw is the word as it occurs in the text
+               (start to end) and derived is its short form (see derive).
+               Words in forbidden ranges are left out.
+
+    derive : returns the short form of a word, without punctuation, links
+             etcetera (this is what Word.derive returns).
+
+    check_in_ranges : moves the scan position across ranges of the text that
+             should not be checked.
+"""
+
+#
+# Distributed under the terms of the MIT license.
+#
+
+import re, string
+
+# Regex to find the next word: any whitespace or control characters followed
+# by a "word" stopping at the next whitespace or control character.
+WORD_PATTERN = re.compile(r'([\s\=\<\>\_]*)([^\s\=\<\>\_/\-]+)')
+
+# Characters removed at the start and end of a word by derive
+_punctuation = string.punctuation + u'«»–−→“„‚‘’'
+# Words that only consist of these characters are numbers
+_number_chars = string.punctuation + string.digits
+
+def derive(word):
+    """ Returns the short form of a word, without punctuation, square
+    brackets etcetera
+    """
+    shortword = word
+    # Remove all words of the form [[something:something - these are
+    # usually interwiki links or category links
+    colon = shortword.rfind(':')
+    if colon != -1 and -1 < shortword.rfind('[[') < colon:
+        shortword = ""
+    # Remove barred links
+    bar = shortword.rfind('|')
+    if bar != -1:
+        link = shortword.rfind('[[')
+        if -1 < link < bar:
+            shortword = shortword[:link] + shortword[bar + 1:]
+        else:
+            shortword = shortword[bar + 1:]
+    if '[' in shortword or ']' in shortword:
+        shortword = shortword.replace('[', '').replace(']', '')
+    # replace all occurencs of &nbsp;
+    if 'nbsp;' in shortword:
+        shortword = shortword.replace('&nbsp;', ' ').replace('nbsp;', ' ')
+    shortword = shortword.replace(u'\xa0', ' ')
+    # Remove non-alphanumerical characters at the start and end
+    shortword = shortword.lstrip(_punctuation)
+    if not shortword:
+        return ""
+    shortword = shortword.rstrip(_punctuation)
+    # Do not check URLs
+    if shortword.startswith("http://") or shortword.startswith("https://") or shortword.startswith("www."):
+        return ""
+    # Do not check 'words' with only numerical characters
+    if not shortword.strip(_number_chars):
+        return ""
+    return shortword
+
+def tokenize(text, pattern=WORD_PATTERN, ranges=[], range_ends=None, windows=None):
+    """ Yields (start, end, raw, derived) for the words of a text
+
+    pattern is a compiled regex with two groups, the characters before the
+    word and the word. Words are split at the first &nbsp; or dash (–) and
+    only the first part is checked, the scan continues after it.
+
+    Words that are in one of the (sorted) ranges are skipped. If range_ends
+    is given (a set of the ends of the ranges), words starting right at the
+    end of a range are skipped as well since they might not be complete.
+
+    As in the original scan, the next search starts one character after a
+    word (and the start of a word is counted from where the search started).
+
+    If windows (a sorted list of non-overlapping (start, end) pairs) is
+    given, only the words starting within these windows are returned. Each
+    window should start after whitespace and end at whitespace (or the end of
+    the text), so that no word crosses its borders.
+    """
+    if windows is None:
+        windows = [(0, len(text))]
+    # Byte strings can only be ASCII (derive compares them with unicode
+    # characters) and thus contain no dash; the original scan did not split
+    # them either since re.split(u'–', word) never matches in a byte string
+    if isinstance(text, unicode):
+        dash = u'–'
+    else:
+        dash = None
+    search = pattern.search
+
+    loc = 0
+    curr_r = 0
+    for window_start, window_end in windows:
+        loc = max(loc, window_start)
+        while True:
+            match = search(text, loc, window_end)
+            if not match:
+                break
+
+            if ranges:
+                curr_r, loc, in_nontext = check_in_ranges(
+                    ranges, match.start(), match.end(), curr_r, loc)
+                if in_nontext:
+                    continue
+
+            # Split the words up at special places like &nbsp; or – (these will
+            # usually not be found in the dictionary)
+            raw = match.group(2)
+            k = raw.find('&nbsp;')
+            if k != -1:
+                raw = raw[:k]
+                advance = k + 6
+            else:
+                if dash is not None:
+                    k = raw.find(dash)
+                    if k != -1:
+                        raw = raw[:k]
+                advance = len(raw) + 1
+
+            start = loc + match.end(1) - match.start()
+            if range_ends is not None and start in range_ends:
+                loc += advance
+                continue
+
+            yield start, start + len(raw), raw, derive(raw)
+            loc = start + advance
+
+def check_in_ranges(ranges, wordStart, wordEnd, curr_r, loc):
+    """ Check for the next skippable range and move loc across it.
+
+    Args:
+        ranges( list(pair)) : a list of ranges (a pair of start/end
+                              position) which should be skipped
+        wordStart(int) : a start position of the current word
+        wordEnd(int) : an end position of the current word
+        curr_r(int) : current range pointer
+        loc(int) : current text cursor position
+
+    Returns:
+        tuple(curr_r, loc, current_context)
+        - curr_r: this contains the new current range pointer (which range is current)
+        - loc: this contains the new current text cursor
+        - current_context: True if context should be skipped, False otherwise
+    """
+
+    wordMiddle = 0.5*(wordStart + wordEnd)
+
+    # Check if the current match is contained in the next range
+    if curr_r < len(ranges) and \
+      ( (ranges[curr_r][0] <= wordMiddle and ranges[curr_r][1] > wordMiddle) or \
+        (ranges[curr_r][0] <= loc and ranges[curr_r][1] > loc) ):
+
+        # Update the current location to the end of the range
+        loc = ranges[curr_r][1]
+
+        # Choose location as end of next range while location is smaller
+        # than the start of the range
+        while curr_r < len(ranges) and ranges[curr_r][0] < loc:
+
+            # Only update location if the new location would be larger
+            if loc < ranges[curr_r][1]:
+                loc = ranges[curr_r][1]
+
+            curr_r += 1
+
+        return curr_r, loc, True
+
+    # Check if current range needs to be advanced
+
+    is_advanced = False
+    while curr_r < len(ranges) and ranges[curr_r][0] < loc:
+        curr_r += 1
+
+        # Advance location if necessary
+        if curr_r < len(ranges) and \
+          ( (ranges[curr_r][0] <= wordMiddle and ranges[curr_r][1] > wordMiddle) or \
+            (ranges[curr_r][0] <= loc and ranges[curr_r][1] > loc) ):
+
+            # Update the current location to the end of the range
+            loc = ranges[curr_r][1]
+            is_advanced = True
+
+    # Also return true if we advanced the ptr
+    if is_advanced:
+        return curr_r, loc, True
+
+    # Else, return the input parameters and
+    return curr_r, loc, False